@@ -0,0 +1,114 @@
+"""
+Compare sending commands to the py3status command server with a connection
+per command, as py3-cmd does, with a persistent connection and with batches.
+
+The server runs in this process with a fake py3status so only the socket
+round trips are measured, not the python startup of py3-cmd.
+
+    $ python benchmarks/command_socket.py [--commands 2000] [--batch 50]
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from py3status import command  # noqa e402
+from py3status.metrics import Metrics  # noqa e402
+
+
+class Module:
+    metrics = Metrics()
+    module_nice_name = "clock"
+
+    def force_update(self):
+        pass
+
+    def get_latest(self):
+        return [{"full_text": "12:00"}]
+
+
+class Wrapper:
+    def __init__(self):
+        self.config = {"debug": False}
+        self.modules = {"clock": Module()}
+        self.output_modules = {"clock": {"type": "py3status", "module": Module()}}
+
+    def log(self, msg, level="info"):
+        pass
+
+    def report_exception(self, msg, notify_user=True):
+        raise Exception(msg)
+
+
+REQUEST = {"command": "output", "module": ["clock"]}
+
+
+def connect(server):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(server.server_address)
+    return sock, sock.makefile("rb")
+
+
+def per_command(server, commands, batch):
+    line = json.dumps(REQUEST).encode("utf-8") + b"\n"
+    for i in range(commands):
+        sock, reader = connect(server)
+        sock.sendall(line)
+        reader.readline()
+        reader.close()
+        sock.close()
+
+
+def persistent(server, commands, batch):
+    line = json.dumps(REQUEST).encode("utf-8") + b"\n"
+    sock, reader = connect(server)
+    for i in range(commands):
+        sock.sendall(line)
+        reader.readline()
+    sock.close()
+
+
+def batched(server, commands, batch):
+    line = json.dumps([REQUEST] * batch).encode("utf-8") + b"\n"
+    sock, reader = connect(server)
+    for i in range(commands // batch):
+        sock.sendall(line)
+        reader.readline()
+    sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commands", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=50)
+    args = parser.parse_args()
+
+    command.SERVER_ADDRESS = os.path.join(tempfile.mkdtemp(), "py3status_uds")
+    server = command.CommandServer(Wrapper())
+    server.daemon = True
+    server.start()
+    try:
+        for name, function in [
+            ("per command", per_command),
+            ("persistent", persistent),
+            ("batched", batched),
+        ]:
+            start = time.time()
+            function(server, args.commands, args.batch)
+            duration = time.time() - start
+            print(
+                "{:<12} {:8.1f}us/command".format(
+                    name, duration / args.commands * 1e6
+                )
+            )
+    finally:
+        server.kill()
+
+
+if __name__ == "__main__":
+    main()
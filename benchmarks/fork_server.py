@@ -0,0 +1,87 @@
+"""
+Compare spawning commands with Popen and with the py3status fork server.
+
+The cost of fork() grows with the memory of the parent process so we bloat
+this process to look like a busy py3status before timing.
+
+    $ python benchmarks/fork_server.py [--runs 200] [--memory 200]
+"""
+import argparse
+import os
+import resource
+import sys
+import time
+
+from subprocess import PIPE, Popen
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from py3status.fork_server import ForkServer  # noqa e402
+
+
+def cpu_time(fork_server):
+    """
+    CPU time used by us, our children and the fork server and its children.
+    The fork server is not reaped until we stop it so we read its usage
+    from /proc.
+    """
+    total = 0
+    for who in [resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN]:
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    with open("/proc/{}/stat".format(fork_server.pid)) as f:
+        # utime, stime, cutime and cstime follow the command name
+        fields = f.read().rsplit(")", 1)[1].split()
+    total += sum(int(x) for x in fields[11:15]) / os.sysconf("SC_CLK_TCK")
+    return total
+
+
+def bench(name, spawn, runs, fork_server):
+    latencies = []
+    start_cpu = cpu_time(fork_server)
+    for i in range(runs):
+        start = time.perf_counter()
+        spawn(["true"], stdout=PIPE, stderr=PIPE).communicate()
+        latencies.append(time.perf_counter() - start)
+    cpu = cpu_time(fork_server) - start_cpu
+    latencies.sort()
+    print(
+        "{:<12} p50 {:7.3f}ms  p99 {:7.3f}ms  cpu/spawn {:7.3f}ms".format(
+            name,
+            latencies[len(latencies) // 2] * 1000,
+            latencies[int((len(latencies) - 1) * 0.99)] * 1000,
+            cpu / runs * 1000,
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--memory", type=int, default=200, help="parent size (MB)")
+    args = parser.parse_args()
+
+    if not ForkServer.available():
+        sys.exit("the fork server needs python 3.8+")
+
+    # start the fork server while we are small, just like py3status does
+    fork_server = ForkServer()
+    fork_server.start()
+
+    # touch every page so that they all have to be mapped when forking
+    ballast = [bytearray(1024 * 1024) for i in range(args.memory)]
+    for chunk in ballast:
+        for offset in range(0, len(chunk), 4096):
+            chunk[offset] = 1
+
+    print("{} runs, parent size {}MB".format(args.runs, args.memory))
+    try:
+        popen = lambda *a, **kw: Popen(*a, close_fds=True, **kw)  # noqa e731
+        bench("Popen", popen, args.runs, fork_server)
+        bench("fork server", fork_server.popen, args.runs, fork_server)
+    finally:
+        fork_server.stop()
+
+
+if __name__ == "__main__":
+    main()
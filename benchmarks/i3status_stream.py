@@ -0,0 +1,162 @@
+"""
+Compare parsing every line of an i3status output stream and pushing every
+item to its module with the incremental parsing done by py3status.
+
+A stream can be recorded with
+
+    $ i3status -c ~/.config/i3status/config > i3status.stream
+
+otherwise a stream is synthesized for a usual bar where the time changes
+every second, the cpu usage often and the rest seldom.
+
+    $ python benchmarks/i3status_stream.py [--stream i3status.stream]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from copy import deepcopy
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from py3status.i3status import I3status  # noqa e402
+
+
+class Event:
+    def wait(self, timeout=None):
+        pass
+
+
+class Wrapper:
+    def __init__(self, i3s_modules):
+        self.config = {
+            "i3status_path": "i3status",
+            "py3_config": dict(
+                [(name, {}) for name in i3s_modules],
+                general={},
+                i3s_modules=i3s_modules,
+            ),
+            "standalone": False,
+        }
+        self.lock = Event()
+        self.notified = 0
+
+    def get_config_attribute(self, name, attribute):
+        return 1
+
+    def notify_update(self, update):
+        self.notified += len(update) if isinstance(update, list) else 1
+
+    def timeout_queue_add(self, item, cache_time=0):
+        pass
+
+
+def synthesize(seconds):
+    lines = []
+    for second in range(seconds):
+        items = [
+            ("wireless _first_", "W: (72% at home) 192.168.1.12", 600),
+            ("ethernet _first_", "E: down", 3600),
+            ("battery all", "BAT 87.12% 02:31:00", 30),
+            ("disk /", "124.3 GiB", 300),
+            ("load", "0.31", 5),
+            ("cpu_usage", "07%", 2),
+            ("memory", "3.1 GiB", 10),
+            ("volume master", "♪: 40%", 900),
+            ("tztime local", "2020-01-01 12:00:%02d CET" % (second % 60), 1),
+        ]
+        output = []
+        for name, text, period in items:
+            name, instance = name.split(" ") if " " in name else (name, "")
+            if period > 1:
+                # the value changes every period
+                text = "{} {}".format(text, second // period)
+            item = {"name": name, "instance": instance, "full_text": text}
+            if name != "tztime":
+                item["color"] = "#00FF00"
+            output.append(item)
+        lines.append("," + json.dumps(output))
+    return lines
+
+
+def read_stream(path):
+    with open(path) as f:
+        return [line.strip() for line in f if "[{" in line]
+
+
+def module_names(line):
+    names = []
+    for item in json.loads(line.lstrip(",")):
+        name = item.get("name", "")
+        if item.get("instance"):
+            name += " " + item["instance"]
+        names.append(name)
+    return names
+
+
+def full(i3status, lines):
+    # every line is parsed and every item copied and pushed to its module
+    for line in lines:
+        if line[0] == ",":
+            line = line[1:]
+        i3status.last_output = json.loads(line)
+        json_list = deepcopy(i3status.last_output)
+        updates = []
+        for index, item in enumerate(json_list):
+            conf_name = i3status.py3_config["i3s_modules"][index]
+            if i3status.i3modules[conf_name].update_from_item(item):
+                updates.append(conf_name)
+        if updates:
+            i3status.py3_wrapper.notify_update(updates)
+
+
+def incremental(i3status, lines):
+    last_line = None
+    for line in lines:
+        if line[0] == ",":
+            line = line[1:]
+        if line == last_line:
+            continue
+        last_line = line
+        i3status.set_responses(json.loads(line))
+
+
+def bench(name, function, lines, rounds):
+    timings = []
+    for i in range(rounds):
+        wrapper = Wrapper(module_names(lines[0]))
+        i3status = I3status(wrapper)
+        start = time.perf_counter()
+        function(i3status, lines)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    print(
+        "{:<12} p50 {:7.3f}us/line  p99 {:7.3f}us/line  {} updates".format(
+            name,
+            timings[len(timings) // 2] / len(lines) * 1e6,
+            timings[int((len(timings) - 1) * 0.99)] / len(lines) * 1e6,
+            wrapper.notified,
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stream", help="recorded i3status output")
+    parser.add_argument("--seconds", type=int, default=3600)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.stream:
+        lines = read_stream(args.stream)
+    else:
+        lines = synthesize(args.seconds)
+    print("{} lines, {} rounds".format(len(lines), args.rounds))
+    bench("full", full, lines, args.rounds)
+    bench("incremental", incremental, lines, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Compare 10 instances of the system modules reading /proc each on their own
+and sharing the samples of the /proc sampler.
+
+    $ python benchmarks/proc_sampler.py [--rounds 500]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from py3status.module import Module  # noqa e402
+from py3status.module_test import MockPy3statusWrapper  # noqa e402
+from py3status.modules import diskdata, net_rate, netdata, sysdata, uptime  # noqa e402
+from py3status.py3 import Py3  # noqa e402
+
+SYSDATA_FORMAT = "{cpu_used_percent} {cpu_freq_avg} {mem_used_percent} {format_cpu}"
+
+INSTANCES = [
+    (sysdata, "sysdata", {"format": SYSDATA_FORMAT}),
+    (sysdata, "sysdata", {"format": "{cpu_used_percent} {mem_used_percent}"}),
+    (sysdata, "sysdata", {"format": "{format_cpu}"}),
+    (sysdata, "sysdata", {"format": "{swap_used_percent}"}),
+    (net_rate, "net_rate", {}),
+    (net_rate, "net_rate", {"sum_values": True}),
+    (netdata, "netdata", {"nic": "lo"}),
+    (netdata, "netdata", {"nic": "lo", "format": "{down} {up}"}),
+    (diskdata, "diskdata", {"format": "{read} {write}"}),
+    (uptime, "uptime", {}),
+]
+
+
+def make_modules(sample_interval):
+    py3_config = {
+        "general": {},
+        "py3status": {"sample_interval": sample_interval},
+        ".module_groups": {},
+    }
+    modules = []
+    for index, (module, name, config) in enumerate(INSTANCES):
+        full_name = "{} {}".format(name, index)
+        py3_config[full_name] = config
+        mock = MockPy3statusWrapper(py3_config)
+        instance = Module(full_name, {}, mock, module.Py3status())
+        instance.prepare_module()
+        modules.append(getattr(instance.module_class, name))
+    return modules
+
+
+def bench(name, sample_interval, rounds):
+    methods = make_modules(sample_interval)
+    timings = []
+    start_cpu = time.process_time()
+    for i in range(rounds):
+        # each round is a new sampling interval, modules update at the same
+        # time as they do on a busy bar
+        Py3._proc_sampler.samples.clear()
+        start = time.perf_counter()
+        for method in methods:
+            method()
+        timings.append(time.perf_counter() - start)
+    cpu = time.process_time() - start_cpu
+    timings.sort()
+    print(
+        "{:<10} p50 {:6.3f}ms  p99 {:6.3f}ms  cpu/round {:6.3f}ms".format(
+            name,
+            timings[len(timings) // 2] * 1000,
+            timings[int((len(timings) - 1) * 0.99)] * 1000,
+            cpu / rounds * 1000,
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args()
+
+    print("{} modules, {} rounds".format(len(INSTANCES), args.rounds))
+    # a sample_interval of 0 makes each module read /proc itself
+    bench("unshared", 0, args.rounds)
+    bench("shared", 60, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
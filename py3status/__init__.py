@@ -20,6 +20,18 @@ def main():
     from py3status.argparsers import parse_cli_args
 
     options = parse_cli_args()
+    # the fork server is started while we are still small so that spawning
+    # commands from it is cheap
+    if options.fork_server:
+        from py3status.fork_server import ForkServer
+
+        if ForkServer.available():
+            options.fork_server = ForkServer()
+            options.fork_server.start()
+        else:
+            options.fork_server = None
+    else:
+        options.fork_server = None
     # detect gevent option early because monkey patching should be done before
     # everything else starts kicking
     if options.gevent:
@@ -98,6 +98,13 @@ def parse_cli_args():
         action="store_true",
         help="enable debug logging in syslog and --log-file",
     )
+    parser.add_argument(
+        "-f",
+        "--fork-server",
+        action="store_true",
+        dest="fork_server",
+        help="spawn module commands from a lightweight helper process",
+    )
     parser.add_argument(
         "-g",
         "--gevent",
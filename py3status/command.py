@@ -1,12 +1,17 @@
 import argparse
+import errno
 import glob
 import json
 import os
+import select
 import socket
 import threading
+import time
 
 SERVER_ADDRESS = "/tmp/py3status_uds"
 MAX_SIZE = 1024
+# longest request line we accept from a client
+MAX_REQUEST_SIZE = 1024 * 1024
 
 CLICK_EPILOG = """
 examples:
@@ -86,11 +91,24 @@ examples:
         # refresh all modules
         py3-cmd refresh --all
 """
+STATS_EPILOG = """
+examples:
+    stats:
+        # show the click latency and other py3status timings
+        py3-cmd stats
+
+        # show the timings of some modules too
+        py3-cmd stats volume_status "weather_yahoo chicago"
+
+        # show the timings of all modules
+        py3-cmd stats --all
+"""
 EPILOGS = {
     "refresh": REFRESH_EPILOG,
     "list": LIST_EPILOG,
     "docstring": DOCSTRING_EPILOG,
     "click": CLICK_EPILOG,
+    "stats": STATS_EPILOG,
 }
 INFORMATION = [
     ("V", "version", "show version number and exit"),
@@ -101,6 +119,7 @@ SUBPARSERS = [
     ("docstring", "docstring utility", "*"),
     ("list", "list modules", "*"),
     ("refresh", "refresh modules", "*"),
+    ("stats", "show timings and counters", "*"),
     # ('exec', 'execute methods', '+'),
 ]
 CLICK_OPTIONS = [
@@ -126,6 +145,7 @@ DOCSTRING_OPTIONS = [
     ("update", "update docstrings"),
 ]
 REFRESH_OPTIONS = [("all", "refresh all modules")]
+STATS_OPTIONS = [("all", "show the stats of all modules")]
 
 
 class CommandRunner:
@@ -133,6 +153,9 @@ class CommandRunner:
     Encapsulates the remote commands that are available to run.
     """
 
+    # commands that return information to the client
+    QUERIES = ["output", "scheduler", "stats", "timings"]
+
     def __init__(self, py3_wrapper):
         self.debug = py3_wrapper.config["debug"]
         self.py3_wrapper = py3_wrapper
@@ -179,6 +202,82 @@ class CommandRunner:
         if update_i3status:
             self.py3_wrapper.i3status_thread.refresh_i3status()
 
+    def stats(self, data):
+        """
+        return the timings and counters of py3status, i3status and of the
+        requested module(s)
+        """
+        stats = {
+            "py3status": self.py3_wrapper.metrics.summary(),
+            "i3status": self.py3_wrapper.i3status_thread.metrics.summary(),
+        }
+        if data.get("all"):
+            module_names = self.py3_wrapper.modules.keys()
+        else:
+            module_names = self.find_modules(data.get("module") or [])
+        for module_name in module_names:
+            module = self.py3_wrapper.modules.get(module_name)
+            if module:
+                stats[module_name] = module.metrics.summary()
+        return stats
+
+    def output(self, data):
+        """
+        return the current output of the requested module(s) or of all of them
+        """
+        module_names = self.requested_modules(data, self.py3_wrapper.output_modules)
+        output_modules = self.py3_wrapper.output_modules
+        return dict(
+            (name, output_modules[name]["module"].get_latest()) for name in module_names
+        )
+
+    def timings(self, data):
+        """
+        return the timings of the requested module(s) or of all of them
+        """
+        module_names = self.requested_modules(data, self.py3_wrapper.modules)
+        return dict(
+            (name, self.py3_wrapper.modules[name].metrics.summary()["timings"])
+            for name in module_names
+            if name in self.py3_wrapper.modules
+        )
+
+    def scheduler(self, data):
+        """
+        return the state of the scheduler, times are in seconds from now
+        """
+        py3_wrapper = self.py3_wrapper
+        now = time.time()
+
+        def name(item):
+            return getattr(item, "module_full_name", item.__class__.__name__)
+
+        due = {}
+        for item, cache_time in dict(py3_wrapper.timeout_queue_lookup).items():
+            if cache_time is not None:
+                due[name(item)] = max(cache_time - now, 0)
+        next_due = py3_wrapper.timeout_due
+        if next_due is not None:
+            next_due = max(next_due - now, 0)
+        return {
+            "due": due,
+            "next_due": next_due,
+            "running": sorted(x for x in list(py3_wrapper.timeout_running) if x),
+            "missed": sorted(dict(py3_wrapper.timeout_missed)),
+            "events_waiting": dict(
+                (name, len(tasks))
+                for name, tasks in dict(py3_wrapper.timeout_priority_missed).items()
+            ),
+        }
+
+    def requested_modules(self, data, modules):
+        """
+        the names of the requested modules, all of them if none were requested
+        """
+        if data.get("module"):
+            return sorted(self.find_modules(data["module"]))
+        return sorted(modules)
+
     def click(self, data):
         """
         send a click event to the module(s)
@@ -204,7 +303,8 @@ class CommandRunner:
 
     def run_command(self, data):
         """
-        check the given command and send to the correct dispatcher
+        check the given command and send to the correct dispatcher, return
+        the result for the client if there is one
         """
         command = data.get("command")
         if self.debug:
@@ -215,12 +315,53 @@ class CommandRunner:
             self.py3_wrapper.refresh_modules()
         elif command == "click":
             self.click(data)
+        elif command in self.QUERIES:
+            return getattr(self, command)(data)
+        else:
+            raise ValueError("unknown command {}".format(command))
+
+    def run_request(self, data):
+        """
+        run the command or batch (list) of commands and return the reply
+        """
+        if isinstance(data, list):
+            return [self.run_request(item) for item in data]
+        reply = {}
+        try:
+            if not isinstance(data, dict):
+                raise ValueError("a command must be an object")
+            if "id" in data:
+                reply["id"] = data["id"]
+            reply["result"] = self.run_command(data)
+            reply["ok"] = True
+        except Exception as e:
+            self.py3_wrapper.log("Command error {} {}".format(data, e))
+            reply["ok"] = False
+            reply["error"] = str(e) or e.__class__.__name__
+        return reply
+
+
+class CommandConnection:
+    """
+    A client connected to the CommandServer and its buffers.
+    """
+
+    def __init__(self, sock):
+        self.closing = False
+        self.read_buffer = b""
+        self.sock = sock
+        self.write_buffer = b""
 
 
 class CommandServer(threading.Thread):
     """
     Set up a Unix domain socket to allow commands to be sent to py3status
     instance.
+
+    Clients can stay connected and send any number of requests, one JSON
+    object per line or a JSON list of them to batch commands.  Each line gets
+    a reply line.  A single request without a newline, as sent by older
+    py3-cmd, is run when the client has finished sending.
     """
 
     def __init__(self, py3_wrapper):
@@ -248,7 +389,7 @@ class CommandServer(threading.Thread):
             self.py3_wrapper.log("Unix domain socket at %s" % server_address)
 
         # Listen for incoming connections
-        sock.listen(1)
+        sock.listen(16)
         self.sock = sock
 
     def kill(self):
@@ -261,37 +402,98 @@ class CommandServer(threading.Thread):
             if os.path.exists(self.server_address):
                 raise
 
+    def handle_line(self, line):
+        """
+        Run the request and return the reply line.
+        """
+        try:
+            data = json.loads(line.decode("utf-8"))
+        except ValueError as e:
+            reply = {"ok": False, "error": "invalid request: {}".format(e)}
+        else:
+            if self.debug:
+                self.py3_wrapper.log(u"received %s" % data)
+            reply = self.command_runner.run_request(data)
+        return (json.dumps(reply, default=str) + "\n").encode("utf-8")
+
+    def serve(self, client, event):
+        """
+        Read the requests of the client and write the replies.  Return False
+        once we are done with the client.
+        """
+        if event & (select.POLLIN | select.POLLHUP | select.POLLERR):
+            data = client.sock.recv(MAX_SIZE * 64)
+            if data:
+                client.read_buffer += data
+                while b"\n" in client.read_buffer:
+                    line, client.read_buffer = client.read_buffer.split(b"\n", 1)
+                    if line.strip():
+                        client.write_buffer += self.handle_line(line)
+                if len(client.read_buffer) > MAX_REQUEST_SIZE:
+                    self.py3_wrapper.log("Command request too long")
+                    return False
+            else:
+                # the client has finished sending
+                if client.read_buffer.strip():
+                    client.write_buffer += self.handle_line(client.read_buffer)
+                client.read_buffer = b""
+                client.closing = True
+        if client.write_buffer:
+            try:
+                sent = client.sock.send(client.write_buffer)
+            except socket.error as e:
+                if e.errno not in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    raise
+                sent = 0
+            client.write_buffer = client.write_buffer[sent:]
+        return not (client.closing and not client.write_buffer)
+
     def run(self):
         """
-        Main thread listen to socket and send any commands to the
-        CommandRunner.
+        Main thread listen to socket and serve the connected clients, sending
+        their commands to the CommandRunner.
         """
+        clients = {}
+        poller = select.poll()
+        poller.register(self.sock, select.POLLIN)
         while True:
             try:
-                data = None
-                # Wait for a connection
-                if self.debug:
-                    self.py3_wrapper.log("waiting for a connection")
-
-                connection, client_address = self.sock.accept()
-                try:
+                events = poller.poll()
+            except (IOError, OSError, select.error) as e:
+                # interrupted by a signal
+                if e.args[0] == errno.EINTR:
+                    continue
+                raise
+            for fd, event in events:
+                if fd == self.sock.fileno():
+                    connection, client_address = self.sock.accept()
+                    connection.setblocking(False)
                     if self.debug:
                         self.py3_wrapper.log("connection from")
-
-                    data = connection.recv(MAX_SIZE)
-                    if data:
-                        data = json.loads(data.decode("utf-8"))
-                        if self.debug:
-                            self.py3_wrapper.log(u"received %s" % data)
-                        self.command_runner.run_command(data)
-                finally:
+                    clients[connection.fileno()] = CommandConnection(connection)
+                    poller.register(connection, select.POLLIN)
+                    continue
+                client = clients[fd]
+                try:
+                    keep = self.serve(client, event)
+                except socket.error:
+                    # the client has gone
+                    keep = False
+                except Exception:
+                    self.py3_wrapper.report_exception("command failed")
+                    keep = False
+                if not keep:
                     # Clean up the connection
-                    connection.close()
-            except Exception:
-                if data:
-                    self.py3_wrapper.log("Command error")
-                    self.py3_wrapper.log(data)
-                self.py3_wrapper.report_exception("command failed")
+                    poller.unregister(fd)
+                    del clients[fd]
+                    client.sock.close()
+                elif client.closing:
+                    # only the rest of the replies are left to write
+                    poller.modify(fd, select.POLLOUT)
+                elif client.write_buffer:
+                    poller.modify(fd, select.POLLIN | select.POLLOUT)
+                else:
+                    poller.modify(fd, select.POLLIN)
 
 
 def command_parser():
@@ -323,7 +525,7 @@ def command_parser():
         parser.add_argument(short, arg, action="store_true", help=msg)
 
     # make subparsers // ALIAS_DEPRECATION: remove metavar later
-    metavar = "{click,list,refresh}"
+    metavar = "{click,list,refresh,stats}"
     subparsers = parser.add_subparsers(dest="command", metavar=metavar)
     sps = {}
 
@@ -374,6 +576,12 @@ def command_parser():
         arg = "--{}".format(name)
         sp.add_argument(arg, action="store_true", help=msg)
 
+    # stats subparser: add all
+    sp = sps["stats"]
+    for name, msg in STATS_OPTIONS:
+        arg = "--{}".format(name)
+        sp.add_argument(arg, action="store_true", help=msg)
+
     # list subparser: add all, core, user, full
     sp = sps["list"]
     for short, name, msg in LIST_OPTIONS:
@@ -508,6 +716,37 @@ def parse_list_or_docstring(options, sps):
             sps["docstring"].error(msg)
 
 
+def format_stats(stats):
+    """
+    Return the stats replied by a py3status instance as lines of text,
+    durations are shown in milliseconds.
+    """
+    lines = []
+    # py3status first then i3status and the modules
+    order = ["py3status", "i3status"]
+    names = order + sorted(x for x in stats if x not in order)
+    for name in names:
+        summary = stats.get(name)
+        if not summary or not (summary["counters"] or summary["timings"]):
+            continue
+        lines.append(name)
+        for counter, value in sorted(summary["counters"].items()):
+            lines.append("    {:<20} {}".format(counter, value))
+        for timing, values in sorted(summary["timings"].items()):
+            lines.append(
+                "    {:<20} count {}  p50 {:.1f}ms  p99 {:.1f}ms  max {:.1f}ms".format(
+                    timing,
+                    values["count"],
+                    values["p50"] * 1000,
+                    values["p99"] * 1000,
+                    values["max"] * 1000,
+                )
+            )
+    if not lines:
+        lines.append("no stats yet")
+    return lines
+
+
 def send_command():
     """
     Run a remote command. This is called via py3-cmd utility.
@@ -552,7 +791,25 @@ def send_command():
         try:
             # Send data
             verbose("sending")
-            sock.sendall(msg)
+            sock.sendall(msg + b"\n")
+            # read the reply line
+            reply = b""
+            while not reply.endswith(b"\n"):
+                data = sock.recv(MAX_SIZE)
+                if not data:
+                    break
+                reply += data
+            verbose("reply {}".format(reply))
+            if not reply:
+                continue
+            reply = json.loads(reply.decode("utf-8"))
+            if not reply["ok"]:
+                print("\x1b[1;31merror: \x1b[0m{}".format(reply["error"]))
+            elif options.command == "stats":
+                if len(uds_list) > 1:
+                    print("{}:".format(uds))
+                for line in format_stats(reply["result"]):
+                    print(line)
         finally:
             verbose("closing socket")
             sock.close()
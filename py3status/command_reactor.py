@@ -0,0 +1,162 @@
+import os
+import select
+
+from threading import Lock, Thread
+
+READ_SIZE = 4096
+
+
+class StreamedCommand:
+    """
+    A command whose output is being streamed to a module.
+    """
+
+    def __init__(self, reactor, process, module, callback, on_exit):
+        self.buffer = b""
+        self.callback = callback
+        self.fd = process.stdout.fileno()
+        self.module = module
+        self.on_exit = on_exit
+        self.process = process
+        self.reactor = reactor
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+    @property
+    def returncode(self):
+        return self.process.returncode
+
+    def kill(self):
+        """
+        Kill the command, on_exit will not be called.
+        """
+        self.on_exit = None
+        try:
+            self.process.kill()
+        except OSError:
+            pass
+        self.reactor.wakeup()
+
+    def running(self):
+        return self.process.poll() is None
+
+
+class CommandReactor:
+    """
+    This class streams the output of long running commands to the modules that
+    started them.
+
+    A single thread waits on all the commands so that modules do not need a
+    thread each.  It is lazy loaded if a module uses it.
+    """
+
+    def __init__(self, py3_wrapper):
+        self.exiting = []
+        self.lock = Lock()
+        self.py3_wrapper = py3_wrapper
+        self.streams = {}
+        self.thread = None
+        self.wakeup_read = None
+        self.wakeup_write = None
+
+    def _setup_reactor(self):
+        """
+        Start the reactor thread.
+        """
+        self.wakeup_read, self.wakeup_write = os.pipe()
+        self.thread = Thread(target=self._loop)
+        self.thread.daemon = True
+        self.thread.start()
+        self.py3_wrapper.log("command reactor started")
+
+    def add(self, process, module, callback, on_exit=None):
+        """
+        Stream the stdout of process, which must be a pipe, to callback.
+        Returns a StreamedCommand.
+        """
+        stream = StreamedCommand(self, process, module, callback, on_exit)
+        with self.lock:
+            if self.thread is None:
+                self._setup_reactor()
+            self.streams[stream.fd] = stream
+        self.wakeup()
+        return stream
+
+    def wakeup(self):
+        """
+        Make the reactor thread look at its streams again.
+        """
+        if self.wakeup_write is not None:
+            try:
+                os.write(self.wakeup_write, b"x")
+            except OSError:
+                pass
+
+    def kill(self):
+        """
+        Kill all the commands.
+        """
+        with self.lock:
+            streams = list(self.streams.values()) + self.exiting
+        for stream in streams:
+            stream.kill()
+
+    def _loop(self):
+        while self.py3_wrapper.running:
+            with self.lock:
+                fds = list(self.streams)
+            # commands whose stdout is closed are polled until they exit
+            timeout = 0.5 if self.exiting else None
+            readable = select.select(fds + [self.wakeup_read], [], [], timeout)[0]
+            for fd in readable:
+                if fd == self.wakeup_read:
+                    os.read(self.wakeup_read, READ_SIZE)
+                else:
+                    self._read(self.streams[fd])
+            self._reap()
+
+    def _read(self, stream):
+        """
+        Read what is available and give any complete lines to the module.
+        """
+        try:
+            data = os.read(stream.fd, READ_SIZE)
+        except OSError:
+            data = b""
+        if data:
+            stream.buffer += data
+            lines = stream.buffer.split(b"\n")
+            stream.buffer = lines.pop()
+        else:
+            lines = [stream.buffer] if stream.buffer else []
+            with self.lock:
+                del self.streams[stream.fd]
+                self.exiting.append(stream)
+            stream.process.stdout.close()
+        for line in lines:
+            self._call(stream, stream.callback, line.decode("utf-8", "replace"))
+
+    def _reap(self):
+        """
+        Let modules know that their commands have exited.
+        """
+        for stream in self.exiting[:]:
+            if stream.process.poll() is None:
+                continue
+            with self.lock:
+                self.exiting.remove(stream)
+            if stream.on_exit:
+                self._call(stream, stream.on_exit, stream.process.returncode)
+
+    def _call(self, stream, fn, arg):
+        """
+        Call a module callback, an exception must not kill the reactor.
+        """
+        try:
+            fn(arg)
+        except Exception:
+            self.py3_wrapper.report_exception(
+                "command reactor callback of {}".format(stream.module)
+            )
@@ -41,6 +41,18 @@ I3S_COLOR_MODULES = ["general", "battery", "cpu_temperature", "disk", "load"]
 
 I3S_MODULE_NAMES = I3S_SINGLE_NAMES + I3S_INSTANCE_MODULES
 
+# i3status modules py3status can run itself, see i3status_native.py
+I3S_NATIVE_MODULES = [
+    "battery",
+    "cpu_usage",
+    "disk",
+    "ethernet",
+    "load",
+    "memory",
+    "time",
+    "tztime",
+]
+
 CONFIG_FILE_SPECIAL_SECTIONS = ["general", "py3status"]
 
 ERROR_CONFIG = """
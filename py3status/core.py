@@ -16,14 +16,19 @@ from syslog import syslog, LOG_ERR, LOG_INFO, LOG_WARNING
 from traceback import extract_tb, format_tb, format_stack
 
 from py3status.command import CommandServer
+from py3status.command_reactor import CommandReactor
 from py3status.events import Events
+from py3status.file_watcher import FileWatcher
 from py3status.formatter import expand_color
 from py3status.helpers import print_stderr
 from py3status.i3status import I3status
+from py3status.metrics import Metrics
 from py3status.parse_config import process_config
 from py3status.module import Module
+from py3status.network_monitor import NetworkMonitor
 from py3status.profiling import profile
 from py3status.udev_monitor import UdevMonitor
+from py3status.wm_ipc import WmIpc
 
 LOG_LEVELS = {"error": LOG_ERR, "warning": LOG_WARNING, "info": LOG_INFO}
 
@@ -34,6 +39,7 @@ CONFIG_SPECIAL_SECTIONS = [
     ".module_groups",
     "general",
     "i3s_modules",
+    "i3s_native_modules",
     "on_click",
     "order",
     "py3_modules",
@@ -65,6 +71,12 @@ class Runner(Thread):
         # the module is no longer running so notify the timeout logic
         if self.module_name:
             self.py3_wrapper.timeout_finished.append(self.module_name)
+            # wake the scheduler if work was waiting for the module to finish
+            if (
+                self.module_name in self.py3_wrapper.timeout_priority_missed
+                or self.module_name in self.py3_wrapper.timeout_missed
+            ):
+                self.py3_wrapper.update_request.set()
 
 
 class NoneSetting:
@@ -93,28 +105,6 @@ class Task:
         raise NotImplemented()  # noqa f901
 
 
-class CheckI3StatusThread(Task):
-    """
-    Checks that the i3status thread is alive
-    """
-
-    def __init__(self, i3status_thread, py3_wrapper):
-        self.i3status_thread = i3status_thread
-        self.timeout_queue_add = py3_wrapper.timeout_queue_add
-        self.notify_user = py3_wrapper.notify_user
-
-    def run(self):
-        # check i3status thread
-        if not self.i3status_thread.is_alive():
-            err = self.i3status_thread.error
-            if not err:
-                err = "I3status died horribly."
-            self.notify_user(err)
-        else:
-            # check again in 5 seconds
-            self.timeout_queue_add(self, int(time.time()) + 5)
-
-
 class ModuleRunner(Task):
     """
     Starts up a Module
@@ -256,6 +246,7 @@ class Py3statusWrapper:
         self.i3bar_running = True
         self.last_refresh_ts = time.time()
         self.lock = Event()
+        self.metrics = Metrics()
         self.modules = {}
         self.notified_messages = set()
         self.options = options
@@ -276,11 +267,17 @@ class Py3statusWrapper:
         self.timeout_finished = deque()
         self.timeout_keys = []
         self.timeout_missed = {}
+        self.timeout_priority = deque()
+        self.timeout_priority_missed = {}
         self.timeout_queue = {}
         self.timeout_queue_lookup = {}
         self.timeout_running = set()
         self.timeout_update_due = deque()
 
+        # time the clicks on modules were received, until the output
+        # resulting from them is written.
+        self.clicks_pending = {}
+
     def timeout_queue_add(self, item, cache_time=0):
         """
         Add a item to be run at a future time.
@@ -294,6 +291,22 @@ class Py3statusWrapper:
         if self.timeout_due is None or cache_time < self.timeout_due:
             self.update_request.set()
 
+    def priority_queue_add(self, task):
+        """
+        Add a task to be run as soon as possible, before any scheduled
+        updates.  This is used for interactive events such as clicks.
+        """
+        self.timeout_priority.append(task)
+        self.update_request.set()
+
+    def timeout_run(self, item, module_name):
+        """
+        Run the item in its own thread, noting its module as running.
+        """
+        if module_name:
+            self.timeout_running.add(module_name)
+        Runner(item, self, module_name)
+
     def timeout_process_add_queue(self, module, cache_time):
         """
         Add a module to the timeout_queue if it is scheduled in the future or
@@ -344,6 +357,41 @@ class Py3statusWrapper:
         """
         Check the timeout_queue and set any due modules to update.
         """
+        # process any finished modules.
+        # Now that the module has finished running it may have been marked to
+        # be triggered again. This is most likely to happen when events are
+        # being processed and the events are arriving much faster than the
+        # module can handle them.  It is important as a module may handle
+        # events but not trigger the module update.  If during the event the
+        # module is due to update the update is not actioned but it needs to be
+        # once the events have finished or else the module will no longer
+        # continue to update.
+        # Events waiting for the module are run first, in the order they came.
+        while self.timeout_finished:
+            module_name = self.timeout_finished.popleft()
+            self.timeout_running.discard(module_name)
+            tasks = self.timeout_priority_missed.get(module_name)
+            if tasks:
+                self.timeout_run(tasks.popleft(), module_name)
+                if not tasks:
+                    del self.timeout_priority_missed[module_name]
+            elif module_name in self.timeout_missed:
+                module = self.timeout_missed.pop(module_name)
+                self.timeout_update_due.append(module)
+
+        # run interactive events straight away unless their module is running
+        # in which case they are queued behind it rather than replacing any
+        # missed update.
+        while self.timeout_priority:
+            task = self.timeout_priority.popleft()
+            module_name = getattr(task, "module_full_name", None)
+            if module_name and module_name in self.timeout_running:
+                self.metrics.increment("events_deferred")
+                tasks = self.timeout_priority_missed.setdefault(module_name, deque())
+                tasks.append(task)
+            else:
+                self.timeout_run(task, module_name)
+
         # process any items that need adding to the queue
         while self.timeout_add_queue:
             self.timeout_process_add_queue(*self.timeout_add_queue.popleft())
@@ -375,22 +423,6 @@ class Py3statusWrapper:
             except IndexError:
                 self.timeout_due = None
 
-        # process any finished modules.
-        # Now that the module has finished running it may have been marked to
-        # be triggered again. This is most likely to happen when events are
-        # being processed and the events are arriving much faster than the
-        # module can handle them.  It is important as a module may handle
-        # events but not trigger the module update.  If during the event the
-        # module is due to update the update is not actioned but it needs to be
-        # once the events have finished or else the module will no longer
-        # continue to update.
-        while self.timeout_finished:
-            module_name = self.timeout_finished.popleft()
-            self.timeout_running.discard(module_name)
-            if module_name in self.timeout_missed:
-                module = self.timeout_missed.pop(module_name)
-                self.timeout_update_due.append(module)
-
         # run any modules that are due
         while self.timeout_update_due:
             module = self.timeout_update_due.popleft()
@@ -400,8 +432,7 @@ class Py3statusWrapper:
             if module_name and module_name in self.timeout_running:
                 self.timeout_missed[module_name] = module
             else:
-                self.timeout_running.add(module_name)
-                Runner(module, self, module_name)
+                self.timeout_run(module, module_name)
 
         # we return how long till we next need to process the timeout_queue
         if self.timeout_due is not None:
@@ -603,16 +634,14 @@ class Py3statusWrapper:
                 self.log("adding module {}".format(module))
             i3s_mode = "started"
             self.i3status_thread.start()
-            while not self.i3status_thread.ready:
-                if not self.i3status_thread.is_alive():
-                    # i3status is having a bad day, so tell the user what went
-                    # wrong and do the best we can with just py3status modules.
-                    err = self.i3status_thread.error
-                    self.notify_user(err)
-                    self.i3status_thread.mock()
-                    i3s_mode = "mocked"
-                    break
-                time.sleep(0.1)
+            self.i3status_thread.ready_event.wait()
+            if not self.i3status_thread.ready:
+                # i3status is having a bad day, so tell the user what went
+                # wrong and do the best we can with just py3status modules.
+                err = self.i3status_thread.error
+                self.notify_user(err)
+                self.i3status_thread.mock()
+                i3s_mode = "mocked"
         if self.config["debug"]:
             self.log(
                 "i3status thread {} with config {}".format(
@@ -620,11 +649,6 @@ class Py3statusWrapper:
                 )
             )
 
-        # add i3status thread monitoring task
-        if i3s_mode == "started":
-            task = CheckI3StatusThread(self.i3status_thread, self)
-            self.timeout_queue_add(task)
-
         # setup input events thread
         self.events_thread = Events(self)
         self.events_thread.daemon = True
@@ -642,6 +666,22 @@ class Py3statusWrapper:
         # initialize the udev monitor (lazy)
         self.udev_monitor = UdevMonitor(self)
 
+        # initialize the network monitor (lazy)
+        self.network_monitor = NetworkMonitor(self)
+
+        # initialize the file watcher (lazy)
+        self.file_watcher = FileWatcher(self)
+
+        # initialize the command reactor (lazy)
+        self.command_reactor = CommandReactor(self)
+
+        # initialize the i3/sway IPC client (lazy)
+        self.wm_ipc = WmIpc(self)
+
+        fork_server = self.config["fork_server"]
+        if fork_server:
+            self.log("fork server running (pid {})".format(fork_server.pid))
+
         # suppress modules' output wrt issue #20
         if not self.config["debug"]:
             sys.stdout = open("/dev/null", "w")
@@ -748,6 +788,13 @@ class Py3statusWrapper:
         except:  # noqa e722
             pass
 
+        # kill any streamed commands
+        self.command_reactor.kill()
+
+        # stop the fork server
+        if self.config.get("fork_server"):
+            self.config["fork_server"].stop()
+
         try:
             self.lock.set()
             if self.config["debug"]:
@@ -1033,6 +1080,7 @@ class Py3statusWrapper:
 
             # check if an update is needed
             if self.update_queue:
+                clicked = []
                 while len(self.update_queue):
                     module_name = self.update_queue.popleft()
                     module = self.output_modules[module_name]
@@ -1041,9 +1089,17 @@ class Py3statusWrapper:
                     for index in module["position"]:
                         # store the output as json
                         output[index] = out
+                    if module_name in self.clicks_pending:
+                        clicked.append(module_name)
 
                 # build output string
                 out = ",".join([x for x in output if x])
                 # dump the line to stdout
                 write(",[{}]\n".format(out))
                 flush()
+
+                # the output of the clicked modules is now on the bar
+                for module_name in clicked:
+                    received = self.clicks_pending.pop(module_name, None)
+                    if received:
+                        self.metrics.record("click_latency", time.time() - received)
@@ -1,11 +1,13 @@
 import select
 import sys
 
-from threading import Thread
+from threading import Lock, Thread
 from subprocess import Popen, PIPE
 from json import loads
+from time import time
 
 from py3status.profiling import profile
+from py3status.wm_ipc import WmIpcError
 
 try:
     # Python 3
@@ -14,6 +16,10 @@ except ImportError:
     # Python 2
     from pipes import quote as shell_quote
 
+# consecutive events with the same button for a module that arrive less than
+# this many seconds apart can be merged into a single event.
+COALESCE_WINDOW = 0.5
+
 
 class IOPoller:
     """
@@ -55,15 +61,32 @@ class EventTask:
     A simple task that can be run by the scheduler.
     """
 
-    def __init__(self, module_name, event, default_event, events_thread):
+    def __init__(self, module_name, event, default_event, events_thread, received):
         self.events_thread = events_thread
         self.module_full_name = module_name
         self.default_event = default_event
         self.event = event
+        self.last_received = received
+        self.received = received
+
+    def merge(self, event, received):
+        """
+        Merge the event into ours if it is a repeat of the same click.
+        Return True if it was merged.
+        """
+        if received - self.last_received > COALESCE_WINDOW:
+            return False
+        for key in ["button", "index", "modifiers"]:
+            if event.get(key) != self.event.get(key):
+                return False
+        self.event["count"] += 1
+        self.last_received = received
+        return True
 
     def run(self):
+        self.events_thread.start_event(self)
         self.events_thread.process_event(
-            self.module_full_name, self.event, self.default_event
+            self.module_full_name, self.event, self.default_event, self.received
         )
 
 
@@ -94,6 +117,8 @@ class Events(Thread):
         We need to poll stdin to receive i3bar messages.
         """
         Thread.__init__(self)
+        self.coalesce_lock = Lock()
+        self.coalesced = {}
         self.config = py3_wrapper.config
         self.error = None
         self.py3_config = py3_wrapper.config["py3_config"]
@@ -157,29 +182,59 @@ class Events(Thread):
 
     def wm_msg(self, module_name, command):
         """
-        Execute the message with i3-msg or swaymsg and log its output.
+        Execute the message over the wm IPC socket, or with i3-msg or swaymsg
+        if we cannot find it, and log its output.
         """
         wm_msg = self.config["wm"]["msg"]
-        pipe = Popen([wm_msg, command], stdout=PIPE)
+        wm_ipc = self.py3_wrapper.wm_ipc
+        if wm_ipc.available():
+            # talk to the wm directly, no need to fork
+            try:
+                output = wm_ipc.run_command(command)
+            except (IOError, OSError, ValueError, WmIpcError) as e:
+                output = e
+        else:
+            pipe = Popen([wm_msg, command], stdout=PIPE)
+            output = pipe.stdout.read()
         self.py3_wrapper.log(
             '{} module="{}" command="{}" stdout={}'.format(
-                wm_msg, module_name, command, pipe.stdout.read()
+                wm_msg, module_name, command, output
             )
         )
 
-    def process_event(self, module_name, event, default_event=False):
+    def refresh_module(self, module_name, inline=False):
+        """
+        Refresh the module after an event.  When inline the event task holds
+        the module so a py3status module is updated straight away from this
+        thread rather than being rescheduled.
+        """
+        module_info = self.output_modules[module_name]
+        if inline and module_info["type"] == "py3status":
+            module_info["module"].force_update(inline=True)
+        else:
+            self.py3_wrapper.refresh_modules(module_name)
+
+    def process_event(self, module_name, event, default_event=False, received=None):
         """
         Process the event for the named module.
         Events may have been declared in i3status.conf, modules may have
         on_click() functions. There is a default middle click event etc.
+
+        received is the time the event was received, it is only given when
+        processing the event from the EventTask of the module.
         """
 
         # get the module that the event is for
         module_info = self.output_modules.get(module_name)
+        inline = received is not None
+        module = None
 
         # if module is a py3status one call it.
         if module_info["type"] == "py3status":
             module = module_info["module"]
+            output = module.get_latest()
+            if inline:
+                self.py3_wrapper.clicks_pending[module_name] = received
             module.click_event(event)
             if self.config["debug"]:
                 self.py3_wrapper.log("dispatching event {}".format(event))
@@ -187,14 +242,18 @@ class Events(Thread):
             # to make the bar more responsive to users we refresh the module
             # unless the on_click event called py3.prevent_refresh()
             if not module.prevent_refresh:
-                self.py3_wrapper.refresh_modules(module_name)
+                self.refresh_module(module_name, inline)
                 default_event = False
 
         if default_event:
             # default button 2 action is to clear this method's cache
             if self.config["debug"]:
                 self.py3_wrapper.log("dispatching default event {}".format(event))
-            self.py3_wrapper.refresh_modules(module_name)
+            self.refresh_module(module_name, inline)
+
+        if inline and module and module.get_latest() is output:
+            # the click did not change the output so there is nothing to time
+            self.py3_wrapper.clicks_pending.pop(module_name, None)
 
         # find container that holds the module and call its onclick
         module_groups = self.py3_config[".module_groups"]
@@ -202,15 +261,38 @@ class Events(Thread):
         for container in containers:
             self.process_event(container, event)
 
+    def can_coalesce(self, module_name):
+        """
+        Events can only be merged if the module and all the containers that
+        also receive them handle bursts of events.
+        """
+        module_info = self.output_modules.get(module_name)
+        if not module_info or module_info["type"] != "py3status":
+            return False
+        if not module_info["module"].coalesce_events:
+            return False
+        containers = self.py3_config[".module_groups"].get(module_name, [])
+        return all(self.can_coalesce(container) for container in containers)
+
+    def start_event(self, task):
+        """
+        The event task is being run, no more events can be merged into it.
+        """
+        with self.coalesce_lock:
+            if self.coalesced.get(task.module_full_name) is task:
+                del self.coalesced[task.module_full_name]
+
     def dispatch_event(self, event):
         """
         Takes an event dict.  Logs the event if needed and cleans up the dict
         such as setting the index needed for composits.
         """
+        received = time()
         if self.config["debug"]:
             self.py3_wrapper.log("received event {}".format(event))
 
         # usage variables
+        event["count"] = 1
         event["index"] = event.get("index", "")
         instance = event.get("instance", "")
         name = event.get("name", "")
@@ -239,6 +321,7 @@ class Events(Thread):
         module_name = "{} {}".format(name, instance).strip()
 
         default_event = False
+        on_click = None
         module_info = self.output_modules.get(module_name)
         module = module_info["module"]
         # execute any configured i3-msg command
@@ -249,14 +332,26 @@ class Events(Thread):
             on_click = self.on_click.get(module_name, {}).get(str(button))
             if on_click:
                 task = EventClickTask(module_name, event, self, on_click)
-                self.py3_wrapper.timeout_queue_add(task)
+                self.py3_wrapper.priority_queue_add(task)
             # otherwise setup default action on button 2 press
             elif button == 2:
                 default_event = True
 
-        # do the work
-        task = EventTask(module_name, event, default_event, self)
-        self.py3_wrapper.timeout_queue_add(task)
+        # do the work, ahead of any scheduled updates
+        task = EventTask(module_name, event, default_event, self, received)
+        if on_click or default_event or not self.can_coalesce(module_name):
+            self.py3_wrapper.priority_queue_add(task)
+            return
+
+        # a burst of the same event, eg scrolling, is merged into the waiting
+        # event so that the module can handle it in a single run
+        with self.coalesce_lock:
+            waiting = self.coalesced.get(module_name)
+            if waiting and waiting.merge(event, received):
+                self.py3_wrapper.metrics.increment("events_coalesced")
+                return
+            self.coalesced[module_name] = task
+        self.py3_wrapper.priority_queue_add(task)
 
     @profile
     def run(self):
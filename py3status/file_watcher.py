@@ -0,0 +1,275 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+
+from fnmatch import fnmatch
+from threading import Lock, Thread
+from time import time
+
+# changes are coalesced, eg a file written in many chunks is one update
+COALESCE = 0.1
+
+# seconds between attempts to watch again a directory that went away
+RETRY = 5
+
+IN_MODIFY = 0x2
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_MASK_ADD = 0x20000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+EVENTS = {
+    "attrib": IN_ATTRIB,
+    "create": IN_CREATE,
+    "delete": IN_DELETE,
+    "modify": IN_MODIFY | IN_CLOSE_WRITE,
+    "move": IN_MOVED_FROM | IN_MOVED_TO,
+}
+DEFAULT_EVENTS = ["create", "delete", "modify", "move"]
+
+INOTIFY_EVENT = struct.Struct("iIII")
+READ_SIZE = 65536
+
+
+class Inotify:
+    """
+    Minimal inotify(7) binding using ctypes.
+    """
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            self._raise()
+
+    def _raise(self):
+        error = ctypes.get_errno()
+        raise OSError(error, os.strerror(error))
+
+    def fileno(self):
+        return self.fd
+
+    def add_watch(self, path, mask):
+        """
+        Watch path, returns the watch descriptor.
+        """
+        wd = self._add_watch(self.fd, path.encode("utf-8"), mask)
+        if wd < 0:
+            self._raise()
+        return wd
+
+    def read(self):
+        """
+        Return a list of (wd, mask, name) of the waiting events.
+        """
+        try:
+            data = os.read(self.fd, READ_SIZE)
+        except OSError as e:
+            if e.errno == errno.EAGAIN:
+                return []
+            raise
+        events = []
+        offset = 0
+        while offset + INOTIFY_EVENT.size <= len(data):
+            wd, mask, cookie, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            events.append((wd, mask, name.decode("utf-8", "replace")))
+        return events
+
+
+class FileWatcher:
+    """
+    This class allows us to react to changes of files and directories.
+
+    Files (and globs) are watched through their directory so that files
+    being created, deleted or atomically replaced are noticed.  A directory
+    that is removed is watched again once it is back.
+    """
+
+    def __init__(self, py3_wrapper):
+        """
+        The file watching will be lazy loaded if a module uses it.
+        """
+        self.directories = {}
+        self.inotify = None
+        self.inotify_available = None
+        self.lock = Lock()
+        # directory: watches of the directories that went away
+        self.missing = {}
+        self.py3_wrapper = py3_wrapper
+        # wd: [(py3_module, name pattern or None, mask, callback)]
+        self.watches = {}
+
+    def _setup_inotify(self):
+        """
+        Setup inotify and its thread.
+        """
+        try:
+            self.inotify = Inotify()
+        except (AttributeError, OSError, TypeError):
+            # no libc or no inotify_init1 in it (not linux)
+            return False
+        thread = Thread(target=self._loop)
+        thread.daemon = True
+        thread.start()
+        self.py3_wrapper.log("file watching enabled")
+        return True
+
+    def subscribe(self, py3_module, path, events=None, callback=None):
+        """
+        Subscribe the given module to changes of path, which can be a
+        directory, a file or a glob on file names.
+
+        Here we will lazy load the watcher if necessary and return success or
+        failure.
+        """
+        events = events or DEFAULT_EVENTS
+        invalid = set(events) - set(EVENTS)
+        if invalid:
+            self.py3_wrapper.log(
+                "module %s: invalid file watch events %s"
+                % (py3_module.module_full_name, ", ".join(sorted(invalid)))
+            )
+            return False
+        mask = 0
+        for event in events:
+            mask |= EVENTS[event]
+        path = os.path.abspath(os.path.expanduser(path))
+        if os.path.isdir(path):
+            directory, pattern = path, None
+        else:
+            directory, pattern = os.path.split(path)
+        with self.lock:
+            if self.inotify_available is None:
+                self.inotify_available = self._setup_inotify()
+            if not self.inotify_available:
+                self.py3_wrapper.log(
+                    "inotify not available: module %s not watching %s"
+                    % (py3_module.module_full_name, path)
+                )
+                return False
+            try:
+                wd = self.inotify.add_watch(
+                    directory, mask | IN_MASK_ADD | IN_DELETE_SELF | IN_MOVE_SELF
+                )
+            except OSError as e:
+                # eg a glob in the directory name or a missing directory
+                self.py3_wrapper.log(
+                    "module %s: cannot watch %s (%s)"
+                    % (py3_module.module_full_name, path, e.strerror)
+                )
+                return False
+            watch = (py3_module, pattern, mask, callback)
+            self.directories[wd] = directory
+            self.watches.setdefault(wd, []).append(watch)
+        self.py3_wrapper.log(
+            "module %s watching %s" % (py3_module.module_full_name, path)
+        )
+        return True
+
+    def _watches(self, events):
+        """
+        Return the (py3_module, callback) of the watches matching the events.
+        """
+        watches = set()
+        with self.lock:
+            for wd, mask, name in events:
+                if mask & IN_Q_OVERFLOW:
+                    # we missed events, update everyone
+                    for items in self.watches.values():
+                        watches.update((x[0], x[3]) for x in items)
+                    continue
+                for watch in self.watches.get(wd, []):
+                    py3_module, pattern, module_mask, callback = watch
+                    if not name:
+                        # the directory itself went away
+                        if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                            watches.add((py3_module, callback))
+                    elif mask & module_mask and (
+                        pattern is None or fnmatch(name, pattern)
+                    ):
+                        watches.add((py3_module, callback))
+                if mask & IN_IGNORED and wd in self.watches:
+                    # the watch was removed, the directory is gone
+                    directory = self.directories.pop(wd)
+                    self.missing.setdefault(directory, []).extend(self.watches.pop(wd))
+        return watches
+
+    def _rewatch(self):
+        """
+        Watch again the directories that are back and return the
+        (py3_module, callback) of their watches.
+        """
+        watches = set()
+        with self.lock:
+            for directory, items in list(self.missing.items()):
+                mask = IN_MASK_ADD | IN_DELETE_SELF | IN_MOVE_SELF
+                for item in items:
+                    mask |= item[2]
+                try:
+                    wd = self.inotify.add_watch(directory, mask)
+                except OSError:
+                    continue
+                del self.missing[directory]
+                self.directories[wd] = directory
+                self.watches.setdefault(wd, []).extend(items)
+                # the files may have changed while it was gone
+                watches.update((x[0], x[3]) for x in items)
+        return watches
+
+    def trigger_actions(self, watches):
+        """
+        Run the callbacks then refresh the modules, once each.
+        """
+        modules = set()
+        for py3_module, callback in watches:
+            if callback:
+                try:
+                    callback()
+                except Exception:
+                    self.py3_wrapper.report_exception(
+                        "file watch callback of %s" % py3_module.module_full_name
+                    )
+            modules.add(py3_module)
+        for py3_module in modules:
+            if self.py3_wrapper.config["debug"]:
+                self.py3_wrapper.log(
+                    "file change, refresh %s" % py3_module.module_full_name
+                )
+            py3_module.force_update()
+
+    def _loop(self):
+        watches = set()
+        deadline = retry = None
+        while self.py3_wrapper.running:
+            if self.missing and retry is None:
+                retry = time() + RETRY
+            timeouts = [max(x - time(), 0) for x in (deadline, retry) if x is not None]
+            timeout = min(timeouts) if timeouts else None
+            if select.select([self.inotify], [], [], timeout)[0]:
+                watches |= self._watches(self.inotify.read())
+            if retry is not None and time() >= retry:
+                watches |= self._rewatch()
+                retry = None
+            if watches and deadline is None:
+                deadline = time() + COALESCE
+            elif deadline is not None and time() >= deadline:
+                self.trigger_actions(watches)
+                watches = set()
+                deadline = None
@@ -0,0 +1,352 @@
+import json
+import locale
+import os
+import select
+import signal
+import socket
+
+from array import array
+from subprocess import STDOUT
+from threading import Lock
+
+MAX_SIZE = 256 * 1024
+
+# signals the fork server ignores or handles that commands should not inherit
+RESET_SIGNALS = [signal.SIGCHLD, signal.SIGINT, signal.SIGTSTP, signal.SIGUSR1]
+
+
+class ForkServerError(Exception):
+    """
+    The fork server could not be used to spawn a command.
+    """
+
+
+def send_fds(sock, data, fds):
+    """
+    Send data along with some file descriptors over a unix socket.
+    """
+    ancillary = [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array("i", fds))]
+    sock.sendmsg([data], ancillary)
+
+
+def recv_fds(sock, max_fds):
+    """
+    Receive data and any file descriptors sent with it over a unix socket.
+    """
+    fds = array("i")
+    data, ancillary, flags, address = sock.recvmsg(
+        MAX_SIZE, socket.CMSG_SPACE(max_fds * fds.itemsize)
+    )
+    for level, kind, cmsg_data in ancillary:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            size = len(cmsg_data) - (len(cmsg_data) % fds.itemsize)
+            fds.frombytes(cmsg_data[:size])
+    return data, list(fds)
+
+
+def serve(sock):
+    """
+    Main loop of the fork server process.
+
+    Requests to spawn a command arrive on sock with the file descriptors to
+    use for the command's stdout and stderr and a socket to reply on.  The
+    pid of the command is sent back on the reply socket and later its return
+    code once it has finished.
+    """
+    # we are woken up on SIGCHLD so that we can reap our children
+    wakeup_read, wakeup_write = os.pipe()
+    os.set_blocking(wakeup_write, False)
+    signal.set_wakeup_fd(wakeup_write)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+    for signum in [signal.SIGINT, signal.SIGTSTP, signal.SIGUSR1]:
+        signal.signal(signum, signal.SIG_IGN)
+
+    children = {}
+    poller = select.poll()
+    poller.register(sock, select.POLLIN)
+    poller.register(wakeup_read, select.POLLIN)
+    while True:
+        for fd, event in poller.poll():
+            if fd == wakeup_read:
+                os.read(wakeup_read, 512)
+            elif not spawn(sock, children):
+                # py3status has gone away
+                return
+        reap(children)
+
+
+def spawn(sock, children):
+    """
+    Spawn the requested command.  Returns False if the request socket has
+    been closed.
+    """
+    data, fds = recv_fds(sock, 3)
+    if not data:
+        return False
+    for fd in fds:
+        os.set_inheritable(fd, False)
+    stdout, stderr, reply_fd = fds
+    reply = socket.socket(fileno=reply_fd)
+    request = json.loads(data.decode("utf-8"))
+    args = request["args"]
+    env = request["env"]
+    if env is None:
+        env = os.environ
+    file_actions = [
+        (os.POSIX_SPAWN_OPEN, 0, os.devnull, os.O_RDONLY, 0),
+        (os.POSIX_SPAWN_DUP2, stdout, 1),
+        (os.POSIX_SPAWN_DUP2, stderr, 2),
+    ]
+    try:
+        pid = os.posix_spawnp(
+            args[0],
+            args,
+            env,
+            file_actions=file_actions,
+            setsid=request["setsid"],
+            setsigdef=RESET_SIGNALS,
+        )
+    except OSError as e:
+        reply.send(json.dumps({"errno": e.errno, "error": str(e)}).encode("utf-8"))
+        reply.close()
+    else:
+        reply.send(json.dumps({"pid": pid}).encode("utf-8"))
+        children[pid] = reply
+    finally:
+        os.close(stdout)
+        if stderr != stdout:
+            os.close(stderr)
+    return True
+
+
+def reap(children):
+    """
+    Send the return code of any finished children.
+    """
+    while children:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if not pid:
+            return
+        reply = children.pop(pid, None)
+        if reply is None:
+            continue
+        if os.WIFSIGNALED(status):
+            returncode = -os.WTERMSIG(status)
+        else:
+            returncode = os.WEXITSTATUS(status)
+        try:
+            reply.send(json.dumps({"returncode": returncode}).encode("utf-8"))
+        except OSError:
+            pass
+        reply.close()
+
+
+class ForkServerProcess:
+    """
+    A minimal Popen like object for a command spawned by the fork server.
+    """
+
+    def __init__(self, pid, stdout, stderr, reply, universal_newlines):
+        self.pid = pid
+        self.reply = reply
+        self.returncode = None
+        self.stderr = stderr
+        self.stdout = stdout
+        self.universal_newlines = universal_newlines
+
+    def __del__(self):
+        # pipes not read by communicate() must still be closed
+        for fd in [self.stdout, self.stderr]:
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self.reply.close()
+
+    def _set_returncode(self, data):
+        if not data:
+            # the fork server died so we cannot know
+            self.returncode = -signal.SIGKILL
+        else:
+            self.returncode = json.loads(data.decode("utf-8"))["returncode"]
+        self.reply.close()
+
+    def poll(self):
+        if self.returncode is None:
+            try:
+                data = self.reply.recv(MAX_SIZE, socket.MSG_DONTWAIT)
+            except (BlockingIOError, InterruptedError):
+                return None
+            self._set_returncode(data)
+        return self.returncode
+
+    def wait(self):
+        if self.returncode is None:
+            self._set_returncode(self.reply.recv(MAX_SIZE))
+        return self.returncode
+
+    def send_signal(self, signum):
+        if self.poll() is None:
+            os.kill(self.pid, signum)
+
+    def kill(self):
+        self.send_signal(signal.SIGKILL)
+
+    def communicate(self):
+        """
+        Read stdout and stderr until they are closed then wait for the
+        command to finish.
+        """
+        output = {}
+        poller = select.poll()
+        for fd in [self.stdout, self.stderr]:
+            if fd is not None:
+                output[fd] = []
+                poller.register(fd, select.POLLIN)
+        open_fds = len(output)
+        while open_fds:
+            for fd, event in poller.poll():
+                data = os.read(fd, 32768)
+                if data:
+                    output[fd].append(data)
+                else:
+                    poller.unregister(fd)
+                    open_fds -= 1
+
+        self.wait()
+        results = []
+        for fd in [self.stdout, self.stderr]:
+            if fd is None:
+                results.append(None)
+                continue
+            os.close(fd)
+            data = b"".join(output[fd])
+            if self.universal_newlines:
+                data = data.decode(locale.getpreferredencoding(False))
+                data = data.replace("\r\n", "\n").replace("\r", "\n")
+            results.append(data)
+        self.stdout = self.stderr = None
+        return tuple(results)
+
+
+class ForkServer:
+    """
+    A small helper process, forked before py3status has imported most of its
+    modules, that spawns commands for the modules.  py3status can use a lot of
+    memory so forking it for every command is not cheap.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.pid = None
+        self.running = False
+        self.sock = None
+
+    @staticmethod
+    def available():
+        """
+        os.posix_spawnp() is needed which was added in python 3.8
+        """
+        return hasattr(os, "posix_spawnp") and hasattr(socket, "SOCK_SEQPACKET")
+
+    def start(self):
+        """
+        Fork the server process.
+        """
+        sock, server_sock = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        pid = os.fork()
+        if pid == 0:
+            # the fork server must never write to i3bar or read its events
+            sock.close()
+            devnull = os.open(os.devnull, os.O_RDWR)
+            os.dup2(devnull, 0)
+            os.dup2(devnull, 1)
+            try:
+                serve(server_sock)
+            finally:
+                os._exit(0)
+        server_sock.close()
+        self.pid = pid
+        self.sock = sock
+        self.running = True
+
+    def stop(self):
+        """
+        Closing our socket makes the fork server exit.
+        """
+        self.running = False
+        if self.sock:
+            self.sock.close()
+        if self.pid:
+            try:
+                os.waitpid(self.pid, 0)
+            except OSError:
+                pass
+            self.pid = None
+
+    def popen(
+        self,
+        args,
+        stdout=None,
+        stderr=None,
+        universal_newlines=False,
+        shell=False,
+        env=None,
+        setsid=False,
+    ):
+        """
+        Spawn a command, stdout and stderr are always piped unless stderr is
+        STDOUT.  Returns a ForkServerProcess.
+
+        Raises OSError if the command could not be run and ForkServerError
+        if the fork server could not be used.
+        """
+        if isinstance(args, str):
+            args = [args]
+        if shell:
+            args = ["/bin/sh", "-c"] + list(args)
+
+        stdout_read, stdout_write = os.pipe()
+        if stderr == STDOUT:
+            stderr_read, stderr_write = None, stdout_write
+        else:
+            stderr_read, stderr_write = os.pipe()
+        reply, server_reply = socket.socketpair(
+            socket.AF_UNIX, socket.SOCK_SEQPACKET
+        )
+        request = {"args": list(args), "env": env, "setsid": setsid}
+        try:
+            fds = [stdout_write, stderr_write, server_reply.fileno()]
+            with self.lock:
+                send_fds(self.sock, json.dumps(request).encode("utf-8"), fds)
+        except (OSError, TypeError, ValueError) as e:
+            self.running = False
+            data = None
+            error = str(e)
+        else:
+            data = reply.recv(MAX_SIZE)
+            error = "fork server died"
+        finally:
+            # the fork server has its own copies of these
+            os.close(stdout_write)
+            if stderr_read is not None:
+                os.close(stderr_write)
+            server_reply.close()
+
+        result = json.loads(data.decode("utf-8")) if data else {}
+        if "pid" not in result:
+            os.close(stdout_read)
+            if stderr_read is not None:
+                os.close(stderr_read)
+            reply.close()
+            if "errno" in result:
+                raise OSError(result["errno"], result["error"])
+            self.running = False
+            raise ForkServerError(error)
+        return ForkServerProcess(
+            result["pid"], stdout_read, stderr_read, reply, universal_newlines
+        )
@@ -0,0 +1,228 @@
+import errno
+import os
+import re
+
+from collections import OrderedDict
+from fnmatch import fnmatch
+from glob import glob
+from threading import Lock
+
+from py3status.sysfs import SysfsReader
+
+SYS_PATH = "/sys"
+
+# hwmon attributes eg temp1_input, in0_max, fan2_alarm
+ATTRIBUTE = re.compile(
+    r"(temp|in|fan|pwm|power|curr|energy|humidity|intrusion)(\d+)_(\w+)$"
+)
+
+# sysfs units to the units shown by `sensors`
+SCALES = {"temp": 1000.0, "in": 1000.0, "curr": 1000.0, "humidity": 1000.0}
+SCALES.update({"power": 1000000.0, "energy": 1000000.0})
+UNSCALED = ("alarm", "beep", "enable", "fault", "type")
+
+ADAPTERS = {
+    "acpi": "ACPI interface",
+    "i2c": "I2C adapter",
+    "isa": "ISA adapter",
+    "pci": "PCI adapter",
+    "thermal": "Thermal zone",
+    "virtual": "Virtual device",
+}
+
+
+class Chip:
+    """
+    A hwmon chip (or thermal zone) and the files of its sensors.
+    """
+
+    def __init__(self, name, adapter):
+        self.adapter = adapter
+        self.name = name
+        # label: {key: (path, scale)}
+        self.sensors = OrderedDict()
+
+
+class Hwmon:
+    """
+    Native reader of the hardware sensors shown by `sensors -u`.
+
+    The chips, their sensors and labels are discovered once from
+    /sys/class/hwmon and /sys/class/thermal, then only the files of the
+    requested values are read.  They are discovered again if files go
+    missing, eg hwmonN being renumbered after a resume or a driver reload.
+    Chips are named like libsensors does, eg coretemp-isa-0000, although
+    sensors.conf is not used.
+    """
+
+    def __init__(self, sys_path=SYS_PATH):
+        self.chips = None
+        self.lock = Lock()
+        self.reader = SysfsReader()
+        self.sys_path = sys_path
+
+    def _read_text(self, path):
+        with open(path) as f:
+            return f.read().strip()
+
+    def _bus(self, hwmon_path):
+        """
+        Return the bus and address part of the chip name and the adapter.
+        """
+        device = os.path.join(hwmon_path, "device")
+        if not os.path.exists(device):
+            return "virtual-0", ADAPTERS["virtual"]
+        device_name = os.path.basename(os.path.realpath(device))
+        subsystem = os.path.join(device, "subsystem")
+        subsystem = os.path.basename(os.path.realpath(subsystem))
+        if subsystem == "pci":
+            domain, bus, slot_fn = device_name.split(":")
+            slot, fn = slot_fn.split(".")
+            address = (
+                (int(domain, 16) << 16) + (int(bus, 16) << 8) + (int(slot, 16) << 3)
+            ) + int(fn, 16)
+            return "pci-{:04x}".format(address), ADAPTERS["pci"]
+        if subsystem == "platform":
+            address = device_name.rpartition(".")[2]
+            address = int(address) if address.isdigit() else 0
+            return "isa-{:04x}".format(address), ADAPTERS["isa"]
+        if subsystem == "i2c":
+            bus, address = device_name.split("-")
+            return "i2c-{}-{:x}".format(bus, int(address, 16)), ADAPTERS["i2c"]
+        if subsystem == "acpi":
+            return "acpi-0", ADAPTERS["acpi"]
+        return "virtual-0", ADAPTERS["virtual"]
+
+    def _discover_hwmon(self, hwmon_path):
+        # old kernels have the attributes on the device
+        attributes_path = hwmon_path
+        if not os.path.exists(os.path.join(hwmon_path, "name")):
+            attributes_path = os.path.join(hwmon_path, "device")
+        try:
+            name = self._read_text(os.path.join(attributes_path, "name"))
+        except (IOError, OSError):
+            return None
+        bus, adapter = self._bus(hwmon_path)
+        chip = Chip("{}-{}".format(name, bus), adapter)
+
+        features = {}
+        for filename in sorted(os.listdir(attributes_path)):
+            match = ATTRIBUTE.match(filename)
+            if not match:
+                continue
+            kind, number, key = match.groups()
+            feature = features.setdefault((kind, int(number)), OrderedDict())
+            feature[key] = os.path.join(attributes_path, filename)
+
+        # sorted like sensors does, by type then number
+        for (kind, number), attributes in sorted(features.items()):
+            label = "{}{}".format(kind, number)
+            if "label" in attributes:
+                try:
+                    label = self._read_text(attributes.pop("label"))
+                except (IOError, OSError):
+                    pass
+            sensor = chip.sensors.setdefault(label, OrderedDict())
+            keys = sorted(attributes, key=lambda x: (x != "input", x))
+            for key in keys:
+                if key.endswith(UNSCALED):
+                    scale = 1.0
+                else:
+                    scale = SCALES.get(kind, 1.0)
+                sensor[key] = (attributes[key], scale)
+        return chip
+
+    def _discover_thermal(self, zone_path, hwmon_names):
+        try:
+            kind = self._read_text(os.path.join(zone_path, "type"))
+        except (IOError, OSError):
+            return None
+        if kind in hwmon_names:
+            # the zone already has a hwmon chip
+            return None
+        number = zone_path.rpartition("thermal_zone")[2]
+        chip = Chip("{}-thermal-{}".format(kind, number), ADAPTERS["thermal"])
+        sensor = chip.sensors.setdefault("temp1", OrderedDict())
+        sensor["input"] = (os.path.join(zone_path, "temp"), 1000.0)
+        for trip_type in sorted(glob(os.path.join(zone_path, "trip_point_*_type"))):
+            try:
+                if self._read_text(trip_type) == "critical":
+                    path = trip_type[: -len("type")] + "temp"
+                    sensor.setdefault("crit", (path, 1000.0))
+            except (IOError, OSError):
+                pass
+        return chip
+
+    def discover(self):
+        """
+        Find all the chips and their sensors.
+        """
+        chips = []
+        pattern = os.path.join(self.sys_path, "class", "hwmon", "hwmon*")
+        for hwmon_path in sorted(glob(pattern), key=self._natural_key):
+            chip = self._discover_hwmon(hwmon_path)
+            if chip:
+                chips.append(chip)
+        hwmon_names = set(chip.name.split("-")[0] for chip in chips)
+        pattern = os.path.join(self.sys_path, "class", "thermal", "thermal_zone*")
+        for zone_path in sorted(glob(pattern), key=self._natural_key):
+            chip = self._discover_thermal(zone_path, hwmon_names)
+            if chip:
+                chips.append(chip)
+        return chips
+
+    @staticmethod
+    def _natural_key(path):
+        # hwmon10 after hwmon9
+        return [int(x) if x.isdigit() else x for x in re.split(r"(\d+)", path)]
+
+    def read(self, chips=None, keys=None, retry=True):
+        """
+        Return a list of chips, each a dict with name, adapter and sensors,
+        an OrderedDict of sensor label to an OrderedDict of its values as
+        strings formatted like `sensors -u` does.
+
+        :param chips: fnmatch patterns of the chips wanted, None for all
+        :param keys: values wanted eg ["input", "max"], None for all
+        """
+        with self.lock:
+            if self.chips is None:
+                self.chips = self.discover()
+            found = self.chips
+        result = []
+        missing = False
+        for chip in found:
+            if chips and not any(fnmatch(chip.name, x) for x in chips):
+                continue
+            sensors = OrderedDict()
+            for label, attributes in chip.sensors.items():
+                values = OrderedDict()
+                for key, (path, scale) in attributes.items():
+                    if keys is not None and key not in keys:
+                        continue
+                    try:
+                        value = float(self.reader.read(path)) / scale
+                    except (IOError, OSError) as e:
+                        # not readable eg a disabled sensor, or gone
+                        if e.errno in (errno.ENOENT, errno.ENODEV):
+                            missing = True
+                        continue
+                    except ValueError:
+                        continue
+                    values[key] = "{:.3f}".format(value)
+                sensors[label] = values
+            result.append(
+                {"name": chip.name, "adapter": chip.adapter, "sensors": sensors}
+            )
+        if missing and retry:
+            # the chips have changed
+            self.reset()
+            return self.read(chips, keys, retry=False)
+        return result
+
+    def reset(self):
+        """
+        Discover the chips again on the next read.
+        """
+        with self.lock:
+            self.chips = None
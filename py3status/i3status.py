@@ -7,12 +7,13 @@ from subprocess import Popen
 from subprocess import PIPE
 from signal import SIGTSTP, SIGSTOP, SIGUSR1, SIG_IGN, signal
 from tempfile import NamedTemporaryFile
-from threading import Thread
+from threading import Event, Thread
 from time import time
 
 from py3status.profiling import profile
-from py3status.py3 import Py3
 from py3status.events import IOPoller
+from py3status.i3status_native import get_native_module
+from py3status.metrics import Metrics
 from py3status.constants import (
     I3S_ALLOWED_COLORS,
     I3S_COLOR_MODULES,
@@ -21,6 +22,13 @@ from py3status.constants import (
     TZTIME_FORMAT,
 )
 
+# i3status is restarted after 1s, 2s, 4s... at most 60s when it dies
+RESTART_DELAY = 1
+RESTART_DELAY_MAX = 60
+# dying that fast after being started means something is wrong
+FAST_FAIL = 5
+MAX_FAST_FAILURES = 5
+
 
 class Tz(tzinfo):
     """
@@ -47,6 +55,77 @@ class Tz(tzinfo):
         # we have no idea if daylight savings, so just say no kids
         return timedelta(0)
 
+    def __eq__(self, other):
+        return isinstance(other, Tz) and (self._name, self._offset) == (
+            other._name,
+            other._offset,
+        )
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((self._name, self._offset))
+
+
+def format_time(date, time_format):
+    """
+    strftime, time_format is only unicode in python 2 if it needs to be.
+    """
+    if isinstance(time_format, str):
+        return date.strftime(time_format)
+    return date.strftime(time_format.encode("utf-8")).decode("utf-8")
+
+
+def next_tick(now, time_delta):
+    """
+    When the time shown with a precision of time_delta seconds changes.
+    """
+    return now - now % time_delta + time_delta
+
+
+class TimeTicker:
+    """
+    A single scheduled task updating all the time and tztime modules.
+
+    The clock is read once per tick and a module is only formatted again when
+    its output can change, eg once a minute for "%H:%M".  Modules with the
+    same format and time zone share the formatting.
+    """
+
+    def __init__(self, i3status):
+        self.i3status = i3status
+        self.modules = []
+
+    def add(self, module):
+        module.time_due = 0
+        self.modules.append(module)
+        # run now so that the module gets its time
+        self.i3status.py3_wrapper.timeout_queue_add(self)
+
+    def run(self):
+        now = time()
+        dates = {}
+        values = {}
+        updates = []
+        due = None
+        for module in self.modules:
+            if module.time_due <= now:
+                key = (module.time_format, module.tz)
+                if key not in values:
+                    if module.tz not in dates:
+                        dates[module.tz] = datetime.fromtimestamp(now, module.tz)
+                    values[key] = format_time(dates[module.tz], module.time_format)
+                if module.set_time_value(values[key]):
+                    updates.append(module.module_name)
+                module.time_due = next_tick(now, module.time_delta)
+            if due is None or module.time_due < due:
+                due = module.time_due
+        if updates:
+            self.i3status._json_list = None
+            self.i3status.py3_wrapper.notify_update(updates)
+        self.i3status.py3_wrapper.timeout_queue_add(self, due)
+
 
 class I3statusModule:
     """
@@ -91,18 +170,19 @@ class I3statusModule:
             self.setup_time_module()
 
     def setup_time_module(self):
-        self.py3 = Py3()
         self.tz = None
         self.set_time_format()
         # we need to check the timezone this is when the check is next due
         self.time_zone_check_due = 0
         self.time_started = False
+        # when the time ticker next needs to format our time
+        self.time_due = 0
 
         time_format = self.time_format
 
         if "%f" in time_format:
-            # microseconds
-            time_delta = 0
+            # microseconds, as often as is sensible
+            time_delta = 0.1
         elif "%S" in time_format:
             # seconds
             time_delta = 1
@@ -128,17 +208,6 @@ class I3statusModule:
     def get_latest(self):
         return [self.item.copy()]
 
-    def run(self):
-        """
-        updates the modules output.
-        Currently only time and tztime need to do this
-        """
-        if self.update_time_value():
-            self.i3status.py3_wrapper.notify_update(self.module_name)
-        due_time = self.py3.time_in(sync_to=self.time_delta)
-
-        self.i3status.py3_wrapper.timeout_queue_add(self, due_time)
-
     def update_from_item(self, item):
         """
         Update from i3status output. returns if item has changed.
@@ -177,7 +246,7 @@ class I3statusModule:
                     self.time_zone_check_due = ((int(t) // 1800) * 1800) + 1800
                 if not self.time_started:
                     self.time_started = True
-                    self.i3status.py3_wrapper.timeout_queue_add(self)
+                    self.i3status.time_ticker.add(self)
             is_updated = False
             # update time to be shown
         return is_updated
@@ -189,17 +258,15 @@ class I3statusModule:
         # Not sure if i3status supports this but docs say it does
         if "format_time" in config:
             time_format = time_format.replace("%time", config["format_time"])
+        try:
+            # python 2, only use unicode if needed
+            time_format = str(time_format)
+        except UnicodeEncodeError:
+            pass
         self.time_format = time_format
 
-    def update_time_value(self):
-        date = datetime.now(self.tz)
+    def set_time_value(self, new_value):
         # set the full_text with the correctly formatted date
-        try:
-            new_value = date.strftime(self.time_format)
-        except:  # noqa e722
-            # python 2 unicode
-            new_value = date.strftime(self.time_format.encode("utf-8"))
-            new_value = new_value.decode("utf-8")
         updated = self.item["full_text"] != new_value
         if updated:
             self.item["full_text"] = new_value
@@ -237,15 +304,20 @@ class I3statusModule:
         ) - datetime(utcnow.year, utcnow.month, utcnow.day, utcnow.hour, utcnow.minute)
         # create our custom timezone
         try:
-            self.tz = Tz(i3s_time_tz, delta)
+            tz = Tz(i3s_time_tz, delta)
         except ValueError:
             return False
+        if tz != self.tz:
+            self.tz = tz
+            # format our time again on the next tick
+            self.time_due = 0
         return True
 
 
 class I3status(Thread):
     """
     This class is responsible for spawning i3status and reading its output.
+    i3status modules with a native version are run by us instead.
     """
 
     def __init__(self, py3_wrapper):
@@ -255,19 +327,27 @@ class I3status(Thread):
         Thread.__init__(self)
         self.error = None
         self.i3modules = {}
+        self.i3s_modules = []
         self.i3status_pipe = None
         self.i3status_path = py3_wrapper.config["i3status_path"]
-        self.json_list = None
+        self._json_list = None
         self.json_list_ts = None
         self.last_output = None
         self.last_refresh_ts = time()
         self.lock = py3_wrapper.lock
+        self.metrics = Metrics()
+        self.native_due = 0
+        self.native_errors = set()
+        self.native_modules = {}
+        self.native_refresh = Event()
         self.new_update = False
         self.py3_config = py3_wrapper.config["py3_config"]
         self.py3_wrapper = py3_wrapper
         self.ready = False
+        self.ready_event = Event()
         self.standalone = py3_wrapper.config["standalone"]
         self.time_modules = []
+        self.time_ticker = TimeTicker(self)
         self.tmpfile_path = None
         self.update_due = 0
 
@@ -282,20 +362,55 @@ class I3status(Thread):
         """
         Do any setup work needed to run i3status modules
         """
+        native_modules = self.py3_config.get("i3s_native_modules", [])
         for conf_name in self.py3_config["i3s_modules"]:
             module = I3statusModule(conf_name, self)
             self.i3modules[conf_name] = module
             if module.is_time_module:
                 self.time_modules.append(module)
+            if conf_name in native_modules:
+                native = get_native_module(
+                    conf_name, self.py3_config[conf_name], self.py3_config["general"]
+                )
+                if native:
+                    self.native_modules[conf_name] = native
+                    continue
+            # i3status has to run this one
+            self.i3s_modules.append(conf_name)
+
+    @property
+    def json_list(self):
+        """
+        The items of the i3status modules, native ones included, in their
+        config order, passed to legacy modules.  They get a copy made once
+        per output so that they can modify it without altering our output,
+        their changes are discarded with the next output.
+        """
+        json_list = self._json_list
+        if json_list is None:
+            items = [self.i3modules[x].item for x in self.py3_config["i3s_modules"]]
+            json_list = self._json_list = deepcopy(items)
+        return json_list
 
     def set_responses(self, json_list):
         """
         Set the given i3status responses on their respective configuration.
+
+        Only the items which changed since the last output are copied and
+        passed on to their module.
         """
-        self.update_json_list()
+        self._json_list = None
+        last_output = self.last_output or []
+        if len(json_list) != len(last_output):
+            # first output or the modules changed, everything is new
+            last_output = []
+        self.last_output = json_list
         updates = []
-        for index, item in enumerate(self.json_list):
-            conf_name = self.py3_config["i3s_modules"][index]
+        for index, item in enumerate(json_list):
+            if index < len(last_output) and last_output[index] == item:
+                continue
+            item = deepcopy(item)
+            conf_name = self.i3s_modules[index]
 
             module = self.i3modules[conf_name]
             if module.update_from_item(item):
@@ -303,15 +418,6 @@ class I3status(Thread):
         if updates:
             self.py3_wrapper.notify_update(updates)
 
-    def update_json_list(self):
-        """
-        Copy the last json list output from i3status so that any module
-        can modify it without altering the original output.
-        This is done so that any module's alteration of a i3status output json
-        will not be overwritten when the next i3status output gets polled.
-        """
-        self.json_list = deepcopy(self.last_output)
-
     @staticmethod
     def write_in_tmpfile(text, tmpfile):
         """
@@ -330,11 +436,11 @@ class I3status(Thread):
         based on the parsed one from 'i3status_config_path'.
         """
         # order += ...
-        for module in self.py3_config["i3s_modules"]:
+        for module in self.i3s_modules:
             self.write_in_tmpfile('order += "%s"\n' % module, tmpfile)
         self.write_in_tmpfile("\n", tmpfile)
         # config params for general section and each module
-        for section_name in ["general"] + self.py3_config["i3s_modules"]:
+        for section_name in ["general"] + self.i3s_modules:
             section = self.py3_config[section_name]
             self.write_in_tmpfile("%s {\n" % section_name, tmpfile)
             for key, value in section.items():
@@ -370,81 +476,187 @@ class I3status(Thread):
                 self.py3_wrapper.log("refreshing i3status")
             if self.i3status_pipe:
                 self.i3status_pipe.send_signal(SIGUSR1)
+            if self.native_modules:
+                self.native_due = 0
+                self.native_refresh.set()
             self.last_refresh_ts = time()
 
-    @profile
-    def run(self):
-        # if the i3status process dies we want to restart it.
-        # We give up restarting if we have died too often
-        for x in range(10):
-            if not self.py3_wrapper.running:
-                break
-            self.spawn_i3status()
-            # check if we never worked properly and if so quit now
-            if not self.ready:
-                break
-            # limit restart rate
-            self.lock.wait(5)
+    def update_native_modules(self):
+        """
+        Get the output of the native modules like i3status would.
+        """
+        self._json_list = None
+        updates = []
+        for conf_name, native in self.native_modules.items():
+            try:
+                item = native.output()
+            except Exception:
+                # only tell the user once
+                if conf_name not in self.native_errors:
+                    self.native_errors.add(conf_name)
+                    msg = "native i3status module `{}` failed".format(conf_name)
+                    self.py3_wrapper.report_exception(msg)
+                continue
+            if self.i3modules[conf_name].update_from_item(item):
+                updates.append(conf_name)
+        if updates:
+            self.py3_wrapper.notify_update(updates)
 
-    def spawn_i3status(self):
+    def run_native_modules(self):
         """
-        Spawn i3status using a self generated config file and poll its output.
+        Update the native modules every interval, in sync with the clock like
+        i3status.
         """
+        interval = self.update_interval
+        while self.py3_wrapper.running:
+            now = time()
+            if not self.py3_wrapper.i3bar_running:
+                # nobody sees us, check regularly if the bar is continued
+                timeout = 0.5
+            else:
+                if now >= self.native_due:
+                    self.update_native_modules()
+                    self.set_ready()
+                    self.native_due = now + interval - now % interval
+                # wake up regularly to notice when we are stopped
+                timeout = min(self.native_due - now, 0.5)
+            self.native_refresh.wait(timeout)
+            self.native_refresh.clear()
+
+    @profile
+    def run(self):
         try:
+            if self.native_modules:
+                if self.py3_wrapper.config["debug"]:
+                    self.py3_wrapper.log(
+                        "native i3status modules {}".format(
+                            ", ".join(self.native_modules)
+                        )
+                    )
+                if not self.i3s_modules:
+                    # no need for i3status
+                    self.run_native_modules()
+                    return
+                thread = Thread(target=self.run_native_modules)
+                thread.daemon = True
+                thread.start()
+
+            # the config does not change, it is reused when restarting
             with NamedTemporaryFile(prefix="py3status_") as tmpfile:
                 self.write_tmp_i3status_config(tmpfile)
-
-                i3status_pipe = Popen(
-                    [self.i3status_path, "-c", tmpfile.name],
-                    stdout=PIPE,
-                    stderr=PIPE,
-                    # Ignore the SIGTSTP signal for this subprocess
-                    preexec_fn=lambda: signal(SIGTSTP, SIG_IGN),
-                )
-
-                self.py3_wrapper.log(
-                    "i3status spawned using config file {}".format(tmpfile.name)
-                )
-
-                self.poller_inp = IOPoller(i3status_pipe.stdout)
-                self.poller_err = IOPoller(i3status_pipe.stderr)
                 self.tmpfile_path = tmpfile.name
+                self.supervise()
+        finally:
+            # whatever happened nobody should wait for us to be ready now
+            self.ready_event.set()
 
-                # Store the pipe so we can signal it
-                self.i3status_pipe = i3status_pipe
-
-                try:
-                    # loop on i3status output
-                    while self.py3_wrapper.running:
-                        line = self.poller_inp.readline()
-                        if line:
-                            # remove leading comma if present
-                            if line[0] == ",":
-                                line = line[1:]
-                            if line.startswith("[{"):
-                                json_list = loads(line)
-                                self.last_output = json_list
-                                self.set_responses(json_list)
-                                self.ready = True
-                        else:
-                            err = self.poller_err.readline()
-                            code = i3status_pipe.poll()
-                            if code is not None:
-                                msg = "i3status died"
-                                if err:
-                                    msg += " and said: {}".format(err)
-                                else:
-                                    msg += " with code {}".format(code)
-                                raise IOError(msg)
-                except IOError:
-                    err = sys.exc_info()[1]
-                    self.error = err
-                    self.py3_wrapper.log(err, "error")
+    def supervise(self):
+        """
+        Run i3status and restart it when it dies, waiting longer each time it
+        dies again soon.  We give up if it never worked or if it keeps dying
+        right after being started.
+        """
+        worked = False
+        failures = 0
+        fast_failures = 0
+        while self.py3_wrapper.running:
+            started = time()
+            worked = self.spawn_i3status() or worked
+            duration = time() - started
+            self.metrics.record("run_duration", duration)
+            if not worked or not self.py3_wrapper.running:
+                break
+            if duration < FAST_FAIL:
+                self.metrics.increment("fast_failures")
+                fast_failures += 1
+                if fast_failures >= MAX_FAST_FAILURES:
+                    self.error = "i3status keeps dying, giving up: {}".format(
+                        self.error
+                    )
+                    break
+            else:
+                fast_failures = 0
+            if duration > RESTART_DELAY_MAX:
+                # it had been running fine for a while
+                failures = 0
+            delay = min(RESTART_DELAY * 2 ** failures, RESTART_DELAY_MAX)
+            failures += 1
+            self.metrics.increment("restarts")
+            self.metrics.record("restart_delay", delay)
+            self.py3_wrapper.log("restarting i3status in {}s".format(delay))
+            self.lock.wait(delay)
+        # if we were never ready py3status tells the user itself
+        if self.ready and self.py3_wrapper.running:
+            self.py3_wrapper.notify_user(self.error or "i3status died")
+
+    def set_ready(self):
+        if not self.ready:
+            self.ready = True
+            self.ready_event.set()
+
+    def spawn_i3status(self):
+        """
+        Spawn i3status using our generated config file and poll its output.
+        Returns True if i3status gave us its output.
+        """
+        worked = False
+        try:
+            i3status_pipe = Popen(
+                [self.i3status_path, "-c", self.tmpfile_path],
+                stdout=PIPE,
+                stderr=PIPE,
+                # Ignore the SIGTSTP signal for this subprocess
+                preexec_fn=lambda: signal(SIGTSTP, SIG_IGN),
+            )
+
+            self.py3_wrapper.log(
+                "i3status spawned using config file {}".format(self.tmpfile_path)
+            )
+
+            self.poller_inp = IOPoller(i3status_pipe.stdout)
+            self.poller_err = IOPoller(i3status_pipe.stderr)
+
+            # Store the pipe so we can signal it
+            self.i3status_pipe = i3status_pipe
+
+            try:
+                # loop on i3status output
+                last_line = None
+                while self.py3_wrapper.running:
+                    line = self.poller_inp.readline()
+                    if line:
+                        # remove leading comma if present
+                        if line[0] == ",":
+                            line = line[1:]
+                        # nothing changed, no need to parse it
+                        if line == last_line:
+                            self._json_list = None
+                            continue
+                        if line.startswith("[{"):
+                            last_line = line
+                            self.set_responses(loads(line))
+                            worked = True
+                            self.set_ready()
+                    else:
+                        err = self.poller_err.readline()
+                        code = i3status_pipe.poll()
+                        if code is not None:
+                            msg = "i3status died"
+                            if err:
+                                msg += " and said: {}".format(err)
+                            else:
+                                msg += " with code {}".format(code)
+                            raise IOError(msg)
+            except IOError:
+                err = sys.exc_info()[1]
+                self.error = err
+                self.py3_wrapper.log(err, "error")
         except OSError:
             self.error = "Problem starting i3status maybe it is not installed"
         except Exception:
             self.py3_wrapper.report_exception("", notify_user=True)
         self.i3status_pipe = None
+        return worked
 
     def mock(self):
         """
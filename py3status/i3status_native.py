@@ -0,0 +1,452 @@
+"""
+Python implementations of the most used i3status modules.
+
+They take the same configuration as i3status and give the same output so
+that, when all the i3status modules of a config have a native version,
+py3status does not need to run i3status at all.
+"""
+from __future__ import division
+
+import os
+import re
+
+from datetime import datetime, timedelta
+from time import strftime
+
+from py3status import netlink
+from py3status.constants import TZTIME_FORMAT
+from py3status.py3 import Py3
+
+try:
+    # Python 3.9+
+    from zoneinfo import ZoneInfo
+except ImportError:
+    ZoneInfo = None
+
+# /proc samples are shared with the py3status modules reading them
+SAMPLE_INTERVAL = 0.5
+
+UNIT_PREFIXES = {"K": 1, "M": 2, "G": 3, "T": 4}
+
+BYTES_SYMBOLS = {
+    "binary": (1024, ["B", "KiB", "MiB", "GiB", "TiB"], " "),
+    "decimal": (1000, ["B", "kB", "MB", "GB", "TB"], " "),
+    "custom": (1024, ["", "K", "M", "G", "T"], ""),
+}
+
+
+def format_bytes(value, prefix_type="binary", decimals=1):
+    """
+    Human readable bytes, like i3status.
+    """
+    base, symbols, space = BYTES_SYMBOLS.get(prefix_type, BYTES_SYMBOLS["binary"])
+    exponent = 0
+    while value >= base and exponent < len(symbols) - 1:
+        value /= base
+        exponent += 1
+    return "{:.{}f}{}{}".format(value, decimals, space, symbols[exponent])
+
+
+def parse_bytes(value, total=None):
+    """
+    Bytes from a threshold like "10%" (of total), "512M" or "1G".
+    """
+    value = "{}".format(value).strip()
+    if value.endswith("%"):
+        return float(value[:-1]) * (total or 0) / 100
+    exponent = UNIT_PREFIXES.get(value[-1:].upper())
+    if exponent:
+        return float(value[:-1]) * 1024 ** exponent
+    return float(value)
+
+
+def expand(format, placeholders):
+    """
+    Replace the %placeholders of an i3status format, longest names first so
+    that eg %percentage_used is not taken for %percentage.
+    """
+    names = sorted(placeholders, key=len, reverse=True)
+    regex = re.compile("%({})".format("|".join(re.escape(x) for x in names)))
+    return regex.sub(lambda x: "{}".format(placeholders[x.group(1)]), format)
+
+
+class NativeModule:
+    """
+    Base of the native i3status modules, they define output() which returns
+    the item i3status would give.
+    """
+
+    def __init__(self, module_name, config, general):
+        self.config = config
+        self.general = general
+        parts = module_name.split(" ", 1)
+        self.instance = parts[1] if len(parts) > 1 else ""
+        self.setup()
+
+    def setup(self):
+        pass
+
+    def available(self):
+        """
+        Can this module be run natively on this system?
+        """
+        return True
+
+    def get(self, key, default=None):
+        return self.config.get(key, default)
+
+    def item(self, full_text, color=None):
+        item = {"full_text": full_text}
+        if color and self.general.get("colors"):
+            item["color"] = self.general["color_" + color]
+        return item
+
+
+class CpuUsage(NativeModule):
+    def setup(self):
+        self.last = None
+
+    def output(self):
+        newer_than = self.last.time if self.last else None
+        sample = Py3._proc_sampler.get("stat", SAMPLE_INTERVAL, newer_than)
+        placeholders = {}
+        for cpu, times in sample.data.items():
+            usage = 0
+            if self.last and cpu in self.last.data:
+                # user, nice, system, idle
+                last = self.last.data[cpu]
+                total = sum(times[:4]) - sum(last[:4])
+                busy = sum(times[:3]) - sum(last[:3])
+                if total > 0:
+                    usage = busy * 100 // total
+            placeholders["usage" if cpu == "cpu" else cpu] = "{:02d}%".format(usage)
+        self.last = sample
+
+        usage = int(placeholders["usage"][:-1])
+        format = self.get("format", "%usage")
+        color = None
+        if usage > self.get("max_threshold", 95):
+            format = self.get("format_above_threshold", format)
+            color = "bad"
+        elif usage > self.get("degraded_threshold", 90):
+            format = self.get("format_above_degraded_threshold", format)
+            color = "degraded"
+        return self.item(expand(format, placeholders), color)
+
+
+class Load(NativeModule):
+    def output(self):
+        loads = os.getloadavg()
+        placeholders = {
+            "1min": "{:1.2f}".format(loads[0]),
+            "5min": "{:1.2f}".format(loads[1]),
+            "15min": "{:1.2f}".format(loads[2]),
+        }
+        format = self.get("format", "%1min")
+        color = None
+        if loads[0] > float(self.get("max_threshold", 5)):
+            format = self.get("format_above_threshold", format)
+            color = "bad"
+        return self.item(expand(format, placeholders), color)
+
+
+class Disk(NativeModule):
+    def output(self):
+        path = self.instance
+        not_mounted = self.get("format_not_mounted")
+        try:
+            stat = os.statvfs(path)
+        except OSError:
+            stat = None
+        if stat is None or (not_mounted is not None and not os.path.ismount(path)):
+            return self.item(not_mounted or "")
+
+        total = stat.f_blocks * stat.f_frsize
+        free = stat.f_bfree * stat.f_frsize
+        avail = stat.f_bavail * stat.f_frsize
+        used = total - free
+        prefix_type = self.get("prefix_type", "binary")
+
+        def percentage(value):
+            return 100 * value / total if total else 0
+
+        placeholders = {
+            "total": format_bytes(total, prefix_type),
+            "used": format_bytes(used, prefix_type),
+            "free": format_bytes(free, prefix_type),
+            "avail": format_bytes(avail, prefix_type),
+            "percentage_used": "{:.1f}%".format(percentage(used)),
+            "percentage_free": "{:.1f}%".format(percentage(free)),
+            "percentage_avail": "{:.1f}%".format(percentage(avail)),
+            "percentage_used_of_avail": "{:.1f}%".format(
+                100 * used / (used + avail) if used + avail else 0
+            ),
+        }
+
+        format = self.get("format", "%free")
+        color = None
+        low_threshold = self.get("low_threshold")
+        if low_threshold is not None:
+            threshold_type = self.get("threshold_type", "percentage_avail")
+            value = {
+                "bytes_avail": avail,
+                "bytes_free": free,
+                "percentage_avail": percentage(avail),
+                "percentage_free": percentage(free),
+            }.get(threshold_type, percentage(avail))
+            if threshold_type.startswith("bytes"):
+                low_threshold = parse_bytes(low_threshold)
+            if value < float(low_threshold):
+                format = self.get("format_below_threshold", format)
+                color = "bad"
+        return self.item(expand(format, placeholders), color)
+
+
+class Memory(NativeModule):
+    def output(self):
+        meminfo = Py3._proc_sampler.get("meminfo", SAMPLE_INTERVAL).data
+        total = meminfo["MemTotal"] * 1024
+        free = meminfo["MemFree"] * 1024
+        available = meminfo.get("MemAvailable", meminfo["MemFree"]) * 1024
+        buffers = meminfo.get("Buffers", 0) * 1024
+        cached = (meminfo.get("Cached", 0) + meminfo.get("SReclaimable", 0)) * 1024
+        shared = meminfo.get("Shmem", 0) * 1024
+        if self.get("memory_used_method", "classical") == "memavailable":
+            used = total - available
+        else:
+            used = total - free - buffers - cached
+
+        def percentage(value):
+            return "{:.1f}%".format(100 * value / total if total else 0)
+
+        placeholders = {
+            "total": format_bytes(total),
+            "used": format_bytes(used),
+            "free": format_bytes(free),
+            "available": format_bytes(available),
+            "shared": format_bytes(shared),
+            "percentage_used": percentage(used),
+            "percentage_free": percentage(free),
+            "percentage_available": percentage(available),
+            "percentage_shared": percentage(shared),
+        }
+
+        format = self.get("format", "%used/%available")
+        color = None
+        thresholds = [("threshold_critical", "bad"), ("threshold_degraded", "degraded")]
+        for key, state in thresholds:
+            threshold = self.get(key)
+            if threshold is not None and available < parse_bytes(threshold, total):
+                format = self.get("format_degraded", format)
+                color = state
+                break
+        return self.item(expand(format, placeholders), color)
+
+
+class Battery(NativeModule):
+    def setup(self):
+        self.path = self.get("path", "/sys/class/power_supply/BAT%d/uevent")
+
+    def read_uevent(self, path):
+        try:
+            text = Py3._sysfs_reader.read(path)
+        except (IOError, OSError):
+            return None
+        uevent = {}
+        for line in text.splitlines():
+            key, sep, value = line.partition("=")
+            if sep:
+                uevent[key.replace("POWER_SUPPLY_", "", 1)] = value
+        return uevent
+
+    def batteries(self):
+        if self.instance == "all":
+            pattern = self.path.replace("%d", "*")
+            paths = Py3._sysfs_reader.glob(pattern)
+        else:
+            paths = [self.path.replace("%d", self.instance or "0")]
+        return [x for x in (self.read_uevent(path) for path in paths) if x]
+
+    def output(self):
+        full_key = "FULL" if self.get("last_full_capacity") else "FULL_DESIGN"
+        remaining = full = rate = 0
+        capacities = []
+        statuses = []
+        for uevent in self.batteries():
+
+            def value(key):
+                return int(uevent.get(key, 0) or 0)
+
+            statuses.append(uevent.get("STATUS", "Unknown"))
+            if "CAPACITY" in uevent:
+                capacities.append(value("CAPACITY"))
+            if "ENERGY_NOW" in uevent:
+                # uWh and uW
+                remaining += value("ENERGY_NOW")
+                full += value("ENERGY_" + full_key)
+                rate += value("POWER_NOW")
+            elif "CHARGE_NOW" in uevent:
+                # uAh and uA, in uWh and uW
+                voltage = value("VOLTAGE_NOW") / 1e6
+                remaining += value("CHARGE_NOW") * voltage
+                full += value("CHARGE_" + full_key) * voltage
+                rate += value("CURRENT_NOW") * voltage
+        if not statuses:
+            return self.item(self.get("format_down", "No battery"), "bad")
+
+        if "Charging" in statuses:
+            status = "Charging"
+        elif "Discharging" in statuses:
+            status = "Discharging"
+        elif all(x == "Full" for x in statuses):
+            status = "Full"
+        else:
+            status = statuses[0]
+
+        if full:
+            percentage = min(100 * remaining / full, 100)
+        elif capacities:
+            percentage = sum(capacities) / len(capacities)
+        else:
+            percentage = 0
+
+        seconds = None
+        if rate > 0 and status == "Discharging":
+            seconds = 3600 * remaining / rate
+        elif rate > 0 and status == "Charging":
+            seconds = 3600 * max(full - remaining, 0) / rate
+
+        placeholders = {
+            "status": {
+                "Charging": self.get("status_chr", "CHR"),
+                "Discharging": self.get("status_bat", "BAT"),
+                "Full": self.get("status_full", "FULL"),
+            }.get(status, self.get("status_unk", "UNK")),
+            "percentage": self.get(
+                "format_percentage",
+                "%.00f%s" if self.get("integer_battery_capacity") else "%.02f%s",
+            )
+            % (percentage, "%"),
+            "remaining": "",
+            "emptytime": "",
+            "consumption": "{:1.2f}W".format(rate / 1e6) if rate else "",
+        }
+        hide_seconds = self.get("hide_seconds")
+        if seconds is not None:
+            hours, minutes = divmod(int(seconds) // 60, 60)
+            if hide_seconds:
+                remaining_time = "{:02d}:{:02d}".format(hours, minutes)
+            else:
+                remaining_time = "{:02d}:{:02d}:{:02d}".format(
+                    hours, minutes, int(seconds) % 60
+                )
+            placeholders["remaining"] = remaining_time
+            if status == "Discharging":
+                empty = datetime.now() + timedelta(seconds=seconds)
+                placeholders["emptytime"] = empty.strftime(
+                    "%H:%M" if hide_seconds else "%H:%M:%S"
+                )
+
+        color = None
+        if status == "Charging":
+            color = "good"
+        low_threshold = self.get("low_threshold")
+        if low_threshold is not None and status == "Discharging":
+            if self.get("threshold_type", "time") == "percentage":
+                low = percentage < float(low_threshold)
+            else:
+                # minutes
+                low = seconds is not None and seconds < float(low_threshold) * 60
+            if low:
+                color = "bad"
+        format = self.get("format", "%status %percentage %remaining")
+        return self.item(expand(format, placeholders).strip(), color)
+
+
+class Ethernet(NativeModule):
+    def available(self):
+        return netlink.available()
+
+    def first_interface(self, interfaces):
+        for name in interfaces:
+            if name == "lo":
+                continue
+            sys_path = "/sys/class/net/{}".format(name)
+            if os.path.exists(sys_path + "/wireless"):
+                continue
+            if os.path.exists(sys_path + "/device"):
+                return name
+        return None
+
+    def output(self):
+        interfaces = netlink.get_interfaces()
+        name = self.instance
+        if name == "_first_":
+            name = self.first_interface(interfaces)
+        interface = interfaces.get(name)
+        if not interface or interface["link"]["operstate"] != "up":
+            return self.item(self.get("format_down", "E: down"), "bad")
+
+        try:
+            speed = int(Py3._sysfs_reader.read("/sys/class/net/{}/speed".format(name)))
+        except (IOError, OSError, ValueError):
+            speed = -1
+        ip = interface["ip4"][0] if interface["ip4"] else "no IP"
+        placeholders = {
+            "interface": name,
+            "ip": ip,
+            "speed": "{} Mbit/s".format(speed) if speed > 0 else "?",
+        }
+        full_text = expand(self.get("format_up", "E: %ip (%speed)"), placeholders)
+        return self.item(full_text, "degraded" if ip == "no IP" else "good")
+
+
+class Time(NativeModule):
+    """
+    time and tztime, only the date and time zone are given like i3status
+    does for us, the I3statusModule does the formatting.
+    """
+
+    def setup(self):
+        self.tz = None
+        timezone = self.get("timezone")
+        if timezone and ZoneInfo:
+            try:
+                self.tz = ZoneInfo(timezone)
+            except Exception:
+                pass
+
+    def available(self):
+        return not self.get("timezone") or self.tz is not None
+
+    def output(self):
+        if self.tz is None:
+            # local time
+            return self.item(strftime(TZTIME_FORMAT))
+        return self.item(datetime.now(self.tz).strftime(TZTIME_FORMAT))
+
+
+MODULES = {
+    "battery": Battery,
+    "cpu_usage": CpuUsage,
+    "disk": Disk,
+    "ethernet": Ethernet,
+    "load": Load,
+    "memory": Memory,
+    "time": Time,
+    "tztime": Time,
+}
+
+
+def get_native_module(module_name, config, general):
+    """
+    Return the native version of the i3status module, None if it has none
+    or it cannot run here.
+    """
+    module = MODULES.get(module_name.split()[0])
+    if module is None:
+        return None
+    module = module(module_name, config, general)
+    if not module.available():
+        return None
+    return module
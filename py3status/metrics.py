@@ -0,0 +1,66 @@
+from collections import defaultdict, deque
+from threading import Lock
+
+
+class Metrics:
+    """
+    Simple counters and timings kept about a module or a part of py3status.
+
+    Only the most recent timings are kept so that memory use is bounded.
+    """
+
+    MAX_SAMPLES = 1000
+
+    def __init__(self):
+        self.counters = defaultdict(int)
+        self.lock = Lock()
+        self.timings = defaultdict(lambda: deque(maxlen=self.MAX_SAMPLES))
+
+    def increment(self, name, value=1):
+        """
+        Increment the named counter.
+        """
+        with self.lock:
+            self.counters[name] += value
+
+    def record(self, name, duration):
+        """
+        Record a duration (in seconds) for the named timing.
+        """
+        with self.lock:
+            self.timings[name].append(duration)
+
+    def percentile(self, name, percent):
+        """
+        Return the given percentile of the named timing or None if no
+        durations have been recorded.
+        """
+        with self.lock:
+            samples = sorted(self.timings.get(name, []))
+        return self._percentile(samples, percent)
+
+    @staticmethod
+    def _percentile(samples, percent):
+        """
+        Nearest rank percentile of already sorted samples.
+        """
+        if not samples:
+            return None
+        return samples[int(round((len(samples) - 1) * percent / 100.0))]
+
+    def summary(self):
+        """
+        Return a dict of the counters and of the timings statistics.
+        """
+        with self.lock:
+            counters = dict(self.counters)
+            timings = {name: sorted(x) for name, x in self.timings.items() if x}
+        stats = {}
+        for name, samples in timings.items():
+            stats[name] = {
+                "count": len(samples),
+                "max": samples[-1],
+                "p50": self._percentile(samples, 50),
+                "p99": self._percentile(samples, 99),
+            }
+        return {"counters": counters, "timings": stats}
@@ -3,12 +3,19 @@ import imp
 import inspect
 
 from collections import OrderedDict
+from threading import current_thread
 from time import time
 from random import randint
 
 from py3status.composite import Composite
 from py3status.constants import MARKUP_LANGUAGES, POSITIONS
-from py3status.py3 import Py3, PY3_CACHE_FOREVER, ModuleErrorException
+from py3status.metrics import Metrics
+from py3status.py3 import (
+    Py3,
+    PY3_CACHE_FOREVER,
+    ModuleErrorException,
+    ModuleRetryException,
+)
 from py3status.profiling import profile
 from py3status.formatter import Formatter
 
@@ -38,6 +45,7 @@ class Module:
         self.allow_urgent = None
         self.cache_time = None
         self.click_events = False
+        self.coalesce_events = False
         self.config = py3_wrapper.config
         self.disabled = False
         self.enabled = False
@@ -48,6 +56,7 @@ class Module:
         self.i3status_thread = py3_wrapper.i3status_thread
         self.last_output = []
         self.methods = OrderedDict()
+        self.metrics = Metrics()
         self.module_class = instance
         self.module_full_name = module
         self.module_inst = "".join(module.split(" ")[1:])
@@ -55,6 +64,7 @@ class Module:
         self.new_update = False
         self.nagged = False
         self.prevent_refresh = False
+        self.running_thread = None
         self.sleeping = False
         self.terminated = False
         self.testing = self.config.get("testing")
@@ -229,9 +239,11 @@ class Module:
             self._py3_wrapper.log("starting module %s" % self.module_full_name)
             self._py3_wrapper.timeout_queue_add(self)
 
-    def force_update(self):
+    def force_update(self, inline=False):
         """
         Forces an update of the module.
+        If inline the module is run straight away in the calling thread, the
+        caller must be holding the module in the scheduler, eg an EventTask.
         """
         if self.disabled or self.terminated or not self.enabled:
             return
@@ -241,7 +253,10 @@ class Module:
             if self.config["debug"]:
                 self._py3_wrapper.log("clearing cache for method {}".format(meth))
         # set module to update
-        self._py3_wrapper.timeout_queue_add(self)
+        if inline:
+            self.run()
+        else:
+            self._py3_wrapper.timeout_queue_add(self)
 
     def sleep(self):
         self.sleeping = True
@@ -618,6 +633,12 @@ class Module:
             except AttributeError:
                 pass
 
+            # modules can handle bursts of the same click as a single event
+            try:
+                self.coalesce_events = bool(class_inst.Meta.coalesce_events)
+            except AttributeError:
+                pass
+
             # module configuration
             fn = self._py3_wrapper.get_config_attribute
             mod_config = self.config["py3_config"].get(module, {})
@@ -924,6 +945,9 @@ class Module:
         """
         if self._py3_wrapper.running:
             cache_time = None
+            start = time()
+            # let py3 know which thread is running the methods
+            self.running_thread = current_thread()
             # execute each method of this module
             for meth, obj in self.methods.items():
                 my_method = self.methods[meth]
@@ -1024,6 +1048,14 @@ class Module:
                     # mark module as updated
                     self.set_updated()
 
+                except ModuleRetryException as e:
+                    # the method needs running again, eg a request is being
+                    # retried, keep the current output until then
+                    cached_until = time() + e.timeout
+                    my_method["cached_until"] = cached_until
+                    if not cache_time or cached_until < cache_time:
+                        cache_time = cached_until
+
                 except ModuleErrorException as e:
                     # module has indicated that it has an error
                     self.runtime_error(e.msg, meth)
@@ -1050,6 +1082,9 @@ class Module:
                         self.module_class, "cache_timeout", self.config["cache_timeout"]
                     )
 
+            self.running_thread = None
+            self.metrics.record("run", time() - start)
+
             if cache_time is None:
                 cache_time = time() + self.config["cache_timeout"]
             self.cache_time = cache_time
@@ -3,7 +3,9 @@ from sys import argv
 from threading import Event
 from time import sleep, time
 
+from py3status.command_reactor import CommandReactor
 from py3status.core import Common, Module
+from py3status.wm_ipc import WmIpc
 
 
 class MockPy3statusWrapper:
@@ -14,6 +16,14 @@ class MockPy3statusWrapper:
         def process_event(self, *arg, **kw):
             pass
 
+    class FileWatcher:
+        def subscribe(self, *arg, **kw):
+            return False
+
+    class NetworkMonitor:
+        def subscribe(self, *arg, **kw):
+            return False
+
     class UdevMonitor:
         def subscribe(self, *arg):
             pass
@@ -30,7 +40,11 @@ class MockPy3statusWrapper:
             "wm": {"msg": "i3-msg", "nag": "i3-nagbar"},
         }
         self.events_thread = self.EventThread()
+        self.file_watcher = self.FileWatcher()
+        self.network_monitor = self.NetworkMonitor()
         self.udev_monitor = self.UdevMonitor()
+        self.command_reactor = CommandReactor(self)
+        self.wm_ipc = WmIpc(self)
         self.i3status_thread = None
         self.lock = Event()
         self.output_modules = {}
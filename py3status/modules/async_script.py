@@ -36,9 +36,6 @@ example
 """
 
 import re
-import shlex
-from subprocess import Popen, PIPE
-from threading import Thread
 
 
 class Py3status:
@@ -53,10 +50,10 @@ class Py3status:
 
     def post_config_hook(self):
         # class variables:
-        self.command_thread = Thread()
+        self.command = None
         self.command_output = None
         self.command_color = None
-        self.command_error = None  # cannot throw self.py3.error from thread
+        self.command_error = None  # cannot throw self.py3.error from callbacks
 
         if not self.script_path:
             self.py3.error("script_path is mandatory")
@@ -68,10 +65,8 @@ class Py3status:
         if self.command_error is not None:
             self.py3.log(self.command_error, level=self.py3.LOG_ERROR)
             self.py3.error(self.command_error, timeout=self.py3.CACHE_FOREVER)
-        if not self.command_thread.is_alive():
-            self.command_thread = Thread(target=self._command_start)
-            self.command_thread.daemon = True
-            self.command_thread.start()
+        if self.command is None:
+            self._command_start()
 
         if self.command_color is not None:
             response["color"] = self.command_color
@@ -81,25 +76,30 @@ class Py3status:
         )
         return response
 
-    def _command_start(self):
+    def _command_start(self, returncode=None):
+        # called again when the script has exited/died to restart it
         try:
-            command = Popen(shlex.split(self.script_path), stdout=PIPE)
-            while True:
-                if command.poll() is not None:  # script has exited/died; restart it
-                    command = Popen(shlex.split(self.script_path), stdout=PIPE)
-
-                output = command.stdout.readline().decode().strip()
-
-                if re.search(r"^#[0-9a-fA-F]{6}$", output) and not self.force_nocolor:
-                    self.command_color = output
-                else:
-                    if output != self.command_output:
-                        self.command_output = output
-                        self.py3.update()
-        except Exception as e:
+            self.command = self.py3.command_stream(
+                self.script_path, self._command_line, on_exit=self._command_start
+            )
+        except self.py3.CommandError as e:
             self.command_error = str(e)
             self.py3.update()
 
+    def _command_line(self, output):
+        output = output.strip()
+
+        if re.search(r"^#[0-9a-fA-F]{6}$", output) and not self.force_nocolor:
+            self.command_color = output
+        else:
+            if output != self.command_output:
+                self.command_output = output
+                self.py3.update()
+
+    def kill(self):
+        if self.command:
+            self.command.kill()
+
 
 if __name__ == "__main__":
     """
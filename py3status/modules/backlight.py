@@ -97,6 +97,7 @@ class Py3status:
     low_tune_threshold = 0
 
     class Meta:
+        coalesce_events = True
         deprecated = {
             "rename": [
                 {
@@ -147,15 +148,23 @@ class Py3status:
     def on_click(self, event):
         level = self._get_backlight_level()
         button = event["button"]
+        # a burst of scrolling is applied with a single command
+        count = event.get("count", 1)
         if button == self.button_up:
-            delta = self.brightness_delta if level >= self.low_tune_threshold else 1
-            level += delta
+            for i in range(count):
+                if level >= self.low_tune_threshold:
+                    level += self.brightness_delta
+                else:
+                    level += 1
             if level > 100:
                 level = 100
             self._set_backlight_level(level)
         elif button == self.button_down:
-            delta = self.brightness_delta if level > self.low_tune_threshold else 1
-            level -= delta
+            for i in range(count):
+                if level > self.low_tune_threshold:
+                    level -= self.brightness_delta
+                else:
+                    level -= 1
             if level < self.brightness_minimal:
                 level = self.brightness_minimal
             self._set_backlight_level(level)
@@ -165,8 +174,7 @@ class Py3status:
             self.py3.command_run(self._command_set(level))
             return
         if self._logind_proxy:
-            for brightness_max_line in open("%s/max_brightness" % self.device, "rb"):
-                brightness_max = int(brightness_max_line)
+            brightness_max = int(self._read_device("max_brightness"))
             brightness = brightness_max * level / 100
             self._logind_proxy.SetBrightness(
                 "backlight", os.path.basename(os.path.normpath(self.device)), brightness
@@ -175,12 +183,13 @@ class Py3status:
     def _get_backlight_level(self):
         if self.command_available:
             return float(self.py3.command_output(self._command_get()))
-        for brightness_line in open("%s/brightness" % self.device, "rb"):
-            brightness = int(brightness_line)
-        for brightness_max_line in open("%s/max_brightness" % self.device, "rb"):
-            brightness_max = int(brightness_max_line)
+        brightness = int(self._read_device("brightness"))
+        brightness_max = int(self._read_device("max_brightness"))
         return brightness * 100 / brightness_max
 
+    def _read_device(self, name):
+        return self.py3.read_sysfs("%s/%s" % (self.device, name))
+
     # Returns the string array for the command to get the current backlight level
     def _command_get(self):
         return commands[self.command]["get"]()
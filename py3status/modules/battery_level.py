@@ -82,7 +82,6 @@ discharging
 
 from __future__ import division  # python2 compatibility
 from re import findall
-from glob import iglob
 
 import math
 import os
@@ -272,27 +271,29 @@ class Py3status:
         a similar, yet incompatible interface in /proc
         """
 
-        if not os.listdir(self.sys_battery_path):
-            return []
-
         def _parse_battery_info(sys_path):
             """
             Extract battery information from uevent file, already convert to
             int if necessary
             """
             raw_values = {}
-            with open(os.path.join(sys_path, u"uevent")) as f:
-                for var in f.read().splitlines():
-                    k, v = var.split("=")
-                    try:
-                        raw_values[k] = int(v)
-                    except ValueError:
-                        raw_values[k] = v
+            uevent = self.py3.read_sysfs(os.path.join(sys_path, u"uevent"))
+            for var in uevent.splitlines():
+                k, v = var.split("=")
+                try:
+                    raw_values[k] = int(v)
+                except ValueError:
+                    raw_values[k] = v
             return raw_values
 
         battery_list = []
-        for path in iglob(os.path.join(self.sys_battery_path, "BAT*")):
-            r = _parse_battery_info(path)
+        battery_paths = os.path.join(self.sys_battery_path, "BAT*")
+        for path in self.py3.glob_sysfs(battery_paths):
+            try:
+                r = _parse_battery_info(path)
+            except (IOError, OSError):
+                # the battery has been removed
+                continue
 
             capacity = r.get(
                 "POWER_SUPPLY_ENERGY_FULL", r.get("POWER_SUPPLY_CHARGE_FULL")
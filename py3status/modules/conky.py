@@ -323,14 +323,13 @@ bar
 ]
 """
 
-from subprocess import Popen, PIPE, STDOUT
-from threading import Thread
 from tempfile import NamedTemporaryFile
 from json import dumps
 from os import remove as os_remove
 
 STRING_NOT_INSTALLED = "not installed"
 STRING_MISSING_FORMAT = "missing format"
+STRING_EXITED = "conky exited"
 
 
 class Py3status:
@@ -378,33 +377,38 @@ class Py3status:
         self.tmpfile.close()
         self.conky_command = "conky -c {}".format(self.tmpfile.name).split()
 
-        # thread
+        # stream
         self.line = ""
         self.error = None
-        self.process = None
-        self.t = Thread(target=self._start_loop)
-        self.t.daemon = True
-        self.t.start()
+        self.command = None
+        try:
+            self.command = self.py3.command_stream(
+                self.conky_command,
+                self._conky_line,
+                on_exit=self._conky_exit,
+                capture_stderr=True,
+            )
+        except self.py3.CommandError as err:
+            self.error = str(err)
+            self._cleanup()
 
     def _cleanup(self):
-        self.process.kill()
+        if self.command:
+            self.command.kill()
         os_remove(self.tmpfile.name)
         self.py3.update()
 
-    def _start_loop(self):
-        try:
-            self.process = Popen(self.conky_command, stdout=PIPE, stderr=STDOUT)
-            while True:
-                line = self.process.stdout.readline().decode()
-                if self.process.poll() is not None or "conky:" in line:
-                    raise Exception(line)
-                if self.line != line:
-                    self.line = line
-                    self.py3.update()
-        except Exception as err:
-            self.error = " ".join(format(err).split()[1:])
-        finally:
+    def _conky_line(self, line):
+        if "conky:" in line:
+            self.error = " ".join(line.split()[1:])
             self._cleanup()
+        elif self.line != line:
+            self.line = line
+            self.py3.update()
+
+    def _conky_exit(self, returncode):
+        self.error = STRING_EXITED
+        self._cleanup()
 
     def conky(self):
         if self.error:
@@ -6,6 +6,8 @@ Configuration parameters:
     cache_timeout: refresh interval for this module. (default 10)
     disk: show stats for disk or partition, i.e. `sda1`. None for all disks.
         (default None)
+    disk_timeout: how long to wait, in seconds, for the space of a mounted
+        disk before skipping it, eg a stalled network filesystem (default 2)
     format: display format for this module.
         (default "{disk}: {used_percent}% ({total})")
     format_rate: display format for rates value
@@ -57,7 +59,39 @@ SAMPLE OUTPUT
 """
 
 from __future__ import division  # python2 compatibility
-from time import time
+
+import os
+import re
+import select
+
+from threading import Thread
+
+MOUNTINFO = "/proc/self/mountinfo"
+
+
+def unescape(value):
+    # spaces etc are octal escaped
+    return re.sub(r"\\([0-7]{3})", lambda x: chr(int(x.group(1), 8)), value)
+
+
+def parse_mountinfo(lines):
+    """
+    Return a list of (device, mount point) of the mountinfo lines with a
+    mount point for each device.
+    """
+    mounts, devs = [], []
+    for line in lines:
+        fields = line.split()
+        # optional fields are ended by a separator
+        separator = fields.index("-")
+        device = unescape(fields[separator + 2])
+        if device in devs:
+            # Make sure to count each block device only one time
+            # some filesystems eg btrfs have multiple entries
+            continue
+        mounts.append((device, unescape(fields[4])))
+        devs.append(device)
+    return mounts
 
 
 class Py3status:
@@ -67,6 +101,7 @@ class Py3status:
     # available configuration parameters
     cache_timeout = 10
     disk = None
+    disk_timeout = 2
     format = "{disk}: {used_percent}% ({total})"
     format_rate = "[\?min_length=11 {value:.1f} {unit}]"
     format_space = "[\?min_length=5 {value:.1f}]"
@@ -91,32 +126,102 @@ class Py3status:
             if placeholders:
                 self.init[name] = {"placeholders": placeholders, "keys": match}
 
+        if self.init["df"]:
+            self.mounts = None
+            self.mountinfo_poller = None
+            self.stalled = {}
+
         if self.init["diskstats"]:
+            self.last_time = None
             self.last_diskstats = self._get_diskstats(self.disk)
-            self.last_time = time()
+            self.last_time = self.sample_time
 
         self.thresholds_init = self.py3.get_color_names_list(self.format)
 
+    def _mounts_changed(self):
+        """
+        The kernel flags the mountinfo file when something is mounted or
+        unmounted so we only need to read it again then.
+        """
+        if self.mounts is None:
+            try:
+                self.mountinfo = open(MOUNTINFO)
+                self.mountinfo_poller = select.poll()
+                self.mountinfo_poller.register(self.mountinfo, select.POLLPRI)
+            except AttributeError:
+                # no poll() eg when gevent is used, read the file every time
+                self.mountinfo_poller = None
+            return True
+        if self.mountinfo_poller is None:
+            return True
+        return bool(self.mountinfo_poller.poll(0))
+
+    def _get_mounts(self):
+        """
+        Return a list of (device, mount point) with a mount point for each
+        block device.
+        """
+        if not self._mounts_changed():
+            return self.mounts
+
+        if self.mountinfo_poller:
+            self.mountinfo.seek(0)
+            lines = self.mountinfo.read().splitlines()
+        else:
+            with open(MOUNTINFO) as f:
+                lines = f.read().splitlines()
+
+        self.mounts = parse_mountinfo(lines)
+        return self.mounts
+
+    def _statvfs(self, mount_point):
+        """
+        os.statvfs() can hang on an unresponsive mount so it is run in a
+        thread that we only wait disk_timeout seconds for.  A mount that
+        timed out is skipped until its os.statvfs() returns.
+        """
+        stalled = self.stalled.get(mount_point)
+        if stalled:
+            if stalled.is_alive():
+                return None
+            del self.stalled[mount_point]
+
+        result = {}
+
+        def statvfs():
+            try:
+                result["statvfs"] = os.statvfs(mount_point)
+            except OSError:
+                pass
+
+        thread = Thread(target=statvfs)
+        thread.daemon = True
+        thread.start()
+        thread.join(self.disk_timeout)
+        if thread.is_alive():
+            self.stalled[mount_point] = thread
+            self.py3.log("{} is not responding, skipped".format(mount_point))
+        return result.get("statvfs")
+
     def _get_df_usages(self, disk):
-        df_usages = self.py3.command_output(["df", "-k"])
-        total, used, free, devs = 0, 0, 0, []
+        total, used, free = 0, 0, 0
 
         if disk and not disk.startswith("/dev/"):
             disk = "/dev/" + disk
 
-        for line in df_usages.splitlines():
-            if (disk and line.startswith(disk)) or (
-                disk is None and line.startswith("/dev/")
+        for device, mount_point in self._get_mounts():
+            if (disk and device.startswith(disk)) or (
+                disk is None and device.startswith("/dev/")
             ):
-                data = line.split()
-                if data[0] in devs:
-                    # Make sure to count each block device only one time
-                    # some filesystems eg btrfs have multiple entries
+                stat = self._statvfs(mount_point)
+                if stat is None:
                     continue
-                total += int(data[1]) / 1024 / 1024
-                used += int(data[2]) / 1024 / 1024
-                free += int(data[3]) / 1024 / 1024
-                devs.append(data[0])
+                # sizes in GiB like df does, free is the space available to
+                # non-root users
+                size = stat.f_frsize / 1024 / 1024 / 1024
+                total += stat.f_blocks * size
+                used += (stat.f_blocks - stat.f_bfree) * size
+                free += stat.f_bavail * size
 
         if total == 0:
             return free, used, "err", total
@@ -129,22 +234,22 @@ class Py3status:
         if disk and disk.startswith("/dev/"):
             disk = disk[5:]
 
-        with open("/proc/diskstats") as fd:
-            for line in fd:
-                data = line.split()
-                if disk:
-                    if data[2] == disk:
-                        read += int(data[5]) * self.sector_size
-                        write += int(data[9]) * self.sector_size
-                else:
-                    if data[1] == "0":
-                        read += int(data[5]) * self.sector_size
-                        write += int(data[9]) * self.sector_size
-
+        sample = self.py3.proc_sample("diskstats", newer_than=self.last_time)
+        for name, (major, minor, stats) in sample.data.items():
+            if disk:
+                if name == disk:
+                    read += stats[2] * self.sector_size
+                    write += stats[6] * self.sector_size
+            else:
+                if minor == 0:
+                    read += stats[2] * self.sector_size
+                    write += stats[6] * self.sector_size
+
+        self.sample_time = sample.time
         return read, write
 
     def _calc_diskstats(self, diskstats):
-        current_time = time()
+        current_time = self.sample_time
         timedelta = current_time - self.last_time
         read = (diskstats[0] - self.last_diskstats[0]) / timedelta
         write = (diskstats[1] - self.last_diskstats[1]) / timedelta
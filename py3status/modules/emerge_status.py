@@ -4,7 +4,8 @@ Display information about the currently running emerge process.
 
 Configuration parameters:
     cache_timeout: how often we refresh this module in second.
-        NOTE: when emerge is running, we will refresh this module every second.
+        NOTE: when emerge is running, we will refresh this module every second,
+        or on linux each time the emerge log file changes.
         (default 30)
     emerge_log_file: path to the emerge log file.
         (default '/var/log/emerge.log')
@@ -89,6 +90,9 @@ class Py3status:
             "pkg": "",
             "total": 0,
         }
+        self.watched = self.py3.register_file_watch(
+            self.emerge_log_file, ["create", "modify"]
+        )
 
     def _get_progress(self):
         """
@@ -132,7 +136,14 @@ class Py3status:
         if self._emerge_running():
             ret = self._get_progress()
             ret["is_running"] = True
-            response["cached_until"] = self.py3.time_in(0)
+            if self.watched:
+                # emerge logs its progress
+                response["cached_until"] = self.py3.time_in(self.cache_timeout)
+            else:
+                response["cached_until"] = self.py3.time_in(0)
+        elif self.watched:
+            # emerge logs when it starts
+            response["cached_until"] = self.py3.CACHE_FOREVER
         else:
             response["cached_until"] = self.py3.time_in(self.cache_timeout)
         response["full_text"] = self.py3.safe_format(self.format, ret)
@@ -3,7 +3,8 @@
 Display if files or directories exists.
 
 Configuration parameters:
-    cache_timeout: refresh interval for this module (default 10)
+    cache_timeout: refresh interval for this module, not used on linux
+        where paths are watched for changes instead (default 10)
     format: display format for this module
         (default '\?color=path [\?if=path ●|■]')
     format_path: format for paths (default '{basename}')
@@ -54,7 +55,7 @@ missing
 """
 
 from glob import glob
-from os.path import basename, expanduser
+from os.path import basename, dirname, expanduser, isdir
 
 STRING_NO_PATHS = "missing paths"
 
@@ -110,6 +111,16 @@ class Py3status:
             self.paths = [self.paths]
         self.paths = list(map(expanduser, self.paths))
 
+        # watch the directories of the paths for them to come and go
+        watched = []
+        for path in self.paths:
+            path = path.rstrip("/")
+            if isdir(path):
+                path = dirname(path)
+            events = ["create", "delete", "move"]
+            watched.append(self.py3.register_file_watch(path, events))
+        self.watched = all(watched)
+
         self.init = {"format_path": []}
         if self.py3.format_contains(self.format, "format_path"):
             self.init["format_path"] = self.py3.get_placeholders_list(self.format_path)
@@ -145,8 +156,13 @@ class Py3status:
             if x in ["path", "paths"]:
                 self.py3.threshold_get_color(count_path, x)
 
+        if self.watched:
+            cached_until = self.py3.CACHE_FOREVER
+        else:
+            cached_until = self.py3.time_in(self.cache_timeout)
+
         return {
-            "cached_until": self.py3.time_in(self.cache_timeout),
+            "cached_until": cached_until,
             "full_text": self.py3.safe_format(
                 self.format,
                 {"path": count_path, "paths": count_path, "format_path": format_path},
@@ -113,6 +113,7 @@ class Py3status:
     open = True
 
     class Meta:
+        coalesce_events = True
         container = True
 
     def post_config_hook(self):
@@ -266,6 +267,7 @@ class Py3status:
         Switch the displayed module or pass the event on to the active module
         """
         button = event["button"]
+        count = event.get("count", 1)
         index = event["index"]
 
         # if click_mode is button, prevent the contents from changing when
@@ -281,12 +283,14 @@ class Py3status:
 
         if button == self.button_next:
             if self.open:
-                self._change_active(+1)
+                for i in range(count):
+                    self._change_active(+1)
         elif button == self.button_prev:
             if self.open:
-                self._change_active(-1)
+                for i in range(count):
+                    self._change_active(-1)
         elif button == self.button_toggle:
-            if index == "button":
+            if index == "button" and count % 2:
                 self.open = not self.open
 
 
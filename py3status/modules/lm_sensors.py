@@ -12,6 +12,9 @@ Configuration parameters:
         (default '[\?color=darkgray {name}] [\?color=auto.input&show {input}]')
     format_sensor_separator: show separator if more than one (default ' ')
     sensors: specify a list of sensors to use (default [])
+    sysfs: read the sensors from sysfs instead of running `sensors`, this is
+        faster but sensors.conf (labels, compute, ignore, set) is not used
+        then (default False)
     thresholds: specify color thresholds to use (default {'auto.input': True})
 
 Format placeholders:
@@ -48,7 +51,8 @@ Color thresholds:
             against a customized threshold
 
 Requires:
-    lm_sensors: a tool to read temperature/voltage/fan sensors
+    lm_sensors: a tool to read temperature/voltage/fan sensors,
+        not needed if sysfs is enabled and finds the sensors
     sensors-detect: see `man sensors-detect # --auto` to read about
         using defaults or to compile a list of kernel modules
 
@@ -180,12 +184,10 @@ class Py3status:
     format_sensor = "[\?color=darkgray {name}] [\?color=auto.input&show {input}]"
     format_sensor_separator = " "
     sensors = []
+    sysfs = False
     thresholds = {"auto.input": True}
 
     def post_config_hook(self):
-        if not self.py3.check_commands("sensors"):
-            raise Exception(STRING_NOT_INSTALLED)
-
         placeholders = self.py3.get_placeholders_list(self.format_sensor)
         format_sensor = {x: ":g" for x in placeholders if x != "name"}
         self.sensor_placeholders = [x for x in placeholders if x != "name"]
@@ -194,22 +196,7 @@ class Py3status:
         )
 
         self.first_run = True
-        self.lm_sensors_command = "sensors -u"
-        if not self.py3.format_contains(self.format_chip, "adapter"):
-            self.lm_sensors_command += "A"  # don't print adapters
-
-        if self.chips:
-            lm_sensors_data = self._get_lm_sensors_data()
-            chips = []
-            for _filter in self.chips:
-                for chunk in lm_sensors_data.split("\n\n")[:-1]:
-                    for line in chunk.splitlines():
-                        if fnmatch(line, _filter):
-                            chips.append(line)
-                        break
-            self.lm_sensors_command += " {}".format(" ".join(chips))
-
-        self.sensors = {"list": [], "name": {}, "sensors": self.sensors}
+        self.sensor_names = {}
 
         self.thresholds_auto = False
         self.thresholds_man = self.py3.get_color_names_list(self.format_sensor)
@@ -232,46 +219,88 @@ class Py3status:
         if "auto.input" in self.thresholds_man:
             self.thresholds_man.remove("auto.input")
 
+        # only read the values we show
+        self.sysfs_keys = set(self.sensor_placeholders + self.thresholds_man)
+        if self.thresholds_auto:
+            self.sysfs_keys.update(["input", "min", "max", "crit"])
+        self.sysfs_chips = self.chips or None
+
+        if self.sysfs and self.py3.read_sensors(self.sysfs_chips, keys=[]):
+            self._get_chips = self._get_sysfs_chips
+            return
+        if not self.py3.check_commands("sensors"):
+            raise Exception(STRING_NOT_INSTALLED)
+        self._get_chips = self._get_lm_sensors_chips
+
+        self.lm_sensors_command = "sensors -u"
+        if not self.py3.format_contains(self.format_chip, "adapter"):
+            self.lm_sensors_command += "A"  # don't print adapters
+
+        if self.chips:
+            lm_sensors_data = self._get_lm_sensors_data()
+            chips = []
+            for _filter in self.chips:
+                for chunk in lm_sensors_data.split("\n\n")[:-1]:
+                    for line in chunk.splitlines():
+                        if fnmatch(line, _filter):
+                            chips.append(line)
+                        break
+            self.lm_sensors_command += " {}".format(" ".join(chips))
+
     def _get_lm_sensors_data(self):
         return self.py3.command_output(self.lm_sensors_command)
 
-    def lm_sensors(self):
-        lm_sensors_data = self._get_lm_sensors_data()
-        new_chip = []
-
-        for chunk in lm_sensors_data.split("\n\n")[:-1]:
+    def _get_lm_sensors_chips(self):
+        chips = []
+        for chunk in self._get_lm_sensors_data().split("\n\n")[:-1]:
             chip = {"sensors": OrderedDict()}
             first_line = True
-            sensor_name = None
-            new_sensor = []
+            sensor = None
 
             for line in chunk.splitlines():
                 if line.startswith("  "):
-                    if not sensor_name:
+                    if sensor is None:
                         continue
                     key, value = line.split(": ")
                     prefix, key = key.split("_", 1)
-                    chip["sensors"][sensor_name][key] = value
+                    sensor[key] = value
                 elif first_line:
                     chip["name"] = line
                     first_line = False
                 elif "Adapter:" in line:
                     chip["adapter"] = line[9:]
                 else:
-                    try:
-                        sensor_name = self.sensors["name"][line]
-                    except KeyError:
-                        sensor_name = line[:-1].lower().replace(" ", "_")
-                        self.sensors["name"][line] = sensor_name
-                    if self.sensors["sensors"]:
-                        if self.first_run:
-                            for _filter in self.sensors["sensors"]:
-                                if fnmatch(sensor_name, _filter):
-                                    self.sensors["list"].append(sensor_name)
-                        if sensor_name not in self.sensors["list"]:
-                            sensor_name = None
-                            continue
-                    chip["sensors"][sensor_name] = {}
+                    sensor = chip["sensors"].setdefault(line[:-1], {})
+            chips.append(chip)
+        return chips
+
+    def _get_sysfs_chips(self):
+        return self.py3.read_sensors(self.sysfs_chips, self.sysfs_keys)
+
+    def _get_sensor_name(self, label):
+        """
+        Sensor names are lowercased with underscores, None if filtered out.
+        """
+        try:
+            return self.sensor_names[label]
+        except KeyError:
+            name = label.lower().replace(" ", "_")
+            if self.sensors and not any(fnmatch(name, x) for x in self.sensors):
+                name = None
+            self.sensor_names[label] = name
+            return name
+
+    def lm_sensors(self):
+        new_chip = []
+
+        for chip in self._get_chips():
+            new_sensor = []
+            sensors = OrderedDict()
+            for label, values in chip["sensors"].items():
+                name = self._get_sensor_name(label)
+                if name is not None:
+                    sensors[name] = dict(values)
+            chip["sensors"] = sensors
 
             for name, sensor in chip["sensors"].items():
                 sensor["name"] = name
@@ -6,7 +6,9 @@ This module supports Maildir, mbox, MH, Babyl, MMDF, and IMAP.
 Configuration parameters:
     accounts: specify a dict consisting of mailbox types and a list of dicts
         consisting of mailbox settings and/or paths to use (default {})
-    cache_timeout: refresh interval for this module (default 60)
+    cache_timeout: refresh interval for this module, not used on linux
+        when there are only local mailboxes as they are watched for changes
+        (default 60)
     format: display format for this module
         (default '\?not_zero Mail {mail}|No Mail')
     thresholds: specify color thresholds to use (default [])
@@ -157,15 +159,135 @@ no_mail
 """
 
 import mailbox
+import os
 from csv import reader
 from imaplib import IMAP4_SSL, IMAP4
-from os.path import exists, expanduser, expandvars
+from os.path import exists, expanduser, expandvars, isdir, join
+from time import time
 
 STRING_MISSING = "missing {} {}"
 STRING_INVALID_NAME = "invalid name `{}`"
 STRING_INVALID_BOX = "invalid mailbox `{}`"
 STRING_INVALID_FILTER = "invalid imap filters `{}`"
 
+# directories changed this recently may change again within their mtime
+MTIME_SKEW = 2
+READ_SIZE = 1024 * 1024
+# bytes compared to check that a mbox was only appended to
+CHECK_SIZE = 256
+
+
+def _list_files(path):
+    """
+    Names of the files in the directory.
+    """
+    try:
+        return [x.name for x in os.scandir(path) if not x.is_dir()]
+    except AttributeError:
+        # python < 3.5
+        return [x for x in os.listdir(path) if not isdir(join(path, x))]
+
+
+class DirectoryIndex:
+    """
+    Message count of maildir (new and cur) or MH directories, a directory
+    is only listed again when its mtime changes.
+    """
+
+    def __init__(self, paths, is_message):
+        self.is_message = is_message
+        # path: (mtime, listed at, count)
+        self.paths = {x: None for x in paths}
+
+    def count(self):
+        count = 0
+        for path, cached in self.paths.items():
+            mtime = os.stat(path).st_mtime
+            if cached and cached[0] == mtime and cached[1] - mtime > MTIME_SKEW:
+                count += cached[2]
+                continue
+            listed_at = time()
+            path_count = len([x for x in _list_files(path) if self.is_message(x)])
+            self.paths[path] = (mtime, listed_at, path_count)
+            count += path_count
+        return count
+
+
+class MboxIndex:
+    """
+    Message count of mbox or MMDF files.  Mail is normally appended to them
+    so only the new bytes are read, the whole file is read again if it was
+    rewritten.
+    """
+
+    def __init__(self, path, separator, separators_per_message=1):
+        self.path = path
+        self.separator = separator
+        self.separators_per_message = separators_per_message
+        self._reset()
+
+    def _reset(self):
+        self.head = self.tail = b""
+        self.inode = None
+        self.mtime = None
+        self.offset = 0
+        self.separators = 0
+
+    def _appended(self, f, stat):
+        """
+        Is the file what we read plus new data?
+        """
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            return False
+        head = f.read(len(self.head))
+        f.seek(self.offset - len(self.tail))
+        return head == self.head and f.read(len(self.tail)) == self.tail
+
+    def count(self):
+        stat = os.stat(self.path)
+        if stat.st_size == self.offset and stat.st_mtime == self.mtime:
+            return self.separators // self.separators_per_message
+        with open(self.path, "rb") as f:
+            if not self._appended(f, stat):
+                self._reset()
+            f.seek(self.offset)
+            # only whole lines are counted, the last one may be being written
+            partial = b""
+            while True:
+                data = f.read(READ_SIZE)
+                if not data:
+                    break
+                lines = (partial + data).split(b"\n")
+                partial = lines.pop()
+                for line in lines:
+                    if line.startswith(self.separator):
+                        self.separators += 1
+                self.offset += len(data)
+            self.offset -= len(partial)
+            f.seek(0)
+            self.head = f.read(min(CHECK_SIZE, self.offset))
+            f.seek(max(self.offset - CHECK_SIZE, 0))
+            self.tail = f.read(self.offset - f.tell())
+        self.inode = stat.st_ino
+        self.mtime = stat.st_mtime
+        return self.separators // self.separators_per_message
+
+
+class MailboxIndex:
+    """
+    Message count of other mailboxes, read whole by the mailbox module.
+    """
+
+    def __init__(self, path, box):
+        self.box = box
+        self.path = path
+
+    def count(self):
+        inbox = getattr(mailbox, self.box)(self.path, create=False)
+        count = len(inbox)
+        inbox.close()
+        return count
+
 
 class Py3status:
     """
@@ -222,11 +344,39 @@ class Py3status:
                                 raise Exception(STRING_MISSING.format(mail, path))
                             account["box"] = box
                             account["path"] = path
+                            account["index"] = self._get_index(box, path)
                             self.mailboxes[mail].append(account)
                             break
 
         self.thresholds_init = self.py3.get_color_names_list(self.format)
 
+        # local mailboxes are watched instead of polled
+        watched = [not self.mailboxes.get("imap")]
+        for mail, accounts in self.mailboxes.items():
+            if mail == "imap":
+                continue
+            for account in accounts:
+                if mail == "maildir":
+                    paths = [join(account["path"], x) for x in ("new", "cur")]
+                else:
+                    paths = [account["path"]]
+                for path in paths:
+                    watched.append(self.py3.register_file_watch(path))
+        self.watched = all(watched)
+
+    def _get_index(self, box, path):
+        if box == "Maildir":
+            paths = [join(path, "new"), join(path, "cur")]
+            return DirectoryIndex(paths, lambda name: True)
+        if box == "mh":
+            return DirectoryIndex([path], lambda name: name.isdigit())
+        if box == "mbox":
+            return MboxIndex(path, b"From ")
+        if box == "MMDF":
+            # messages start and end with this line
+            return MboxIndex(path, b"\x01\x01\x01\x01", 2)
+        return MailboxIndex(path, box)
+
     def mail(self):
         mail_data = {"mail": 0, "urgent": False}
         for k, v in self.mailboxes.items():
@@ -278,11 +428,7 @@ class Py3status:
                     except IMAP4.error:
                         pass
                 else:
-                    inbox = getattr(mailbox, account["box"])(
-                        account["path"], create=False
-                    )
-                    count_mail = len(inbox)
-                    inbox.close()
+                    count_mail = account["index"].count()
                 if "name" in account:
                     mail_data[account["name"]] = count_mail
                 if account["urgent"] and count_mail:
@@ -297,8 +443,13 @@ class Py3status:
 
         self.first_run = False
 
+        if self.watched:
+            cached_until = self.py3.CACHE_FOREVER
+        else:
+            cached_until = self.py3.time_in(self.cache_timeout)
+
         response = {
-            "cached_until": self.py3.time_in(self.cache_timeout),
+            "cached_until": cached_until,
             "full_text": self.py3.safe_format(self.format, mail_data),
         }
         if mail_data["urgent"]:
@@ -7,7 +7,8 @@ interfaces and IPs, as well as to show interfaces with no IP address. It will
 show an alternate text if no IP are available.
 
 Configuration parameters:
-    cache_timeout: refresh interval for this module in seconds.
+    cache_timeout: refresh interval for this module in seconds, not used
+        on linux where the module is updated when the addresses change.
         (default 30)
     format: format of the output.
         (default 'Network: {format_iface}')
@@ -39,7 +40,8 @@ Color options:
     color_good: IPs to show
 
 Requires:
-    ip: utility found in iproute2 package
+    ip: utility found in iproute2 package, only needed if netlink is not
+        available, ie not on linux
 
 Examples:
 ```
@@ -58,8 +60,11 @@ SAMPLE OUTPUT
 
 
 import re
+from collections import OrderedDict
 from fnmatch import fnmatch
 
+from py3status import netlink
+
 
 class Py3status:
     """
@@ -81,11 +86,16 @@ class Py3status:
         self.ip_re = re.compile(r"\s+inet (?P<ip4>[\d\.]+)(?:/| )")
         self.ip6_re = re.compile(r"\s+inet6 (?P<ip6>[\da-f:]+)(?:/| )")
 
+        self.netlink = netlink.available()
+        # get told about address and link changes instead of polling
+        self.network_events = self.py3.register_network_events(["link", "address"])
+
     def net_iplist(self):
-        response = {
-            "cached_until": self.py3.time_in(seconds=self.cache_timeout),
-            "full_text": "",
-        }
+        if self.network_events:
+            cached_until = self.py3.CACHE_FOREVER
+        else:
+            cached_until = self.py3.time_in(seconds=self.cache_timeout)
+        response = {"cached_until": cached_until, "full_text": ""}
 
         connection = False
         data = self._get_data()
@@ -130,6 +140,16 @@ class Py3status:
         return response
 
     def _get_data(self):
+        if not self.netlink:
+            return self._get_data_ip()
+        data = OrderedDict()
+        for iface, info in netlink.get_interfaces().items():
+            ips = {key: info[key] for key in ("ip4", "ip6") if info[key]}
+            if ips or not self.remove_empty:
+                data[iface] = ips
+        return data
+
+    def _get_data_ip(self):
         txt = self.py3.command_output(["ip", "address", "show"]).splitlines()
 
         data = {}
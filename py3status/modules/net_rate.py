@@ -104,17 +104,16 @@ class Py3status:
         self._value_formats = values
         # last
         self.last_interface = None
-        self.last_stat = self._get_stat()
-        self.last_time = time()
+        self.last_time = None
+        self.last_stat, self.last_time = self._get_stat()
 
         self.thresholds_init = self.py3.get_color_names_list(self.format)
 
     def net_rate(self):
-        network_stat = self._get_stat()
+        network_stat, current_time = self._get_stat()
         deltas = {}
         try:
             # time from previous check
-            current_time = time()
             timedelta = current_time - self.last_time
 
             # calculate deltas for all interfaces
@@ -194,9 +193,6 @@ class Py3status:
         """
 
         def dev_filter(x):
-            # get first word and remove trailing interface number
-            x = x.strip().split(" ")[0][:-1]
-
             if x in self.interfaces_blacklist:
                 return False
 
@@ -208,15 +204,26 @@ class Py3status:
 
             return False
 
-        # read devfile, skip two header files
-        x = filter(dev_filter, open(self.devfile).readlines()[2:])
-
-        try:
-            # split info into words, filter empty ones
-            return [list(filter(lambda x: x, _x.split(" "))) for _x in x]
-
-        except StopIteration:
-            return None
+        if self.devfile == "/proc/net/dev":
+            # shared with other modules reading it
+            sample = self.py3.proc_sample("net/dev", newer_than=self.last_time)
+            interfaces, sample_time = sample.data, sample.time
+        else:
+            # read devfile, skip two header lines
+            interfaces = {}
+            sample_time = time()
+            with open(self.devfile) as f:
+                for line in f.readlines()[2:]:
+                    name, _, counters = line.partition(":")
+                    interfaces[name.strip()] = [int(x) for x in counters.split()]
+
+        # name (with the trailing colon) followed by the counters
+        stat = [
+            [name + ":"] + counters
+            for name, counters in sorted(interfaces.items())
+            if dev_filter(name)
+        ]
+        return stat, sample_time
 
     def _format_value(self, value):
         """
@@ -126,17 +126,15 @@ class Py3status:
         self.thresholds_init = self.py3.get_color_names_list(self.format)
 
     def _get_bytes(self):
-        with open("/proc/net/dev") as fh:
-            net_data = fh.read().split()
-        interface_index = net_data.index(self.nic + ":")
-        received_bytes = int(net_data[interface_index + 1])
-        transmitted_bytes = int(net_data[interface_index + 9])
-        return received_bytes, transmitted_bytes
+        sample = self.py3.proc_sample("net/dev", newer_than=self.last_time)
+        counters = sample.data[self.nic]
+        received_bytes = counters[0]
+        transmitted_bytes = counters[8]
+        return received_bytes, transmitted_bytes, sample.time
 
     def netdata(self):
-        received_bytes, transmitted_bytes = self._get_bytes()
+        received_bytes, transmitted_bytes, current_time = self._get_bytes()
         # speed
-        current_time = time()
         timedelta = current_time - self.last_time
         self.last_time = current_time
         down = (received_bytes - self.last_received_bytes) / 1024 / timedelta
@@ -3,8 +3,11 @@
 Display NetworkManager fields via nmcli, a command-line tool.
 
 Configuration parameters:
-    cache_timeout: refresh interval for this module (default 10)
-    devices: specify a list of devices to use (default ['[e|w]*'])
+    cache_timeout: refresh interval for this module, devices are also
+        updated as soon as NetworkManager reports a change.  Only used when
+        showing access point fields (default 10)
+    devices: specify a list of devices to use, all of them if empty
+        (default ['[e|w]*'])
     format: display format for this module (default '{format_device}')
     format_device: format for devices
         *(default "[\?if=general_connection {general_device}[\?soft  ]"
@@ -65,7 +68,10 @@ wifi
 ]
 """
 
+import re
+from collections import OrderedDict
 from fnmatch import fnmatch
+from time import time
 
 STRING_NOT_INSTALLED = "not installed"
 
@@ -91,8 +97,7 @@ class Py3status:
         if not self.py3.check_commands(command.split()[0]):
             raise Exception(STRING_NOT_INSTALLED)
 
-        self.first_run = True
-
+        placeholders = self.py3.get_placeholders_list(self.format_device)
         addresses = [
             x.split("_")[0]
             for x in self.py3.get_placeholders_list(
@@ -103,30 +108,68 @@ class Py3status:
         self.nmcli_command = "{} --fields={} device show".format(
             command, ",".join(["general", "ap"] + addresses)
         ).split()
-        self.caches = {"lines": {}, "devices": {}}
-        self.devices = {"list": [], "devices": self.devices}
+        self.caches = {"lines": {}, "devices": {}, "wanted": {}}
 
         self.thresholds_init = self.py3.get_color_names_list(self.format_device)
 
+        # the device table is kept up to date from `nmcli monitor` events,
+        # the signal strength of access points still needs polling
+        self.changed = set()
+        self.polled = any(x.startswith("ap") for x in placeholders)
+        self.refresh_at = 0
+        self.table = None
+        self.re_event = re.compile(r"([^\s:']+): ")
+        try:
+            self.monitor = self.py3.command_stream(
+                ["nmcli", "monitor"], self._monitor_event, self._monitor_exit
+            )
+        except self.py3.CommandError:
+            self.monitor = None
+        self.py3.register_network_events(["link", "address"], self._network_changed)
+
+    def _monitor_event(self, line):
+        event = self.re_event.match(line)
+        if event:
+            self.changed.add(event.group(1))
+            self.py3.update()
+
+    def _monitor_exit(self, returncode):
+        self.monitor = None
+        self.py3.update()
+
+    def _network_changed(self):
+        # addresses are not in the monitor events
+        self.refresh_at = 0
+
     def _update_key(self, key):
         for old, new in [("[", ""), ("]", ""), (".", "_"), ("-", "_")]:
             key = key.replace(old, new)
         return key.lower()
 
-    def networkmanager(self):
-        nm_data = self.py3.command_output(self.nmcli_command, localized=True)
-        new_device = []
+    def _is_wanted(self, name):
+        try:
+            return self.caches["wanted"][name]
+        except KeyError:
+            wanted = not self.devices or any(fnmatch(name, x) for x in self.devices)
+            self.caches["wanted"][name] = wanted
+            return wanted
+
+    def _get_devices(self, name=None):
+        """
+        Return an OrderedDict of the devices, or the named device, we show.
+        """
+        command = self.nmcli_command + ([name] if name else [])
+        nm_data = self.py3.command_output(command, localized=True)
+        devices = OrderedDict()
 
         for chunk in nm_data.split("\n\n"):
             lines = chunk.splitlines()
+            if not lines:
+                continue
             key, value = lines[0].split(":", 1)
-            if self.first_run:
-                if self.devices["devices"]:
-                    for _filter in self.devices["devices"]:
-                        if fnmatch(value, _filter):
-                            self.devices["list"].append(value)
-            if value not in self.devices["list"]:
+            if not self._is_wanted(value):
                 continue
+            name = value
 
             try:
                 key = self.caches["devices"][key]
@@ -156,6 +199,43 @@ class Py3status:
 
                 device[key] = value
 
+            devices[name] = device
+        return devices
+
+    def _update_table(self):
+        current_time = time()
+        # refresh_at is 0 when a full refresh is needed
+        expired = current_time >= self.refresh_at
+        if (
+            self.table is None
+            or self.monitor is None
+            or (expired and (self.polled or not self.refresh_at))
+        ):
+            self.changed.clear()
+            self.table = self._get_devices()
+            self.refresh_at = current_time + self.cache_timeout
+            return
+        # only the devices that changed
+        while self.changed:
+            name = self.changed.pop()
+            if not self._is_wanted(name):
+                continue
+            try:
+                devices = self._get_devices(name)
+            except self.py3.CommandError:
+                # the device is gone
+                devices = {}
+            if devices:
+                self.table.update(devices)
+            else:
+                self.table.pop(name, None)
+
+    def networkmanager(self):
+        self._update_table()
+        new_device = []
+
+        for device in self.table.values():
+            device = dict(device)
             for x in self.thresholds_init:
                 if x in device:
                     self.py3.threshold_get_color(device[x], x)
@@ -165,10 +245,13 @@ class Py3status:
         format_device_separator = self.py3.safe_format(self.format_device_separator)
         format_device = self.py3.composite_join(format_device_separator, new_device)
 
-        self.first_run = False
+        if self.monitor and not self.polled:
+            cached_until = self.py3.CACHE_FOREVER
+        else:
+            cached_until = self.py3.time_in(self.cache_timeout)
 
         return {
-            "cache_until": self.py3.time_in(self.cache_timeout),
+            "cached_until": cached_until,
             "full_text": self.py3.safe_format(
                 self.format, {"format_device": format_device}
             ),
@@ -3,7 +3,8 @@
 Determine if you have an Internet Connection.
 
 Configuration parameters:
-    cache_timeout: refresh interval for this module (default 10)
+    cache_timeout: refresh interval for this module, the module is also
+        updated when the network changes (default 10)
     format: display format for this module (default '{icon}')
     icon_off: show when connection is offline (default '■')
     icon_on: show when connection is online (default '●')
@@ -66,6 +67,7 @@ class Py3status:
         self.color_on = self.py3.COLOR_ON or self.py3.COLOR_GOOD
         self.color_off = self.py3.COLOR_OFF or self.py3.COLOR_BAD
         self.ping_command = ["ping", "-c", "1", "-W", "%s" % self.timeout, self.url]
+        self.py3.register_network_events(["address", "route"])
 
     def _connection_present(self):
         if "://" in self.url:
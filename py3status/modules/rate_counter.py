@@ -3,7 +3,8 @@
 Display time spent and calculate the price of your service.
 
 Configuration parameters:
-    cache_timeout: how often to update in seconds (default 5)
+    cache_timeout: how often to update in seconds when the timer is running
+        (default 5)
     config_file: file path to store the time already spent
         and restore it the next session
         (default '~/.i3/py3status/counter-config.save')
@@ -66,6 +67,15 @@ class Py3status:
         self.running = False
         self.saved_time = 0
         self.start_time = self.current_time
+        self._load_saved_time()
+        # the time can be reset by other instances
+        self.watched = self.py3.register_file_watch(
+            self.config_file, callback=self._load_saved_time
+        )
+
+    def _load_saved_time(self):
+        if self.running:
+            return
         try:
             # Use file to refer to the file object
             with open(self.config_file) as file:
@@ -148,8 +158,13 @@ class Py3status:
         tax_cost = self.py3.safe_format(
             self.format_money, {"price": "%.2f" % (total - subtotal)}
         )
+        if self.running or not self.watched:
+            cached_until = self.py3.time_in(self.cache_timeout)
+        else:
+            # a stopped timer only changes on clicks or a reset elsewhere
+            cached_until = self.py3.CACHE_FOREVER
         response = {
-            "cached_until": self.py3.time_in(self.cache_timeout),
+            "cached_until": cached_until,
             "color": color,
             "full_text": self.py3.safe_format(
                 self.format,
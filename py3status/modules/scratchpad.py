@@ -19,6 +19,10 @@ Color thresholds:
 Optional:
     i3ipc: an improved python library to control i3wm and sway
 
+Notes:
+    The window manager IPC socket is used natively when it is found, the
+    module is then only updated on window events.
+
 Examples:
 ```
 # hide zero scratchpad
@@ -122,8 +126,11 @@ class Msg(Ipc):
         wm_msg = {"i3msg": "i3-msg"}.get(parent.ipc, parent.ipc)
         self.tree_command = [wm_msg, "-t", "get_tree"]
 
+    def get_tree(self):
+        return self.json_loads(self.parent.py3.command_output(self.tree_command))
+
     def get_scratchpad_data(self):
-        tree = self.json_loads(self.parent.py3.command_output(self.tree_command))
+        tree = self.get_tree()
         leaves = self.find_scratchpad(tree).get("floating_nodes", [])
         return {
             "ipc": self.parent.ipc,
@@ -141,6 +148,35 @@ class Msg(Ipc):
         return {}
 
 
+class Native(Msg):
+    """
+    native - talk to i3wm or sway over their IPC socket
+    """
+
+    def setup(self, parent):
+        self.scratchpad_data = None
+        if parent.py3.register_wm_events(["window"], self.on_event):
+            parent.cache_timeout = parent.py3.CACHE_FOREVER
+
+    def get_tree(self):
+        return self.parent.py3.get_wm_tree()
+
+    def on_event(self, event, payload):
+        if payload and payload.get("change") not in ["move", "urgent", "close"]:
+            return
+        try:
+            scratchpad_data = Msg.get_scratchpad_data(self)
+        except self.parent.py3.Py3Exception:
+            return
+        if self.scratchpad_data != scratchpad_data:
+            self.scratchpad_data = scratchpad_data
+            self.parent.py3.update()
+
+    def get_scratchpad_data(self):
+        self.scratchpad_data = Msg.get_scratchpad_data(self)
+        return self.scratchpad_data
+
+
 class Py3status:
     """
     """
@@ -151,8 +187,14 @@ class Py3status:
     thresholds = [(0, "darkgray"), (1, "violet")]
 
     def post_config_hook(self):
-        # ipc: specify i3ipc, i3-msg, or swaymsg, otherwise auto
+        # ipc: specify native, i3ipc, i3-msg, or swaymsg, otherwise auto
         self.ipc = getattr(self, "ipc", "")
+        if not self.ipc:
+            try:
+                self.py3.get_wm_tree()
+                self.ipc = "native"
+            except self.py3.Py3Exception:
+                pass
         if self.ipc in ["", "i3ipc"]:
             try:
                 from i3ipc import Connection  # noqa f401
@@ -163,7 +205,9 @@ class Py3status:
                     raise  # module not found
 
         self.ipc = (self.ipc or self.py3.get_wm_msg()).replace("-", "")
-        if self.ipc in ["i3ipc"]:
+        if self.ipc in ["native"]:
+            self.backend = Native(self)
+        elif self.ipc in ["i3ipc"]:
             self.backend = I3ipc(self)
         elif self.ipc in ["i3msg", "swaymsg"]:
             self.backend = Msg(self)
@@ -18,10 +18,14 @@ Configuration parameters:
         ['dynamic', 'KiB', 'MiB', 'GiB'] (default 'GiB')
     swap_unit: the unit of swap to use in report, case insensitive.
         ['dynamic', 'KiB', 'MiB', 'GiB'] (default 'GiB')
+    sysfs: read the CPU temperature from sysfs instead of running `sensors`,
+        this is faster but sensors.conf (labels, compute, ignore, set) is not
+        used then (default False)
     temp_unit: unit used for measuring the temperature ('C', 'F' or 'K')
         (default '°C')
     thresholds: specify color thresholds to use
         (default [(0, "good"), (40, "degraded"), (75, "bad")])
+    top_cpus: number of busiest CPUs shown in {format_cpu_top} (default 3)
     zone: Either a path in sysfs to CPU temperature sensor, or an lm_sensors thermal zone to use.
         If None try to guess CPU temperature
         (default None)
@@ -32,7 +36,9 @@ Format placeholders:
     {cpu_freq_unit} unit for frequency
     {cpu_temp} cpu temperature
     {cpu_used_percent} cpu used percentage
+    {cpuN_used_percent} used percentage of a CPU, eg {cpu0_used_percent}
     {format_cpu} format for CPUs
+    {format_cpu_top} format for the busiest CPUs, busiest first
     {load1} load average over the last minute
     {load5} load average over the five minutes
     {load15} load average over the fifteen minutes
@@ -77,6 +83,13 @@ sysdata {
     format_cpu = "[\?min_length=4 [\?color=used_percent {used_percent:.0f}%]]"
 }
 
+# display the 2 busiest cpus and the usage of the first one
+sysdata {
+    format = "[\?color=cpu0_used_percent {cpu0_used_percent}%] {format_cpu_top}"
+    format_cpu = "{name} {used_percent:.0f}%"
+    top_cpus = 2
+}
+
 # display per cpu histogram
 sysdata {
     format = "CPU Histogram [\?color=cpu_used_percent {format_cpu}]"
@@ -100,11 +113,64 @@ SAMPLE OUTPUT
 """
 
 from __future__ import division
+from array import array
 from fnmatch import fnmatch
+from heapq import nlargest
+from operator import itemgetter
 from os import getloadavg
 
 import re
 
+# the /proc/stat fields of an offline cpu
+OFFLINE = [0] * 4
+
+
+class CpuStats:
+    """
+    Usage of the CPUs calculated from /proc/stat samples.
+
+    The idle and total times of the previous sample are kept in arrays
+    indexed like names so that the usage of all the CPUs is calculated in a
+    single pass over them, even on hosts with a lot of them.
+    """
+
+    def __init__(self, names):
+        self.names = names
+        self.cores = [i for i, name in enumerate(names) if name != "cpu"]
+        self.index = {name: i for i, name in enumerate(names)}
+        self.last_idle = array("d", [0] * len(names))
+        self.last_total = array("d", [0] * len(names))
+        self.used = array("d", [0] * len(names))
+
+    def update(self, stat):
+        # offline cpus are missing from /proc/stat
+        rows = [stat.get(name, OFFLINE) for name in self.names]
+        idle = array("d", map(itemgetter(3), rows))
+        total = array("d", map(sum, rows))
+        # the usage is kept if the times did not move, offline cpus are unused
+        self.used = array(
+            "d",
+            [
+                (1 - (i - last_i) / (t - last_t)) * 100 if t > last_t else t and used
+                for i, last_i, t, last_t, used in zip(
+                    idle, self.last_idle, total, self.last_total, self.used
+                )
+            ],
+        )
+        self.last_idle = idle
+        self.last_total = total
+
+    def used_percent(self, name):
+        return self.used[self.index[name]]
+
+    def top(self, count):
+        """
+        Names of the count busiest CPUs, busiest first.
+        """
+        used = self.used
+        busiest = nlargest(count, self.cores, key=lambda i: used[i])
+        return [self.names[i] for i in busiest]
+
 
 class Py3status:
     """
@@ -123,8 +189,10 @@ class Py3status:
     format_cpu_separator = " "
     mem_unit = "GiB"
     swap_unit = "GiB"
+    sysfs = False
     temp_unit = u"°C"
     thresholds = [(0, "good"), (40, "degraded"), (75, "bad")]
+    top_cpus = 3
     zone = None
 
     class Meta:
@@ -210,7 +278,6 @@ class Py3status:
         }
 
     def post_config_hook(self):
-        self.first_run = True
         temp_unit = self.temp_unit.upper()
         if temp_unit in ["C", u"°C"]:
             temp_unit = u"°C"
@@ -225,6 +292,7 @@ class Py3status:
             ("cpu_temp", "cpu_temp"),
             ("cpu_percent", "cpu_used_percent"),
             ("cpu_per_core", "format_cpu"),
+            ("cpu_top", "format_cpu_top"),
             ("load", "load*"),
             ("mem", "mem_*"),
             ("swap", "swap_*"),
@@ -239,9 +307,24 @@ class Py3status:
             if self.init[name]:
                 if name in ["mem", "swap"]:
                     self.init["meminfo"].append(name)
-                elif name in ["cpu_percent", "cpu_per_core"]:
+                elif name in ["cpu_percent", "cpu_per_core", "cpu_top"]:
                     self.init["stat"].append(name)
 
+        # per cpu placeholders eg {cpu0_used_percent}
+        self.init["cpu_each"] = [
+            x
+            for x in set(
+                self.py3.get_placeholders_list(self.format, "cpu*_used_percent")
+                + self.py3.get_color_names_list(self.format, "cpu*_used_percent")
+            )
+            if re.match(r"cpu\d+_used_percent$", x)
+        ]
+        if self.init["cpu_each"]:
+            self.init["stat"].append("cpu_each")
+            self.format = self.py3.update_placeholder_formats(
+                self.format, {x: ":.2f" for x in self.init["cpu_each"]}
+            )
+
         self.thresholds_init = {
             "format": self.py3.get_color_names_list(self.format),
             "format_cpu": self.py3.get_color_names_list(self.format_cpu),
@@ -260,11 +343,12 @@ class Py3status:
             self.thresholds_init["legacy"]["cpu_freq"] = name
 
         if self.init["stat"]:
-            self.cpus = {"cpus": self.cpus, "last": {}, "list": []}
+            self.cpu_stats = None
+            self.stat_time = None
 
     def _get_cpuinfo(self):
-        with open("/proc/cpuinfo") as f:
-            return [float(line.split()[-1]) for line in f if "cpu MHz" in line]
+        cpuinfo = self.py3.proc_sample("cpuinfo").data
+        return [float(cpu["cpu MHz"]) for cpu in cpuinfo if "cpu MHz" in cpu]
 
     def _calc_cpu_freqs(self, cpu_freqs, unit, keys):
         freq_avg, freq_max = None, None
@@ -279,35 +363,22 @@ class Py3status:
 
     def _get_stat(self):
         # kernel/system statistics. man -P 'less +//proc/stat' procfs
-        stat = []
-        with open("/proc/stat") as f:
-            for line in f:
-                if "cpu" in line:
-                    stat.append(line)
-                else:
-                    return stat
-
-    def _filter_stat(self, stat, avg=False):
-        # if avg, return (name, idle, total)
-        if avg:
-            fields = stat[0].split()
-            return "avg", int(fields[4]), sum(map(int, fields[1:]))
-
-        # return a list of (name, idle, total)
-        new_stat = []
-        for line in stat:
-            fields = line.split()
-            cpu_name = fields[0]
-            if self.cpus["cpus"]:
-                if self.first_run:
-                    for _filter in self.cpus["cpus"]:
-                        if fnmatch(cpu_name, _filter):
-                            self.cpus["list"].append(cpu_name)
-                if cpu_name not in self.cpus["list"]:
-                    continue
-
-            new_stat.append((cpu_name, int(fields[4]), sum(map(int, fields[1:]))))
-        return new_stat
+        # we need a new sample to calculate the cpu usage
+        sample = self.py3.proc_sample("stat", newer_than=self.stat_time)
+        self.stat_time = sample.time
+        stat = sample.data
+
+        if self.cpu_stats is None:
+            names = list(stat)
+            self.cpu_stats = CpuStats(names)
+            # cpus shown by format_cpu
+            self.cpu_list = [
+                name
+                for name in names
+                if not self.cpus or any(fnmatch(name, x) for x in self.cpus)
+            ]
+        self.cpu_stats.update(stat)
+        return self.cpu_stats
 
     def _calc_mem_info(self, unit, meminfo, memory):
         """
@@ -316,19 +387,19 @@ class Py3status:
         of used memory, and units of mem (KiB, MiB, GiB).
         """
         if memory:
-            total_mem_kib = meminfo["MemTotal:"]
+            total_mem_kib = meminfo["MemTotal"]
             used_mem_kib = (
                 total_mem_kib
-                - meminfo["MemFree:"]
+                - meminfo["MemFree"]
                 - (
-                    meminfo["Buffers:"]
-                    + meminfo["Cached:"]
-                    + (meminfo["SReclaimable:"] - meminfo["Shmem:"])
+                    meminfo["Buffers"]
+                    + meminfo["Cached"]
+                    + (meminfo["SReclaimable"] - meminfo["Shmem"])
                 )
             )
         else:
-            total_mem_kib = meminfo["SwapTotal:"]
-            used_mem_kib = total_mem_kib - meminfo["SwapFree:"]
+            total_mem_kib = meminfo["SwapTotal"]
+            used_mem_kib = total_mem_kib - meminfo["SwapFree"]
 
         if total_mem_kib == 0:
             used_percent = 0
@@ -340,33 +411,38 @@ class Py3status:
         (used, used_unit) = self.py3.format_units(used_mem_kib * 1024, unit)
         return total, total_unit, used, used_unit, used_percent
 
-    def _get_meminfo(self, head=24):
-        with open("/proc/meminfo") as f:
-            info = [line.split() for line in (next(f) for x in range(head))]
-            return {fields[0]: float(fields[1]) for fields in info}
+    def _get_meminfo(self):
+        return self.py3.proc_sample("meminfo").data
 
-    def _calc_cpu_percent(self, cpu):
-        name, idle, total = cpu
-        last_idle = self.cpus["last"].get(name, {}).get("idle", 0)
-        last_total = self.cpus["last"].get(name, {}).get("total", 0)
-        used_percent = 0
+    def _format_cpus(self, names):
+        new_cpu = []
+        for name in names:
+            cpu = {"name": name, "used_percent": self.cpu_stats.used_percent(name)}
+            for x in self.thresholds_init["format_cpu"]:
+                if x in cpu:
+                    self.py3.threshold_get_color(cpu[x], x)
+            new_cpu.append(self.py3.safe_format(self.format_cpu, cpu))
 
-        if total != last_total:
-            used_percent = (1 - (idle - last_idle) / (total - last_total)) * 100
-
-        self.cpus["last"].setdefault(name, {}).update(
-            zip(["name", "idle", "total"], cpu)
-        )
-        return used_percent
+        format_cpu_separator = self.py3.safe_format(self.format_cpu_separator)
+        return self.py3.composite_join(format_cpu_separator, new_cpu)
 
     def _get_cputemp_with_lmsensors(self, zone=None):
         """
-        Tries to determine CPU temperature using the 'sensors' command.
+        Tries to determine CPU temperature using the 'sensors' command, or
+        the hwmon sensors if sysfs is enabled.
         Searches for the CPU temperature by looking for a value prefixed
         by either "CPU Temp" or "Core 0" - does not look for or average
         out temperatures of all codes if more than one.
         """
 
+        if self.sysfs:
+            chips = [zone] if zone else None
+            for chip in self.py3.read_sensors(chips, keys=["input"]):
+                for label in ("Core 0", "CPU Temp"):
+                    cpu_temp = chip["sensors"].get(label, {}).get("input")
+                    if cpu_temp is not None:
+                        return float(cpu_temp)
+
         sensors = None
         command = ["sensors"]
         if zone:
@@ -387,9 +463,8 @@ class Py3status:
     def _get_cputemp(self, zone, unit):
         if zone is not None:
             try:
-                with open(zone) as f:
-                    cpu_temp = f.readline()
-                    cpu_temp = float(cpu_temp) / 1000  # convert from mdegC to degC
+                cpu_temp = self.py3.read_sysfs(zone)
+                cpu_temp = float(cpu_temp) / 1000  # convert from mdegC to degC
             except (OSError, IOError, ValueError):
                 # FileNotFoundError does not exist on Python < 3.3, so we catch OSError instead
                 # ValueError can be thrown if zone was a file that didn't have a float
@@ -418,25 +493,17 @@ class Py3status:
             sys.update(zip(cpu_freq_keys, cpu_freqs))
 
         if self.init["stat"]:
-            stat = self._get_stat()
+            cpu_stats = self._get_stat()
 
             if self.init["cpu_percent"]:
-                cpu = self._filter_stat(stat, avg=True)
-                sys["cpu_used_percent"] = self._calc_cpu_percent(cpu)
+                sys["cpu_used_percent"] = cpu_stats.used_percent("cpu")
 
             if self.init["cpu_per_core"]:
-                cpu_keys = ["name", "used_percent"]
-                new_cpu = []
-                for cpu in self._filter_stat(stat):
-                    cpu = dict(zip(cpu_keys, [cpu[0], self._calc_cpu_percent(cpu)]))
-                    for x in self.thresholds_init["format_cpu"]:
-                        if x in cpu:
-                            self.py3.threshold_get_color(cpu[x], x)
-                    new_cpu.append(self.py3.safe_format(self.format_cpu, cpu))
-
-                format_cpu_separator = self.py3.safe_format(self.format_cpu_separator)
-                format_cpu = self.py3.composite_join(format_cpu_separator, new_cpu)
-                sys["format_cpu"] = format_cpu
+                sys["format_cpu"] = self._format_cpus(self.cpu_list)
+
+            if self.init["cpu_top"]:
+                top = cpu_stats.top(self.top_cpus)
+                sys["format_cpu_top"] = self._format_cpus(top)
 
         if self.init["cpu_temp"]:
             sys["cpu_temp"] = self._get_cputemp(self.zone, self.temp_unit)
@@ -474,6 +541,13 @@ class Py3status:
             [perc for name, perc in sys.items() if "used_percent" in name]
         )
 
+        for x in self.init["cpu_each"]:
+            try:
+                sys[x] = self.cpu_stats.used_percent(x.split("_")[0])
+            except KeyError:
+                # no such cpu
+                pass
+
         for x in self.thresholds_init["format"]:
             if x in sys:
                 self.py3.threshold_get_color(sys[x], x)
@@ -482,8 +556,6 @@ class Py3status:
                 if y in sys:
                     self.py3.threshold_get_color(sys[y], x)
 
-        self.first_run = False
-
         return {
             "cached_until": self.py3.time_in(self.cache_timeout),
             "full_text": self.py3.safe_format(self.format, sys),
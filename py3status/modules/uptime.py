@@ -61,7 +61,6 @@ SAMPLE OUTPUT
 {'full_text': 'up 1 days 18 hours 20 minutes'}
 """
 
-from time import time
 from datetime import datetime
 from collections import OrderedDict
 
@@ -92,9 +91,9 @@ class Py3status:
                 self.seconds, self.interval = None, second
 
     def uptime(self):
-        with open("/proc/uptime") as f:
-            up = int(float(f.readline().split()[0]))
-            offset = time() - up
+        sample = self.py3.proc_sample("uptime")
+        up = int(sample.data[0])
+        offset = sample.time - up
 
         uptime = {}
         for unit, interval in self.time_periods.items():
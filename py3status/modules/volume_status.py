@@ -8,7 +8,8 @@ Configuration parameters:
     button_down: button to decrease volume (default 5)
     button_mute: button to toggle mute (default 1)
     button_up: button to increase volume (default 4)
-    cache_timeout: how often we refresh this module in seconds.
+    cache_timeout: how often we refresh this module in seconds, not used with
+        pactl which tells us about volume changes.
         (default 10)
     card: Card to use. amixer supports this. (default None)
     channel: channel to track. Default value is backend dependent.
@@ -82,6 +83,8 @@ mute
 
 import re
 import math
+from time import time
+
 from py3status.exceptions import CommandError
 
 STRING_ERROR = "invalid command `%s`"
@@ -90,6 +93,9 @@ COMMAND_NOT_INSTALLED = "command `%s` not installed"
 
 
 class Audio:
+    # does the backend update the module when the volume changes?
+    streaming = False
+
     def __init__(self, parent):
         self.card = parent.card
         self.channel = parent.channel
@@ -208,7 +214,60 @@ class Pactl(Audio):
             self.device = self.get_default_device()
         self.update_device()
 
+        # pactl >= 15 can get the volume of a single device
+        try:
+            self.command_output(self.get_mute_cmd)
+            self.get_device_cmds = True
+        except CommandError:
+            self.get_device_cmds = False
+
+        # events tell us when the volume or the default device change
+        self.changes = 0
+        self.default_changed = False
+        self.subscribe_at = 0
+        self.subscription = None
+        self.volume = None
+        self.re_event = re.compile(r"Event '(\w+)' on ([\w-]+)(?: #(\d+))?")
+        self.subscribe()
+
+    def subscribe(self):
+        try:
+            self.subscription = self.parent.py3.command_stream(
+                ["pactl", "subscribe"], self.on_event, on_exit=self.on_exit
+            )
+        except CommandError:
+            self.subscription = None
+
+    @property
+    def streaming(self):
+        return self.subscription is not None
+
+    def on_event(self, line):
+        event = self.re_event.match(line)
+        if not event:
+            return
+        action, facility, index = event.groups()
+        if facility == "server" and self.use_default_device:
+            self.default_changed = True
+        elif facility != self.device_type:
+            return
+        elif index and self.device.isdigit() and index != self.device:
+            # another device
+            return
+        self.changes += 1
+        self.volume = None
+        self.parent.py3.update()
+
+    def on_exit(self, returncode):
+        # pulseaudio went away, poll for a while before trying again
+        self.subscribe_at = time() + self.parent.cache_timeout
+        self.subscription = None
+        self.volume = None
+        self.parent.py3.update()
+
     def update_device(self):
+        self.get_mute_cmd = ["pactl", "get-%s-mute" % self.device_type, self.device]
+        self.get_volume_cmd = ["pactl", "get-%s-volume" % self.device_type, self.device]
         self.re_volume = re.compile(
             r"{} (?:\#{}|.*?Name: {}).*?Mute: (\w{{2,3}}).*?Volume:.*?(\d{{1,3}})\%".format(
                 self.device_type_cap, self.device, self.device
@@ -249,8 +308,40 @@ class Pactl(Audio):
         )
 
     def get_volume(self):
+        if self.subscription is None and time() >= self.subscribe_at:
+            # we may have missed events
+            self.default_changed = True
+            self.subscribe()
+        volume = self.volume
+        if volume is not None:
+            return volume
+
+        changes = self.changes
+        if self.use_default_device and self.default_changed:
+            self.default_changed = False
+            self.device = self.get_default_device()
+            self.update_device()
+        if self.get_device_cmds:
+            volume = self.get_device_volume()
+        else:
+            volume = self.get_devices_volume()
+        if self.streaming and changes == self.changes:
+            # no events since we started, this is still the volume
+            self.volume = volume
+        return volume
+
+    def get_device_volume(self):
+        try:
+            muted = self.command_output(self.get_mute_cmd).split()[-1] == "yes"
+            perc = re.search(r"(\d{1,3})%", self.command_output(self.get_volume_cmd))
+            perc = perc.group(1)
+        except (AttributeError, CommandError, IndexError):
+            muted, perc = None, None
+        return perc, muted
+
+    def get_devices_volume(self):
         output = self.command_output(["pactl", "list", self.device_type_pl]).strip()
-        if self.use_default_device:
+        if self.use_default_device and not self.streaming:
             self.device = self.get_default_device()
             self.update_device()
         try:
@@ -315,6 +406,8 @@ class Py3status:
     volume_delta = 5
 
     class Meta:
+        coalesce_events = True
+
         def deprecate_function(config):
             # support old thresholds
             return {
@@ -384,23 +477,31 @@ class Py3status:
 
         volume_data = {"icon": icon, "percentage": perc}
 
+        if self.backend.streaming:
+            cached_until = self.py3.CACHE_FOREVER
+        else:
+            cached_until = self.py3.time_in(self.cache_timeout)
+
         return {
-            "cached_until": self.py3.time_in(self.cache_timeout),
+            "cached_until": cached_until,
             "full_text": self.py3.safe_format(new_format, volume_data),
             "color": color,
         }
 
     def on_click(self, event):
         button = event["button"]
+        # a burst of scrolling is applied with a single command
+        count = event.get("count", 1)
         if button == self.button_up:
             try:
-                self.backend.volume_up(self.volume_delta)
+                self.backend.volume_up(self.volume_delta * count)
             except TypeError:
                 pass
         elif button == self.button_down:
-            self.backend.volume_down(self.volume_delta)
+            self.backend.volume_down(self.volume_delta * count)
         elif button == self.button_mute:
-            self.backend.toggle_mute()
+            if count % 2:
+                self.backend.toggle_mute()
 
 
 if __name__ == "__main__":
@@ -6,7 +6,8 @@ Expands on the i3status module by displaying the name of the connected vpn
 using pydbus. Asynchronously updates on dbus signals unless check_pid is True.
 
 Configuration parameters:
-    cache_timeout: How often to refresh in seconds when check_pid is True.
+    cache_timeout: How often to refresh in seconds when check_pid is True,
+        the module is also refreshed when network links change.
         (default 10)
     check_pid: If True, act just like the default i3status module.
         (default False)
@@ -54,6 +55,9 @@ class Py3status:
     def post_config_hook(self):
         self.thread_started = False
         self.active = []
+        if self.check_pid:
+            # vpn links coming up or down
+            self.py3.register_network_events(["link"])
 
     def _start_handler_thread(self):
         """Called once to start the event handler thread."""
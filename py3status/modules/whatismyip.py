@@ -5,7 +5,8 @@ Display public IP address and online status.
 Configuration parameters:
     button_refresh: mouse button to refresh this module (default 2)
     button_toggle: mouse button to toggle between states (default 1)
-    cache_timeout: how often we refresh this module in seconds (default 60)
+    cache_timeout: how often we refresh this module in seconds, the module
+        is also refreshed when the network changes (default 60)
     expected: define expected values for format placeholders,
         and use `color_degraded` to show the output of this module
         if any of them does not match the actual value.
@@ -109,6 +110,10 @@ class Py3status:
         self.ip_data = {}
         self.toggled = False
         self.idle_time = 0
+        self.py3.register_network_events(["address", "route"], self._network_changed)
+
+    def _network_changed(self):
+        self.idle_time = 0
 
     def _get_my_ip_info(self):
         try:
@@ -7,7 +7,8 @@ Configuration parameters:
     bitrate_degraded: Degraded bit rate in Mbit/s (default 53)
     blocks: a string, where each character represents quality level
         (default "_▁▂▃▄▅▆▇█")
-    cache_timeout: Update interval in seconds (default 10)
+    cache_timeout: Update interval in seconds, the module is also updated
+        when the network changes (default 10)
     device: specify name or MAC address of device to use, otherwise auto
         (default None)
     down_color: Output color when disconnected, possible values:
@@ -131,6 +132,7 @@ class Py3status:
         self.signal_dbm_bad = self._percent_to_dbm(self.signal_bad)
         self.signal_dbm_degraded = self._percent_to_dbm(self.signal_degraded)
         self.thresholds_init = self.py3.get_color_names_list(self.format)
+        self.py3.register_network_events(["link", "address"])
 
         # DEPRECATION WARNING
         format_down = getattr(self, "format_down", None)
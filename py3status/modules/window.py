@@ -16,6 +16,10 @@ Format placeholders:
 Optional:
     i3ipc: an improved python library to control i3wm and sway
 
+Notes:
+    The window manager IPC socket is used natively when it is found, the
+    module is then only updated on window events.
+
 Examples:
 ```
 # show alternative instead of empty title
@@ -128,11 +132,16 @@ class Msg(Ipc):
         wm_msg = {"i3msg": "i3-msg"}.get(parent.ipc, parent.ipc)
         self.tree_command = [wm_msg, "-t", "get_tree"]
 
+    def get_tree(self):
+        return self.json_loads(self.parent.py3.command_output(self.tree_command))
+
     def get_window_properties(self):
-        tree = self.json_loads(self.parent.py3.command_output(self.tree_command))
+        tree = self.get_tree()
         focused = self.find_needle(tree)
-        window_properties = focused.get(
-            "window_properties", {"title": None, "class": None, "instance": None}
+        window_properties = dict(
+            focused.get(
+                "window_properties", {"title": None, "class": None, "instance": None}
+            )
         )
 
         # hide title on containers with window title
@@ -168,6 +177,36 @@ class Msg(Ipc):
         return {}
 
 
+class Native(Msg):
+    """
+    native - talk to i3wm or sway over their IPC socket
+    """
+
+    def setup(self, parent):
+        self.window_properties = None
+        if parent.py3.register_wm_events(
+            ["window", "workspace", "binding"], self.on_event
+        ):
+            parent.cache_timeout = parent.py3.CACHE_FOREVER
+
+    def get_tree(self):
+        return self.parent.py3.get_wm_tree()
+
+    def on_event(self, event, payload):
+        # the tree is kept up to date for us
+        try:
+            window_properties = Msg.get_window_properties(self)
+        except self.parent.py3.Py3Exception:
+            return
+        if self.window_properties != window_properties:
+            self.window_properties = window_properties
+            self.parent.py3.update()
+
+    def get_window_properties(self):
+        self.window_properties = Msg.get_window_properties(self)
+        return self.window_properties
+
+
 class Py3status:
     """
     """
@@ -179,8 +218,14 @@ class Py3status:
     max_width = None
 
     def post_config_hook(self):
-        # ipc: specify i3ipc, i3-msg, or swaymsg, otherwise auto
+        # ipc: specify native, i3ipc, i3-msg, or swaymsg, otherwise auto
         self.ipc = getattr(self, "ipc", "")
+        if not self.ipc:
+            try:
+                self.py3.get_wm_tree()
+                self.ipc = "native"
+            except self.py3.Py3Exception:
+                pass
         if self.ipc in ["", "i3ipc"]:
             try:
                 from i3ipc import Connection  # noqa f401, auto ipc
@@ -191,7 +236,9 @@ class Py3status:
                     raise  # module not found
 
         self.ipc = (self.ipc or self.py3.get_wm_msg()).replace("-", "")
-        if self.ipc in ["i3ipc"]:
+        if self.ipc in ["native"]:
+            self.backend = Native(self)
+        elif self.ipc in ["i3ipc"]:
             self.backend = I3ipc(self)
         elif self.ipc in ["i3msg", "swaymsg"]:
             self.backend = Msg(self)
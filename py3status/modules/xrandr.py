@@ -166,6 +166,7 @@ class Py3status:
     output_combinations = None
 
     class Meta:
+        coalesce_events = True
         deprecated = {
             "rename": [
                 {
@@ -460,10 +461,12 @@ class Py3status:
         """
         self._no_force_on_change = True
         button = event["button"]
+        # a burst of scrolling moves through the modes at once
+        count = event.get("count", 1)
         if button == 4:
-            self._switch_selection(-1)
+            self._switch_selection(-count)
         if button in [1, 5]:
-            self._switch_selection(1)
+            self._switch_selection(count)
         if button == 2:
             self._choose_what_to_display(force_refresh=True)
         if button == 3:
@@ -0,0 +1,241 @@
+import os
+import socket
+import struct
+
+from collections import OrderedDict
+
+NETLINK_ROUTE = 0
+
+# message types
+NLMSG_NOOP = 1
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_GETLINK = 18
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_GETADDR = 22
+RTM_NEWROUTE = 24
+RTM_DELROUTE = 25
+
+# message flags
+NLM_F_REQUEST = 0x1
+NLM_F_MULTI = 0x2
+NLM_F_DUMP = 0x300
+
+# multicast groups
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV4_ROUTE = 0x40
+RTMGRP_IPV6_IFADDR = 0x100
+RTMGRP_IPV6_ROUTE = 0x400
+
+# attributes
+IFLA_IFNAME = 3
+IFLA_OPERSTATE = 16
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+IFA_LABEL = 3
+
+IFF_UP = 0x1
+OPERSTATES = ["unknown", "notpresent", "down", "lowerlayerdown", "testing"]
+OPERSTATES += ["dormant", "up"]
+
+NLMSGHDR = struct.Struct("=IHHII")
+NLMSGERR = struct.Struct("=i")
+RTATTR = struct.Struct("=HH")
+RTGENMSG = struct.Struct("=B3x")
+IFINFOMSG = struct.Struct("=BxHiII")
+IFADDRMSG = struct.Struct("=BBBBI")
+
+RECV_SIZE = 65536
+
+
+class NetlinkError(Exception):
+    pass
+
+
+def available():
+    """
+    Is rtnetlink usable here (ie are we on linux)?
+    """
+    if not hasattr(socket, "AF_NETLINK"):
+        return False
+    try:
+        socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE).close()
+    except (IOError, OSError):
+        return False
+    return True
+
+
+def _align(length):
+    return (length + 3) & ~3
+
+
+def parse_messages(data):
+    """
+    Yield the (type, flags, seq, payload) of each message in data.
+    """
+    offset = 0
+    while offset + NLMSGHDR.size <= len(data):
+        length, msg_type, flags, seq, pid = NLMSGHDR.unpack_from(data, offset)
+        if length < NLMSGHDR.size:
+            break
+        yield msg_type, flags, seq, data[offset + NLMSGHDR.size : offset + length]
+        offset += _align(length)
+
+
+def parse_attributes(data, offset=0):
+    """
+    Return a dict of rtattr type to its raw value.
+    """
+    attributes = {}
+    while offset + RTATTR.size <= len(data):
+        length, attr_type = RTATTR.unpack_from(data, offset)
+        if length < RTATTR.size:
+            break
+        attributes[attr_type] = data[offset + RTATTR.size : offset + length]
+        offset += _align(length)
+    return attributes
+
+
+def _string(value):
+    return value.split(b"\0", 1)[0].decode("utf-8", "replace")
+
+
+def parse_link(payload):
+    """
+    Return a dict with the index, name, flags and operstate of a link.
+    """
+    family, link_type, index, flags, change = IFINFOMSG.unpack_from(payload)
+    attributes = parse_attributes(payload, IFINFOMSG.size)
+    operstate = attributes.get(IFLA_OPERSTATE)
+    if operstate:
+        operstate = struct.unpack("=B", operstate[:1])[0]
+        operstate = OPERSTATES[operstate] if operstate < len(OPERSTATES) else None
+    return {
+        "index": index,
+        "name": _string(attributes.get(IFLA_IFNAME, b"")),
+        "flags": flags,
+        "operstate": operstate,
+    }
+
+
+def parse_address(payload):
+    """
+    Return a dict with the family, address, prefixlen, scope and link index
+    of an address.
+    """
+    family, prefixlen, flags, scope, index = IFADDRMSG.unpack_from(payload)
+    attributes = parse_attributes(payload, IFADDRMSG.size)
+    # for point to point links IFA_ADDRESS is the peer, `ip` shows IFA_LOCAL
+    address = attributes.get(IFA_LOCAL) or attributes.get(IFA_ADDRESS)
+    if address:
+        address = socket.inet_ntop(family, address)
+    return {
+        "family": family,
+        "address": address,
+        "prefixlen": prefixlen,
+        "scope": scope,
+        "index": index,
+        "label": _string(attributes.get(IFA_LABEL, b"")) or None,
+    }
+
+
+class NetlinkSocket:
+    """
+    A rtnetlink socket, subscribed to the given multicast groups if any.
+    """
+
+    def __init__(self, groups=0):
+        self.seq = 0
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+        try:
+            self.sock.bind((0, groups))
+        except (IOError, OSError):
+            self.sock.close()
+            raise
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def close(self):
+        self.sock.close()
+
+    def receive(self):
+        """
+        Block until messages are available and return their
+        (type, flags, seq, payload).
+        """
+        return list(parse_messages(self.sock.recv(RECV_SIZE)))
+
+    def dump(self, msg_type, family=socket.AF_UNSPEC):
+        """
+        Request a dump (eg RTM_GETLINK) and return the payloads of the replies.
+        """
+        self.seq += 1
+        body = RTGENMSG.pack(family)
+        header = NLMSGHDR.pack(
+            NLMSGHDR.size + len(body),
+            msg_type,
+            NLM_F_REQUEST | NLM_F_DUMP,
+            self.seq,
+            0,
+        )
+        self.sock.send(header + body)
+        payloads = []
+        while True:
+            for reply_type, flags, seq, payload in self.receive():
+                if seq != self.seq:
+                    continue
+                if reply_type == NLMSG_DONE:
+                    return payloads
+                if reply_type == NLMSG_ERROR:
+                    error = -NLMSGERR.unpack_from(payload)[0]
+                    if error:
+                        raise NetlinkError(os.strerror(error))
+                    return payloads
+                payloads.append(payload)
+
+
+def get_links():
+    """
+    Return an OrderedDict of link index to link, ordered by index.
+    """
+    nl = NetlinkSocket()
+    try:
+        links = [parse_link(x) for x in nl.dump(RTM_GETLINK)]
+    finally:
+        nl.close()
+    links.sort(key=lambda x: x["index"])
+    return OrderedDict((x["index"], x) for x in links)
+
+
+def get_addresses():
+    """
+    Return a list of all the addresses.
+    """
+    nl = NetlinkSocket()
+    try:
+        return [parse_address(x) for x in nl.dump(RTM_GETADDR)]
+    finally:
+        nl.close()
+
+
+def get_interfaces():
+    """
+    Return an OrderedDict, like `ip address show`, of interface name to a
+    dict with its link and its ip4 and ip6 address lists.
+    """
+    interfaces = OrderedDict()
+    links = get_links()
+    for link in links.values():
+        interfaces[link["name"]] = {"link": link, "ip4": [], "ip6": []}
+    for address in get_addresses():
+        link = links.get(address["index"])
+        if link is None or not address["address"]:
+            continue
+        key = "ip4" if address["family"] == socket.AF_INET else "ip6"
+        interfaces[link["name"]][key].append(address["address"])
+    return interfaces
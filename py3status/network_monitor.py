@@ -0,0 +1,172 @@
+import errno
+import select
+
+from threading import Lock, Thread
+from time import sleep, time
+
+from py3status import netlink
+
+# network changes come in bursts, eg link up then addresses then routes
+DEBOUNCE = 0.5
+
+# seconds to wait before reopening the netlink socket after an error
+REOPEN_DELAY = 5
+
+EVENT_GROUPS = {
+    "address": netlink.RTMGRP_IPV4_IFADDR | netlink.RTMGRP_IPV6_IFADDR,
+    "link": netlink.RTMGRP_LINK,
+    "route": netlink.RTMGRP_IPV4_ROUTE | netlink.RTMGRP_IPV6_ROUTE,
+}
+
+MESSAGE_EVENTS = {
+    netlink.RTM_NEWLINK: "link",
+    netlink.RTM_DELLINK: "link",
+    netlink.RTM_NEWADDR: "address",
+    netlink.RTM_DELADDR: "address",
+    netlink.RTM_NEWROUTE: "route",
+    netlink.RTM_DELROUTE: "route",
+}
+
+
+class NetworkMonitor:
+    """
+    This class allows us to react to network changes (links, addresses and
+    routes) reported by the kernel over rtnetlink.
+    """
+
+    def __init__(self, py3_wrapper):
+        """
+        The network monitoring will be lazy loaded if a module uses it.
+        """
+        self.consumers = []
+        self.lock = Lock()
+        self.netlink = None
+        self.netlink_available = None
+        self.py3_wrapper = py3_wrapper
+
+    def _open_netlink(self):
+        groups = 0
+        for group in EVENT_GROUPS.values():
+            groups |= group
+        self.netlink = netlink.NetlinkSocket(groups)
+
+    def _setup_netlink_monitoring(self):
+        """
+        Setup the netlink socket and its thread.
+        """
+        self._open_netlink()
+        thread = Thread(target=self._loop)
+        thread.daemon = True
+        thread.start()
+        self.py3_wrapper.log("network monitoring enabled")
+
+    def subscribe(self, py3_module, events=None, callback=None):
+        """
+        Subscribe the given module to the given network events (link, address,
+        route), all of them by default.
+
+        Here we will lazy load the monitor if necessary and return success or
+        failure based on the availability of netlink.
+        """
+        events = set(events or EVENT_GROUPS)
+        invalid = events - set(EVENT_GROUPS)
+        if invalid:
+            self.py3_wrapper.log(
+                "module %s: invalid network events %s"
+                % (py3_module.module_full_name, ", ".join(sorted(invalid)))
+            )
+            return False
+        with self.lock:
+            if self.netlink_available is None:
+                self.netlink_available = netlink.available()
+            if not self.netlink_available:
+                self.py3_wrapper.log(
+                    "netlink not available: module %s not subscribed to network "
+                    "events" % py3_module.module_full_name
+                )
+                return False
+            # lazy load the network monitor
+            if self.netlink is None:
+                self._setup_netlink_monitoring()
+            self.consumers.append((py3_module, events, callback))
+        self.py3_wrapper.log(
+            "module %s subscribed to network events on %s"
+            % (py3_module.module_full_name, ", ".join(sorted(events)))
+        )
+        return True
+
+    def _read_events(self):
+        """
+        Return the set of events in the waiting messages.
+        """
+        try:
+            messages = self.netlink.receive()
+        except (IOError, OSError) as e:
+            if e.errno != errno.ENOBUFS:
+                raise
+            # we missed some messages, assume anything changed
+            return set(EVENT_GROUPS)
+        return set(MESSAGE_EVENTS[x[0]] for x in messages if x[0] in MESSAGE_EVENTS)
+
+    def _loop(self):
+        while True:
+            try:
+                self._watch()
+                return
+            except (IOError, OSError):
+                self.py3_wrapper.report_exception("network monitoring failed")
+            self.netlink.close()
+            while True:
+                sleep(REOPEN_DELAY)
+                if not self.py3_wrapper.running:
+                    return
+                try:
+                    self._open_netlink()
+                    break
+                except (IOError, OSError):
+                    pass
+            self.py3_wrapper.log("network monitoring reopened")
+            # we may have missed events
+            self.trigger_actions(set(EVENT_GROUPS))
+
+    def _watch(self):
+        events = set()
+        deadline = None
+        while self.py3_wrapper.running:
+            timeout = None
+            if deadline is not None:
+                timeout = max(deadline - time(), 0)
+            if select.select([self.netlink], [], [], timeout)[0]:
+                events |= self._read_events()
+                if events and deadline is None:
+                    deadline = time() + DEBOUNCE
+            elif events:
+                self.trigger_actions(events)
+                events = set()
+                deadline = None
+
+    def trigger_actions(self, events):
+        """
+        Refresh all modules which subscribed to any of the given events.
+        """
+        with self.lock:
+            consumers = list(self.consumers)
+        for py3_module, module_events, callback in consumers:
+            if not module_events & events:
+                continue
+            if self.py3_wrapper.config["debug"]:
+                self.py3_wrapper.log(
+                    "%s network event, refresh consumer %s"
+                    % (
+                        ", ".join(sorted(module_events & events)),
+                        py3_module.module_full_name,
+                    )
+                )
+            if callback:
+                try:
+                    callback()
+                except Exception:
+                    self.py3_wrapper.report_exception(
+                        "network event callback of %s" % py3_module.module_full_name
+                    )
+            py3_module.force_update()
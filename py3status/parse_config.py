@@ -12,6 +12,7 @@ from py3status.constants import (
     CONFIG_FILE_SPECIAL_SECTIONS,
     I3S_SINGLE_NAMES,
     I3S_MODULE_NAMES,
+    I3S_NATIVE_MODULES,
     MAX_NESTING_LEVELS,
     ERROR_CONFIG,
     GENERAL_DEFAULTS,
@@ -869,6 +870,13 @@ def process_config(config_path, py3_wrapper=None):
 
     config["on_click"] = on_click
     config["i3s_modules"] = i3s_modules
+    # i3status modules we run ourselves instead of i3status
+    if config["py3status"].get("native_i3status"):
+        config["i3s_native_modules"] = [
+            x for x in i3s_modules if x.split()[0] in I3S_NATIVE_MODULES
+        ]
+    else:
+        config["i3s_native_modules"] = []
     config["py3_modules"] = py3_modules
     config[".module_groups"] = module_groups
 
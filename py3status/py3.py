@@ -5,20 +5,29 @@ import os
 import sys
 import shlex
 
-from copy import deepcopy
+from copy import copy, deepcopy
 from fnmatch import fnmatch
 from math import log10
 from pprint import pformat
+from random import uniform
+from signal import SIGKILL
 from subprocess import Popen, PIPE, STDOUT
+from threading import current_thread, Lock, Timer
 from time import time
 from uuid import uuid4
 
 from py3status import exceptions
+from py3status.fork_server import ForkServerError
 from py3status.formatter import Formatter, Composite, expand_color
-from py3status.request import HttpResponse
+from py3status.hwmon import Hwmon
+from py3status.request import CircuitBreaker, HttpResponse
+from py3status.sampler import ProcSampler
+from py3status.single_flight import SingleFlight
 from py3status.storage import Storage
+from py3status.sysfs import SysfsReader
 from py3status.util import Gradients
 from py3status.version import version
+from py3status.wm_ipc import WmIpcError
 
 
 PY3_CACHE_FOREVER = -1
@@ -43,6 +52,17 @@ class ModuleErrorException(Exception):
         self.timeout = timeout
 
 
+class ModuleRetryException(Exception):
+    """
+    This exception is used to indicate that a module method should be run
+    again after timeout seconds, eg a request failed and will be retried.
+    The module keeps its current output in the meantime.
+    """
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+
+
 class NoneColor:
     """
     This class represents a color that has explicitly been set as None by the user.
@@ -91,10 +111,15 @@ class Py3:
     """Show as Warning"""
 
     # Shared by all Py3 Instances
+    _circuit_breaker = CircuitBreaker()
     _formatter = None
     _gradients = Gradients()
+    _hwmon = Hwmon()
     _none_color = NoneColor()
+    _proc_sampler = ProcSampler()
+    _single_flight = SingleFlight()
     _storage = Storage()
+    _sysfs_reader = SysfsReader()
 
     # Exceptions
     Py3Exception = exceptions.Py3Exception
@@ -116,6 +141,7 @@ class Py3:
         self._is_python_2 = sys.version_info < (3, 0)
         self._module = module
         self._report_exception_cache = set()
+        self._request_retries = {}
         self._thresholds = None
         self._threshold_gradients = {}
         self._uid = uuid4()
@@ -178,6 +204,33 @@ class Py3:
                 return expand_color(color)
             return self._get_config_setting("color_" + color)
 
+    def _can_defer(self):
+        """
+        Work can only be rescheduled when called from the module's methods
+        being run by the scheduler, not from on_click(), post_config_hook()...
+        """
+        return (
+            bool(self._module)
+            and getattr(self._module, "running_thread", None) is current_thread()
+        )
+
+    def _get_shared_cache_timeout(self):
+        """
+        How long the result of a command or request can be shared with other
+        modules making the same call.
+        """
+        if not self._module:
+            return 0
+        return self._get_config_setting("shared_cache_timeout", 0) or 0
+
+    def _get_sample_interval(self):
+        """
+        How long a sample of a /proc file can be shared between modules.
+        """
+        if not self._module:
+            return 0
+        return self._get_config_setting("sample_interval", 0.5) or 0
+
     def _thresholds_init(self):
         """
         Initiate and check any thresholds set
@@ -563,6 +616,84 @@ class Py3:
                 icon=icon,
             )
 
+    def register_file_watch(self, path, events=None, callback=None):
+        """
+        Update the module when a file or directory changes, so that it does
+        not need to poll it.  Changes happening together only cause one
+        update.
+
+        Returns True if the path is watched, False if it cannot be (eg not on
+        linux or the directory does not exist) and the module should keep on
+        polling.
+
+        :param path: a directory, a file or a glob on the file name like
+            ``~/Videos/*.mp4``.  A file does not need to exist yet.  If the
+            directory is removed, it is watched again once it is back.
+        :param events: list of the changes to update on, ``create``,
+            ``delete``, ``modify``, ``move`` (all of them by default) and
+            ``attrib``.
+        :param callback: optional function called before the module is
+            updated, eg to reload the file.
+        """
+        if not self._module:
+            return False
+        return self._py3_wrapper.file_watcher.subscribe(
+            self._module, path, events, callback
+        )
+
+    def register_network_events(self, events=None, callback=None):
+        """
+        Update the module when the network changes.  The kernel tells us
+        about the changes over rtnetlink and bursts of them only cause one
+        update.
+
+        Returns True if the module is subscribed, False if network events
+        are not available (ie not on linux) and the module should keep on
+        polling.
+
+        :param events: list of the events to update on, ``link`` (interfaces
+            added, removed, up or down), ``address`` and ``route``.  All of
+            them by default.
+        :param callback: optional function called before the module is
+            updated, eg to clear a cache.
+        """
+        if not self._module:
+            return False
+        return self._py3_wrapper.network_monitor.subscribe(
+            self._module, events, callback
+        )
+
+    def register_wm_events(self, events, callback=None):
+        """
+        Update the module on i3/sway events.  All the modules share a single
+        connection to the window manager IPC socket.
+
+        Returns True if the module is subscribed, False if the IPC socket
+        cannot be found and the module should keep on polling.
+
+        :param events: list of the events to update on, eg ``window``,
+            ``workspace``, ``binding``, ``output`` or ``mode``.
+        :param callback: optional function called instead of updating the
+            module, with the event name and its payload.  The event is
+            ``None`` after (re)connecting as events may have been missed.
+        """
+        if not self._module:
+            return False
+        return self._py3_wrapper.wm_ipc.subscribe(self._module, events, callback)
+
+    def get_wm_tree(self):
+        """
+        Return the i3/sway layout tree, as ``i3-msg -t get_tree`` would.
+        While modules are subscribed to wm events the tree is cached and
+        kept up to date so this is cheap.
+
+        Raises ``Py3Exception`` if the IPC socket cannot be used.
+        """
+        try:
+            return self._py3_wrapper.wm_ipc.get_tree()
+        except (IOError, OSError, ValueError, WmIpcError) as e:
+            raise exceptions.Py3Exception("Cannot get the wm tree: {}".format(e))
+
     def register_function(self, function_name, function):
         """
         Register a function for the module.
@@ -968,18 +1099,24 @@ class Py3:
             if self.command_run("which {}".format(cmd)) == 0:
                 return cmd
 
-    def command_run(self, command):
+    def command_run(self, command, timeout=None):
         """
         Runs a command and returns the exit code.
         The command can either be supplied as a sequence or string.
 
+        :param command: command to run can be a str or list
+        :param timeout: if the command runs for longer than this many seconds
+            it and any processes it started are killed.  If not supplied the
+            ``command_timeout`` setting is used, by default there is no timeout.
+
         An Exception is raised if an error occurs
         """
         # convert the command to sequence if a string
         if isinstance(command, basestring):
             command = shlex.split(command)
+        timeout = self._get_command_timeout(timeout)
         try:
-            return Popen(command, stdout=PIPE, stderr=PIPE, close_fds=True).wait()
+            process = self._command_popen(command, timeout, stdout=PIPE, stderr=PIPE)
         except Exception as e:
             # make a pretty command for error loggings and...
             if isinstance(command, basestring):
@@ -988,9 +1125,20 @@ class Py3:
                 pretty_cmd = " ".join(command)
             msg = "Command `{cmd}` {error}".format(cmd=pretty_cmd, error=e.errno)
             raise exceptions.CommandError(msg, error_code=e.errno)
+        if not timeout:
+            return process.wait()
+        stop_watchdog = self._command_watchdog(process, timeout)
+        output, error = process.communicate()
+        killed = stop_watchdog()
+        retcode = process.poll()
+        if killed:
+            output = output.decode("utf-8", "replace")
+            error = error.decode("utf-8", "replace")
+            self._command_timed_out(" ".join(command), timeout, retcode, output, error)
+        return retcode
 
     def command_output(
-        self, command, shell=False, capture_stderr=False, localized=False
+        self, command, shell=False, capture_stderr=False, localized=False, timeout=None
     ):
         """
         Run a command and return its output as unicode.
@@ -1000,6 +1148,10 @@ class Py3:
         :param shell: if `True` then command is run through the shell
         :param capture_stderr: if `True` then STDERR is piped to STDOUT
         :param localized: if `False` then command is forced to use its default (English) locale
+        :param timeout: if the command runs for longer than this many seconds
+            it and any processes it started are killed and a CommandError
+            holding any partial output is raised.  If not supplied the
+            ``command_timeout`` setting is used, by default there is no timeout.
 
         A CommandError is raised if an error occurs
         """
@@ -1014,45 +1166,270 @@ class Py3:
 
         stderr = STDOUT if capture_stderr else PIPE
         env = self._english_env if not localized else None
+        timeout = self._get_command_timeout(timeout)
+
+        def run_command():
+            try:
+                process = self._command_popen(
+                    command,
+                    timeout,
+                    stdout=PIPE,
+                    stderr=stderr,
+                    universal_newlines=True,
+                    shell=shell,
+                    env=env,
+                )
+            except Exception as e:
+                msg = "Command `{cmd}` {error}".format(cmd=pretty_cmd, error=e)
+                self.log(msg)
+                raise exceptions.CommandError(msg, error_code=e.errno)
+
+            killed = False
+            if timeout:
+                stop_watchdog = self._command_watchdog(process, timeout)
+            output, error = process.communicate()
+            if timeout:
+                killed = stop_watchdog()
+            if self._is_python_2 and isinstance(output, str):
+                output = output.decode("utf-8")
+                error = error.decode("utf-8")
+            retcode = process.poll()
+            if killed:
+                self._command_timed_out(pretty_cmd, timeout, retcode, output, error)
+            if retcode:
+                # under certain conditions a successfully run command may get
+                # a return code of -15 even though correct output was returned
+                # see #664.  This issue seems to be related to arch linux but
+                # the reason is not entirely clear.
+                if retcode == -15:
+                    msg = "Command `{cmd}` returned SIGTERM (ignoring)"
+                    self.log(msg.format(cmd=pretty_cmd))
+                else:
+                    msg = "Command `{cmd}` returned non-zero exit status {error}"
+                    output_oneline = output.replace("\n", " ")
+                    if output_oneline:
+                        msg += " ({output})"
+                    msg = msg.format(
+                        cmd=pretty_cmd, error=retcode, output=output_oneline
+                    )
+                    raise exceptions.CommandError(
+                        msg, error_code=retcode, error=error, output=output
+                    )
+            return output
+
+        # identical commands run at the same time by other modules are only
+        # run once and the output is shared
+        key = (
+            "command_output",
+            repr(command),
+            shell,
+            capture_stderr,
+            localized,
+            timeout,
+        )
+        return self._single_flight.do(
+            key, run_command, ttl=self._get_shared_cache_timeout()
+        )
+
+    def command_stream(
+        self, command, callback, on_exit=None, shell=False, capture_stderr=False
+    ):
+        """
+        Start a long running command and call `callback` with each line of
+        its output (as unicode without the trailing newline).  If given,
+        `on_exit` is called with the return code once the command has exited.
+        The callbacks are called from a thread shared by all the streamed
+        commands so they should be quick, usually just storing the line and
+        calling `self.py3.update()`.
+
+        Returns an object with `pid` and `returncode` attributes and
+        `kill()` and `running()` methods.  Commands still running when
+        py3status exits are killed.
+
+        :param command: command to run can be a str or list
+        :param callback: function called with each line of output
+        :param on_exit: function called with the return code of the command
+        :param shell: if `True` then command is run through the shell
+        :param capture_stderr: if `True` then STDERR is piped to STDOUT
+
+        A CommandError is raised if the command cannot be started
+        """
+        if isinstance(command, basestring):
+            pretty_cmd = command
+        else:
+            pretty_cmd = " ".join(command)
+        if not shell and isinstance(command, basestring):
+            command = shlex.split(command)
 
+        devnull = None
+        if capture_stderr:
+            stderr = STDOUT
+        else:
+            stderr = devnull = open(os.devnull, "wb")
         try:
             process = Popen(
-                command,
-                stdout=PIPE,
-                stderr=stderr,
-                close_fds=True,
-                universal_newlines=True,
-                shell=shell,
-                env=env,
+                command, stdout=PIPE, stderr=stderr, shell=shell, close_fds=True
             )
         except Exception as e:
             msg = "Command `{cmd}` {error}".format(cmd=pretty_cmd, error=e)
             self.log(msg)
             raise exceptions.CommandError(msg, error_code=e.errno)
+        finally:
+            if devnull:
+                devnull.close()
+        return self._py3_wrapper.command_reactor.add(
+            process, self._module.module_full_name, callback, on_exit
+        )
 
-        output, error = process.communicate()
-        if self._is_python_2 and isinstance(output, str):
-            output = output.decode("utf-8")
-            error = error.decode("utf-8")
-        retcode = process.poll()
-        if retcode:
-            # under certain conditions a successfully run command may get a
-            # return code of -15 even though correct output was returned see
-            # #664.  This issue seems to be related to arch linux but the
-            # reason is not entirely clear.
-            if retcode == -15:
-                msg = "Command `{cmd}` returned SIGTERM (ignoring)"
-                self.log(msg.format(cmd=pretty_cmd))
+    def proc_sample(self, name, newer_than=None):
+        """
+        Return a recent sample of a /proc file, eg ``stat``, ``meminfo`` or
+        ``net/dev``, that is shared with any other module reading it.  The
+        file is only read again once the sample is older than the
+        ``sample_interval`` setting.
+
+        The sample has a `data` attribute, the parsed file, and a `time`
+        attribute, when the file was read, that should be used to calculate
+        rates.  The data must not be modified.  Modules calculating rates
+        should pass the time of their previous sample as `newer_than` so
+        that they never get the same sample twice.
+
+        Parsed files are
+
+        - ``cpuinfo``: a list of dicts, one per processor
+        - ``diskstats``: a dict of device name to (major, minor, stats list)
+        - ``meminfo``: a dict of name to value, sizes in kB
+        - ``net/dev``: a dict of interface name to its 16 counters
+        - ``stat``: a dict of cpu name (cpu, cpu0...) to its times
+        - ``uptime``: a tuple of uptime and idle seconds
+
+        Other files are given as a list of lines.
+
+        :param name: path of the file relative to /proc
+        :param newer_than: the sample must have been taken after this time
+        """
+        return self._proc_sampler.get(name, self._get_sample_interval(), newer_than)
+
+    def read_sysfs(self, path):
+        """
+        Return the content of a frequently polled file, eg in /sys, as
+        unicode.  Files in /sys are kept open and read again from their start
+        on each call, they are reopened if their device has gone away and
+        come back.  Other files are opened each time.
+
+        An IOError/OSError is raised if the file cannot be read.
+
+        :param path: path of the file
+        """
+        return self._sysfs_reader.read(path)
+
+    def glob_sysfs(self, pattern):
+        """
+        Return a sorted list of the paths matching pattern, eg
+        ``/sys/class/power_supply/BAT*``.  The result is cached for a few
+        seconds and looked up again as soon as a device goes away.
+
+        :param pattern: glob pattern
+        """
+        return self._sysfs_reader.glob(pattern)
+
+    def read_sensors(self, chips=None, keys=None):
+        """
+        Read hardware sensors (temperatures, voltages, fans...) from sysfs,
+        like `sensors -u` shows them but without running it.
+
+        Returns a list of chips, each a dict with `name` (eg
+        coretemp-isa-0000), `adapter` (eg ISA adapter) and `sensors`, an
+        OrderedDict of sensor label (eg Core 0) to an OrderedDict of its
+        values (eg input, max, crit) as strings.  Chips are only discovered
+        once and only the requested values are read.
+
+        :param chips: list of fnmatch patterns of the chips to read, all the
+            chips are read if not given.
+        :param keys: list of the values to read, eg ``["input"]``, all the
+            values are read if not given.
+        """
+        return self._hwmon.read(chips, keys)
+
+    def _get_command_timeout(self, timeout):
+        """
+        Use the module or py3status `command_timeout` setting if no timeout
+        was given.
+        """
+        if timeout is None and self._module:
+            timeout = self._get_config_setting("command_timeout")
+        return timeout
+
+    def _command_popen(self, command, timeout, **kwargs):
+        """
+        Start the command.  If it can time out then it is started in its own
+        process group so that it and any processes it starts can be killed.
+
+        The fork server is used if it is running, we fall back to Popen if it
+        fails us.
+        """
+        fork_server = None
+        if self._module:
+            fork_server = self._py3_wrapper.config.get("fork_server")
+        if fork_server and fork_server.running:
+            try:
+                return fork_server.popen(command, setsid=bool(timeout), **kwargs)
+            except ForkServerError as e:
+                self.log("fork server failed, using Popen ({})".format(e))
+        if timeout:
+            if self._is_python_2:
+                kwargs["preexec_fn"] = os.setsid
             else:
-                msg = "Command `{cmd}` returned non-zero exit status {error}"
-                output_oneline = output.replace("\n", " ")
-                if output_oneline:
-                    msg += " ({output})"
-                msg = msg.format(cmd=pretty_cmd, error=retcode, output=output_oneline)
-                raise exceptions.CommandError(
-                    msg, error_code=retcode, error=error, output=output
-                )
-        return output
+                kwargs["start_new_session"] = True
+        return Popen(command, close_fds=True, **kwargs)
+
+    def _command_watchdog(self, process, timeout):
+        """
+        Kill the process group of the command if it is still running after
+        timeout seconds.  Returns a function to call once the command has
+        finished, it stops the watchdog and returns True if the command was
+        killed.
+        """
+        lock = Lock()
+        state = {"finished": False, "killed": False}
+
+        def kill():
+            with lock:
+                # the command finished just as the timer fired
+                if state["finished"]:
+                    return
+                state["killed"] = True
+                try:
+                    os.killpg(process.pid, SIGKILL)
+                except OSError:
+                    pass
+
+        def stop():
+            with lock:
+                state["finished"] = True
+            timer.cancel()
+            return state["killed"]
+
+        timer = Timer(timeout, kill)
+        timer.daemon = True
+        timer.start()
+        return stop
+
+    def _command_timed_out(self, pretty_cmd, timeout, retcode, output, error):
+        """
+        Record that the command timed out and raise a CommandError holding any
+        output it gave before being killed.
+        """
+        if self._module:
+            self._module.metrics.increment("command_timeouts")
+        msg = "Command `{cmd}` timed out after {timeout} seconds".format(
+            cmd=pretty_cmd, timeout=timeout
+        )
+        if self._module:
+            self.log(msg, level=self.LOG_WARNING)
+        raise exceptions.CommandError(
+            msg, error_code=retcode, error=error or "", output=output or ""
+        )
 
     def _storage_init(self):
         """
@@ -1257,6 +1634,7 @@ class Py3:
         cookiejar=None,
         retry_times=None,
         retry_wait=None,
+        stream=False,
     ):
         """
         Make a request to a url and retrieve the results.
@@ -1274,7 +1652,12 @@ class Py3:
         :param auth: authentication info as tuple `(username, password)`
         :param cookiejar: an object of a CookieJar subclass
         :param retry_times: how many times to retry the request
-        :param retry_wait: how long to wait between retries in seconds
+        :param retry_wait: how long to wait before the first retry in seconds,
+            this is doubled for each following retry
+        :param stream: do not read the body before returning, so that
+            ``json(stream=True)`` or ``iter_json()`` can decode large JSON
+            responses incrementally.  These requests are not shared with
+            other modules.
 
         :returns: HttpResponse
         """
@@ -1303,27 +1686,87 @@ class Py3:
         if "User-Agent" not in headers:
             headers["User-Agent"] = "py3status/{} {}".format(version, self._uid)
 
+        def http_response():
+            # do not hammer endpoints that keep failing
+            if not self._circuit_breaker.allow(url):
+                raise exceptions.RequestURLError("endpoint is failing, request skipped")
+            try:
+                response = HttpResponse(
+                    url,
+                    params=params,
+                    data=data,
+                    headers=headers,
+                    timeout=timeout,
+                    auth=auth,
+                    cookiejar=cookiejar,
+                )
+            except (exceptions.RequestTimeout, exceptions.RequestURLError):
+                self._circuit_breaker.failure(url)
+                raise
+            self._circuit_breaker.success(url)
+            return response
+
+        def shared_http_response():
+            response = http_response()
+            # read the body now so the response can be shared between threads
+            response.text
+            return response
+
         def get_http_response():
-            return HttpResponse(
+            # POST requests and requests using cookies may have side effects
+            # so are always made, streamed bodies can only be read once.
+            # Identical GET requests made at the same time by other modules
+            # are only made once.
+            if data or cookiejar is not None or stream:
+                return http_response()
+            shared_headers = {k: v for k, v in headers.items() if k != "User-Agent"}
+            key = (
+                "request",
                 url,
-                params=params,
-                data=data,
-                headers=headers,
-                timeout=timeout,
-                auth=auth,
-                cookiejar=cookiejar,
+                repr(sorted((params or {}).items())),
+                repr(sorted(shared_headers.items())),
+                timeout,
+                repr(auth),
+            )
+            response = self._single_flight.do(
+                key, shared_http_response, ttl=self._get_shared_cache_timeout()
             )
+            # each caller gets its own copy so decoded json is not shared
+            return copy(response)
 
-        for n in range(1, retry_times):
-            try:
-                return get_http_response()
-            except (self.RequestTimeout, self.RequestURLError):
-                if self.is_gevent():
-                    from gevent import sleep
-                else:
-                    from time import sleep
-                self.log("HTTP request retry {}/{}".format(n, retry_times))
-                sleep(retry_wait)
-        self.log("HTTP request retry {}/{}".format(retry_times, retry_times))
-        sleep(retry_wait)
-        return get_http_response()
+        if not self._can_defer():
+            # we cannot reschedule so retry now
+            for n in range(1, retry_times):
+                try:
+                    return get_http_response()
+                except (self.RequestTimeout, self.RequestURLError):
+                    if self.is_gevent():
+                        from gevent import sleep
+                    else:
+                        from time import sleep
+                    self.log("HTTP request retry {}/{}".format(n, retry_times))
+                    sleep(retry_wait)
+            return get_http_response()
+
+        # Rather than sleeping in the module thread between retries, the module
+        # method is rescheduled with an exponential backoff.  The module keeps
+        # its current output until the request succeeds or we give up.
+        retry_key = (url, repr(sorted((params or {}).items())))
+        try:
+            response = get_http_response()
+        except (self.RequestTimeout, self.RequestURLError):
+            attempt = self._request_retries.get(retry_key, 0) + 1
+            if attempt >= retry_times:
+                self._request_retries.pop(retry_key, None)
+                raise
+            self._request_retries[retry_key] = attempt
+            delay = retry_wait * 2 ** (attempt - 1) * uniform(0.5, 1.5)
+            delay = max(delay, self._circuit_breaker.retry_in(url))
+            self.log(
+                "HTTP request retry {}/{} in {:.1f}s".format(
+                    attempt, retry_times - 1, delay
+                )
+            )
+            raise ModuleRetryException(delay)
+        self._request_retries.pop(retry_key, None)
+        return response
@@ -1,6 +1,12 @@
 import base64
+import codecs
 import json
 import socket
+import zlib
+
+from json.decoder import WHITESPACE
+from threading import Lock
+from time import time
 
 try:
     # Python 3
@@ -39,9 +45,20 @@ class HttpResponse:
     Simple encapsulation of a http response for a url
 
     The aim is to support both python 2 and 3 and be a simple as possible
+
+    Compressed (gzip/deflate) responses are requested and transparently
+    decompressed while the body is read.  JSON can be decoded incrementally
+    from that stream, see ``json()`` and ``iter_json()``.
     """
 
+    CHUNK_SIZE = 16 * 1024
+    CONTENT_ENCODINGS = ["deflate", "gzip", "x-gzip"]
+
     def __init__(self, url, params, data, headers, timeout, auth, cookiejar):
+        # we do not want to alter the callers headers
+        headers = dict(headers)
+        if "accept-encoding" not in [key.lower() for key in headers]:
+            headers["Accept-Encoding"] = "gzip, deflate"
         # fix the url if needed
         url_parts = urlsplit(url)
         if url_parts.query or params:
@@ -108,22 +125,119 @@ class HttpResponse:
         try:
             return self._text
         except AttributeError:
+            decoder = self._text_decoder()
+            text = [decoder.decode(chunk) for chunk in self.iter_content()]
+            text.append(decoder.decode(b"", True))
+            self._text = u"".join(text)
+        return self._text
+
+    def _text_decoder(self):
+        encoding = None
+        response = getattr(self, "_response", None)
+        if response is not None:
             if IS_PYTHON_3:
-                encoding = self._response.headers.get_content_charset("utf-8")
+                encoding = response.headers.get_content_charset("utf-8")
             else:
-                encoding = self._response.headers.getparam("charset")
-            self._text = self._response.read().decode(encoding or "utf-8")
-        return self._text
+                encoding = response.headers.getparam("charset")
+        return codecs.getincrementaldecoder(encoding or "utf-8")()
+
+    def iter_content(self, chunk_size=CHUNK_SIZE):
+        """
+        Iterate over the raw body of the response in chunks of bytes,
+        decompressing it on the fly if needed.
 
-    def json(self):
+        The body can only be read once, ``text`` and ``json()`` use this.
+        """
+        response = getattr(self, "_response", None)
+        if response is None:
+            return
+        encoding = (response.headers.get("Content-Encoding") or "").lower()
+        decompressor = None
+        if encoding in self.CONTENT_ENCODINGS:
+            # detect zlib or gzip headers automatically
+            decompressor = zlib.decompressobj(zlib.MAX_WBITS | 32)
+        first_chunk = True
+        while True:
+            chunk = response.read(chunk_size)
+            if not chunk:
+                break
+            if decompressor:
+                try:
+                    chunk = decompressor.decompress(chunk)
+                except zlib.error:
+                    if not (first_chunk and encoding == "deflate"):
+                        raise
+                    # some servers send deflate data without the zlib header
+                    decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+                    chunk = decompressor.decompress(chunk)
+            first_chunk = False
+            if chunk:
+                yield chunk
+        if decompressor:
+            chunk = decompressor.flush()
+            if chunk:
+                yield chunk
+
+    def iter_json(self, chunk_size=CHUNK_SIZE):
+        """
+        Iterate over the JSON values of the body, a single document or many
+        of them like JSON lines, decoding them incrementally from the
+        response stream rather than from the whole text.
+        """
+        decoder = json.JSONDecoder()
+        text_decoder = self._text_decoder()
+        chunks = self.iter_content(chunk_size)
+        buffer = u""
+        decode_at = 0
+        while True:
+            chunk = next(chunks, None)
+            if chunk is None:
+                buffer += text_decoder.decode(b"", True)
+            else:
+                buffer += text_decoder.decode(chunk)
+                # an incomplete value is only decoded again once we have
+                # twice as much data, not over and over for each chunk
+                if len(buffer) < decode_at:
+                    continue
+            pos = 0
+            while True:
+                pos = WHITESPACE.match(buffer, pos).end()
+                if pos == len(buffer):
+                    break
+                try:
+                    value, end = decoder.raw_decode(buffer, pos)
+                except ValueError:
+                    if chunk is None:
+                        raise RequestInvalidJSON("Invalid JSON received")
+                    break
+                if end == len(buffer) and chunk is not None:
+                    # a number could go on in the next chunk
+                    break
+                yield value
+                pos = end
+            if chunk is None:
+                return
+            buffer = buffer[pos:]
+            decode_at = 2 * len(buffer)
+
+    def json(self, stream=False):
         """
         Return an object representing the return json for the request
+
+        :param stream: decode the body incrementally from the response
+            stream, without keeping its text.  ``text`` is then empty.
         """
         try:
             return self._json
         except AttributeError:
             try:
-                self._json = json.loads(self.text)
+                if stream and not hasattr(self, "_text"):
+                    values = list(self.iter_json())
+                    if len(values) != 1:
+                        raise ValueError("not a single JSON document")
+                    self._json = values[0]
+                else:
+                    self._json = json.loads(self.text)
                 return self._json
             except:  # noqa e722
                 raise RequestInvalidJSON("Invalid JSON received")
@@ -155,3 +269,66 @@ class HttpResponse:
         Set the cookie jar in care we want to change it after object creation
         """
         self._cookiejar = cj
+
+
+class CircuitBreaker:
+    """
+    Keep track of failing endpoints so that we stop hammering them.
+
+    Once an endpoint (scheme and host of the url) has failed
+    ``failure_threshold`` times in a row no more requests are made to it until
+    its cool down period has passed.  A single request is then let through, if
+    it fails the cool down period is doubled up to ``max_cool_down`` seconds.
+    """
+
+    cool_down = 30
+    failure_threshold = 5
+    max_cool_down = 600
+
+    def __init__(self):
+        self.failures = {}
+        self.lock = Lock()
+        self.open_until = {}
+
+    @staticmethod
+    def endpoint(url):
+        parts = urlsplit(url)
+        return (parts.scheme, parts.netloc)
+
+    def allow(self, url):
+        """
+        Return True if a request to the url can be made.
+        """
+        endpoint = self.endpoint(url)
+        with self.lock:
+            if self.failures.get(endpoint, 0) < self.failure_threshold:
+                return True
+            now = time()
+            if now < self.open_until.get(endpoint, 0):
+                return False
+            # let a single trial request through while holding back others
+            self.open_until[endpoint] = now + self.cool_down
+            return True
+
+    def retry_in(self, url):
+        """
+        Seconds until requests to the url will be allowed again.
+        """
+        with self.lock:
+            return max(self.open_until.get(self.endpoint(url), 0) - time(), 0)
+
+    def success(self, url):
+        endpoint = self.endpoint(url)
+        with self.lock:
+            self.failures.pop(endpoint, None)
+            self.open_until.pop(endpoint, None)
+
+    def failure(self, url):
+        endpoint = self.endpoint(url)
+        with self.lock:
+            failures = self.failures.get(endpoint, 0) + 1
+            self.failures[endpoint] = failures
+            if failures >= self.failure_threshold:
+                backoff = min(failures - self.failure_threshold, 10)
+                cool_down = min(self.cool_down * 2 ** backoff, self.max_cool_down)
+                self.open_until[endpoint] = time() + cool_down
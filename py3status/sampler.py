@@ -0,0 +1,134 @@
+from collections import namedtuple, OrderedDict
+from threading import Lock
+from time import time
+
+PROC_PATH = "/proc"
+
+Sample = namedtuple("Sample", "data time")
+
+
+def parse_cpuinfo(text):
+    """
+    List of dicts, one per processor.
+    """
+    cpus = []
+    for block in text.split("\n\n"):
+        cpu = {}
+        for line in block.splitlines():
+            key, sep, value = line.partition(":")
+            if sep:
+                cpu[key.strip()] = value.strip()
+        if cpu:
+            cpus.append(cpu)
+    return cpus
+
+
+def parse_diskstats(text):
+    """
+    Dict of device name to (major, minor, [stats]).
+    """
+    disks = OrderedDict()
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) > 3:
+            disks[fields[2]] = (
+                int(fields[0]),
+                int(fields[1]),
+                [int(x) for x in fields[3:]],
+            )
+    return disks
+
+
+def parse_meminfo(text):
+    """
+    Dict of name to value (kB for sizes).
+    """
+    meminfo = {}
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) > 1:
+            meminfo[fields[0].rstrip(":")] = int(fields[1])
+    return meminfo
+
+
+def parse_net_dev(text):
+    """
+    Dict of interface name to its 16 counters, receive ones first.
+    """
+    interfaces = OrderedDict()
+    # skip the two header lines
+    for line in text.splitlines()[2:]:
+        name, sep, counters = line.partition(":")
+        if sep:
+            interfaces[name.strip()] = [int(x) for x in counters.split()]
+    return interfaces
+
+
+def parse_stat(text):
+    """
+    Dict of cpu name (cpu, cpu0, ...) to its times in USER_HZ.
+    """
+    stat = OrderedDict()
+    for line in text.splitlines():
+        if not line.startswith("cpu"):
+            break
+        fields = line.split()
+        stat[fields[0]] = [int(x) for x in fields[1:]]
+    return stat
+
+
+def parse_uptime(text):
+    """
+    Tuple of uptime and idle time in seconds.
+    """
+    return tuple(float(x) for x in text.split())
+
+
+PARSERS = {
+    "cpuinfo": parse_cpuinfo,
+    "diskstats": parse_diskstats,
+    "meminfo": parse_meminfo,
+    "net/dev": parse_net_dev,
+    "stat": parse_stat,
+    "uptime": parse_uptime,
+}
+
+
+class ProcSampler:
+    """
+    Shared reader of /proc files.
+
+    Many modules (and many instances of them) read the same /proc files each
+    time they update.  Here each file is only read and parsed once per
+    sampling interval and the parsed snapshot is shared by all the modules
+    asking for it.
+    """
+
+    def __init__(self, proc_path=PROC_PATH):
+        self.lock = Lock()
+        self.locks = {}
+        self.proc_path = proc_path
+        self.samples = {}
+
+    def get(self, name, interval, newer_than=None):
+        """
+        Return a Sample of the named /proc file (eg "stat", "net/dev") no
+        older than interval seconds and, if given, taken after newer_than.
+        Files we do not know how to parse are given as a list of lines.
+        """
+        with self.lock:
+            lock = self.locks.setdefault(name, Lock())
+        with lock:
+            sample = self.samples.get(name)
+            now = time()
+            if (
+                sample is None
+                or now - sample.time >= interval
+                or (newer_than is not None and sample.time <= newer_than)
+            ):
+                with open("{}/{}".format(self.proc_path, name)) as f:
+                    text = f.read()
+                parser = PARSERS.get(name, str.splitlines)
+                sample = Sample(parser(text), now)
+                self.samples[name] = sample
+        return sample
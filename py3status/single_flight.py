@@ -0,0 +1,98 @@
+from threading import Event, Lock
+from time import time
+
+
+class Flight:
+    """
+    A single execution of a call that other callers can wait on.
+    """
+
+    def __init__(self):
+        self.done = Event()
+        self.error = None
+        self.expires = 0
+        self.result = None
+
+    def get(self):
+        """
+        Return the result of the call or raise the exception it raised.
+        """
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """
+    Collapse identical concurrent calls into a single execution.
+
+    When several modules update at the same time (startup, refresh_all,
+    resume) they often run the very same command or request.  The first caller
+    for a given key runs the call, any caller arriving while it is in flight
+    waits and shares its result.  If a ttl is given the result is also kept
+    for that many seconds so that callers arriving just after can use it.
+    """
+
+    def __init__(self):
+        self.flights = {}
+        self.lock = Lock()
+
+    def do(self, key, fn, ttl=0):
+        """
+        Run fn() for the given key unless an identical call is in flight or
+        cached, in which case its result is returned.
+
+        Exceptions raised by fn() are raised to all the waiting callers but
+        are never cached.
+        """
+        with self.lock:
+            flight = self.flights.get(key)
+            if flight and flight.done.is_set() and flight.expires <= time():
+                flight = None
+            leader = flight is None
+            if leader:
+                # results of keys that are not asked for again would otherwise
+                # be kept forever
+                self._evict_expired()
+                flight = Flight()
+                self.flights[key] = flight
+
+        if not leader:
+            flight.done.wait()
+            return flight.get()
+
+        completed = False
+        try:
+            flight.result = fn()
+            completed = True
+        except Exception as e:
+            flight.error = e
+        finally:
+            if not completed and flight.error is None:
+                # the call was interrupted, waiting callers still need an answer
+                flight.error = RuntimeError("single flight call interrupted")
+            with self.lock:
+                if completed and ttl > 0:
+                    flight.expires = time() + ttl
+                elif self.flights.get(key) is flight:
+                    del self.flights[key]
+            flight.done.set()
+        return flight.get()
+
+    def _evict_expired(self):
+        """
+        Forget the cached results that have expired, the lock must be held.
+        """
+        now = time()
+        for key, flight in list(self.flights.items()):
+            if flight.done.is_set() and flight.expires <= now:
+                del self.flights[key]
+
+    def clear(self):
+        """
+        Forget any cached results.  In flight calls are not affected.
+        """
+        with self.lock:
+            for key, flight in list(self.flights.items()):
+                if flight.done.is_set():
+                    del self.flights[key]
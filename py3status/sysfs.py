@@ -0,0 +1,105 @@
+import os
+
+from glob import glob
+from threading import Lock
+from time import time
+
+READ_SIZE = 4096
+
+# only sysfs files are kept open, they give their current value when read
+# again and fail once their device is gone.  Other files may be replaced.
+SYSFS = "/sys/"
+
+
+def pread(fd, size, offset):
+    """
+    os.pread() is not available in python 2.
+    """
+    try:
+        return os.pread(fd, size, offset)
+    except AttributeError:
+        os.lseek(fd, offset, os.SEEK_SET)
+        return os.read(fd, size)
+
+
+class SysfsReader:
+    """
+    Reader of frequently polled sysfs files.
+
+    Files are kept open and read again from the start each time, which for
+    sysfs gives their current value, so that polling them costs a single
+    read.  If a device goes away its file is closed and opened again on the
+    next read.  Files outside of keep_open (sysfs) are opened each time.
+    Directory lookups are cached too.
+    """
+
+    def __init__(self, keep_open=SYSFS):
+        self.fds = {}
+        self.globs = {}
+        self.keep_open = keep_open
+        self.lock = Lock()
+
+    def _open(self, path):
+        with self.lock:
+            fd = self.fds.get(path)
+            if fd is None:
+                fd = os.open(path, os.O_RDONLY)
+                self.fds[path] = fd
+        return fd
+
+    def _close(self, path, fd):
+        with self.lock:
+            if self.fds.get(path) == fd:
+                del self.fds[path]
+                os.close(fd)
+            # the device may have gone, look for devices again
+            self.globs.clear()
+
+    def read(self, path):
+        """
+        Return the content of the file.  Errors opening the file are raised
+        as IOError/OSError just like open() does.
+        """
+        if not path.startswith(self.keep_open):
+            with open(path, "rb") as f:
+                return f.read().decode("utf-8", "replace")
+        for attempt in range(2):
+            fd = self._open(path)
+            try:
+                data = pread(fd, READ_SIZE, 0)
+                while len(data) % READ_SIZE == 0 and data:
+                    chunk = pread(fd, READ_SIZE, len(data))
+                    if not chunk:
+                        break
+                    data += chunk
+            except (IOError, OSError):
+                # the device was removed (ENODEV) or replaced, reopen it
+                self._close(path, fd)
+                if attempt:
+                    raise
+            else:
+                return data.decode("utf-8", "replace")
+
+    def glob(self, pattern, cache_timeout=10):
+        """
+        Return the sorted paths matching the pattern, a result no older than
+        cache_timeout seconds can be used.
+        """
+        with self.lock:
+            cached = self.globs.get(pattern)
+        if cached and time() - cached[0] < cache_timeout:
+            return cached[1]
+        paths = sorted(glob(pattern))
+        with self.lock:
+            self.globs[pattern] = (time(), paths)
+        return paths
+
+    def close(self):
+        """
+        Close all the files.
+        """
+        with self.lock:
+            for fd in self.fds.values():
+                os.close(fd)
+            self.fds.clear()
+            self.globs.clear()
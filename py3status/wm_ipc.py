@@ -0,0 +1,351 @@
+import json
+import os
+import socket
+import struct
+
+from subprocess import check_output, CalledProcessError
+from threading import Lock, Thread
+from time import sleep
+
+MAGIC = b"i3-ipc"
+HEADER = struct.Struct("=6sII")
+
+# message types
+RUN_COMMAND = 0
+GET_WORKSPACES = 1
+SUBSCRIBE = 2
+GET_OUTPUTS = 3
+GET_TREE = 4
+
+# events have the highest bit of their type set
+EVENT_MASK = 1 << 31
+EVENTS = {
+    0: "workspace",
+    1: "output",
+    2: "mode",
+    3: "window",
+    4: "barconfig_update",
+    5: "binding",
+    6: "shutdown",
+    7: "tick",
+}
+
+# window changes we can apply to the cached tree, others change the layout
+PATCHED_CHANGES = ["fullscreen_mode", "focus", "mark", "title", "urgent"]
+# events changing the layout
+LAYOUT_EVENTS = ["output", "window", "workspace"]
+
+# seconds to wait before reconnecting, eg while the wm restarts
+RECONNECT_DELAY = 1
+
+
+class WmIpcError(Exception):
+    pass
+
+
+def get_socket_path(wm_name):
+    """
+    Find the IPC socket of i3 or sway.
+    """
+    variables = ["SWAYSOCK", "I3SOCK"] if wm_name == "sway" else ["I3SOCK"]
+    for variable in variables:
+        path = os.environ.get(variable)
+        if path:
+            return path
+    try:
+        with open(os.devnull, "w") as devnull:
+            path = check_output([wm_name, "--get-socketpath"], stderr=devnull)
+    except (CalledProcessError, OSError):
+        return None
+    return path.decode("utf-8").strip() or None
+
+
+class WmIpcConnection:
+    """
+    A connection to the i3/sway IPC socket.
+    """
+
+    def __init__(self, path):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.connect(path)
+        except (IOError, OSError):
+            self.sock.close()
+            raise
+        self.lock = Lock()
+
+    def close(self):
+        self.sock.close()
+
+    def send(self, msg_type, payload=""):
+        data = payload.encode("utf-8")
+        with self.lock:
+            self.sock.sendall(HEADER.pack(MAGIC, len(data), msg_type) + data)
+
+    def _receive(self, size):
+        data = b""
+        while len(data) < size:
+            chunk = self.sock.recv(size - len(data))
+            if not chunk:
+                raise WmIpcError("connection closed")
+            data += chunk
+        return data
+
+    def receive(self):
+        """
+        Return the type and the decoded payload of the next message.
+        """
+        magic, size, msg_type = HEADER.unpack(self._receive(HEADER.size))
+        if magic != MAGIC:
+            raise WmIpcError("invalid message")
+        return msg_type, json.loads(self._receive(size).decode("utf-8"))
+
+    def request(self, msg_type, payload=""):
+        self.send(msg_type, payload)
+        reply_type, reply = self.receive()
+        if reply_type != msg_type:
+            raise WmIpcError("unexpected reply")
+        return reply
+
+
+class WmIpc:
+    """
+    This class allows us to talk to i3 or sway over their IPC socket.
+
+    Commands go over one connection and all the modules event subscriptions
+    share another one, read by a single thread.  While subscribed the layout
+    tree is cached, window changes are applied to it and it is only fetched
+    again when the layout changes.  The cached tree is never modified, the
+    changes make a new one sharing its unchanged nodes, so the modules can
+    read it while the events are applied.
+    """
+
+    def __init__(self, py3_wrapper):
+        """
+        The connections will be lazy loaded if a module uses them.
+        """
+        self.command_connection = None
+        self.command_lock = Lock()
+        self.consumers = []
+        self.event_connection = None
+        self.events = set()
+        self.generation = 0
+        self.lock = Lock()
+        self.nodes = {}
+        self.parents = {}
+        self.py3_wrapper = py3_wrapper
+        self.socket_path = None
+        self.thread = None
+        self.tree = None
+
+        wm_msg = py3_wrapper.config["wm"]["msg"]
+        self.wm_name = {"i3-msg": "i3", "swaymsg": "sway"}.get(wm_msg, "i3")
+
+    def available(self):
+        """
+        Can we find the IPC socket?
+        """
+        if self.socket_path is None:
+            self.socket_path = get_socket_path(self.wm_name) or ""
+        return bool(self.socket_path)
+
+    def command(self, msg_type, payload=""):
+        """
+        Send a message and return its decoded reply.
+        """
+        if not self.available():
+            raise WmIpcError("{} IPC socket not found".format(self.wm_name))
+        with self.command_lock:
+            for attempt in range(2):
+                try:
+                    if self.command_connection is None:
+                        connection = WmIpcConnection(self.socket_path)
+                        self.command_connection = connection
+                    return self.command_connection.request(msg_type, payload)
+                except (IOError, OSError, WmIpcError):
+                    # the wm may have restarted
+                    if self.command_connection:
+                        self.command_connection.close()
+                    self.command_connection = None
+                    if attempt:
+                        raise
+
+    def run_command(self, command):
+        """
+        Run i3/sway commands, like i3-msg does.
+        """
+        return self.command(RUN_COMMAND, command)
+
+    def _index(self, node, parent_id=None):
+        node_id = node.get("id")
+        self.nodes[node_id] = node
+        self.parents[node_id] = parent_id
+        for child in node.get("nodes", []) + node.get("floating_nodes", []):
+            self._index(child, node_id)
+
+    def _set_tree(self, tree):
+        self.nodes = {}
+        self.parents = {}
+        self.tree = tree
+        if tree is not None:
+            self._index(tree)
+
+    def _invalidate(self):
+        self.generation += 1
+        self._set_tree(None)
+
+    def _replace(self, node, replacements, changed):
+        """
+        Return a copy of node with the given replacements (node id: new
+        node), changed are the ids of their ancestors which need a copy.
+        """
+        node_id = node.get("id")
+        if node_id in replacements:
+            return replacements[node_id]
+        if node_id not in changed:
+            return node
+        node = dict(node)
+        for key in ["nodes", "floating_nodes"]:
+            if key in node:
+                node[key] = [self._replace(x, replacements, changed) for x in node[key]]
+        return node
+
+    def get_tree(self):
+        """
+        Return the layout tree, cached while we get told about its changes.
+        """
+        with self.lock:
+            if self.tree is not None:
+                return self.tree
+            generation = self.generation
+            subscribed = self.event_connection is not None
+        tree = self.command(GET_TREE)
+        with self.lock:
+            # the tree did not change while we were fetching it
+            if subscribed and generation == self.generation:
+                self._set_tree(tree)
+        return tree
+
+    def _update_tree(self, event, payload):
+        """
+        Apply the event to the cached tree.
+        """
+        with self.lock:
+            if self.tree is None or event not in LAYOUT_EVENTS:
+                return
+            container = payload.get("container") or {}
+            node = self.nodes.get(container.get("id"))
+            if (
+                event != "window"
+                or payload.get("change") not in PATCHED_CHANGES
+                or node is None
+            ):
+                self._invalidate()
+                return
+            replacements = {}
+            if payload["change"] == "focus":
+                for other in self.nodes.values():
+                    if other.get("focused"):
+                        replacements[other.get("id")] = dict(other, focused=False)
+            replacements[node.get("id")] = dict(container)
+            changed = set()
+            for node_id in replacements:
+                parent_id = self.parents.get(node_id)
+                while parent_id is not None and parent_id not in changed:
+                    changed.add(parent_id)
+                    parent_id = self.parents.get(parent_id)
+            self._set_tree(self._replace(self.tree, replacements, changed))
+
+    def subscribe(self, py3_module, events, callback=None):
+        """
+        Subscribe the given module to the given events (window, workspace,
+        binding, output...).  callback is called with the event name and its
+        payload, otherwise the module is updated.
+
+        Here we will lazy load the event thread if necessary and return
+        success or failure based on the availability of the IPC socket.
+        """
+        invalid = set(events) - set(EVENTS.values())
+        if invalid:
+            self.py3_wrapper.log(
+                "module %s: invalid wm events %s"
+                % (py3_module.module_full_name, ", ".join(sorted(invalid)))
+            )
+            return False
+        if not self.available():
+            self.py3_wrapper.log(
+                "%s IPC socket not found: module %s not subscribed to events"
+                % (self.wm_name, py3_module.module_full_name)
+            )
+            return False
+        with self.lock:
+            self.consumers.append((py3_module, set(events), callback))
+            # the layout events keep the tree cache up to date
+            new_events = set(events) | set(LAYOUT_EVENTS)
+            new_events -= self.events
+            self.events |= new_events
+            if self.thread is None:
+                self.thread = Thread(target=self._loop)
+                self.thread.daemon = True
+                self.thread.start()
+                self.py3_wrapper.log("wm IPC events enabled")
+            elif new_events and self.event_connection is not None:
+                self.event_connection.send(SUBSCRIBE, json.dumps(sorted(new_events)))
+        self.py3_wrapper.log(
+            "module %s subscribed to wm events on %s"
+            % (py3_module.module_full_name, ", ".join(sorted(events)))
+        )
+        return True
+
+    def _loop(self):
+        while self.py3_wrapper.running:
+            connection = None
+            try:
+                connection = WmIpcConnection(self.socket_path)
+                with self.lock:
+                    connection.send(SUBSCRIBE, json.dumps(sorted(self.events)))
+                    self.event_connection = connection
+                    self._invalidate()
+                # we may have missed events
+                self.trigger_actions(None, None)
+                while True:
+                    msg_type, payload = connection.receive()
+                    if not msg_type & EVENT_MASK:
+                        # a subscribe reply
+                        continue
+                    event = EVENTS.get(msg_type & ~EVENT_MASK)
+                    self._update_tree(event, payload)
+                    self.trigger_actions(event, payload)
+            except (IOError, OSError, ValueError, WmIpcError):
+                pass
+            with self.lock:
+                self.event_connection = None
+                self._invalidate()
+            if connection:
+                connection.close()
+            sleep(RECONNECT_DELAY)
+
+    def trigger_actions(self, event, payload):
+        """
+        Let the modules subscribed to the event know about it, all of them if
+        event is None.
+        """
+        with self.lock:
+            consumers = list(self.consumers)
+        for py3_module, events, callback in consumers:
+            if event is not None and event not in events:
+                continue
+            if self.py3_wrapper.config["debug"]:
+                self.py3_wrapper.log(
+                    "%s wm event, refresh consumer %s"
+                    % (event or "reconnection", py3_module.module_full_name)
+                )
+            if not callback:
+                py3_module.force_update()
+                continue
+            try:
+                callback(event, payload)
+            except Exception:
+                self.py3_wrapper.report_exception(
+                    "wm event callback of %s" % py3_module.module_full_name
+                )
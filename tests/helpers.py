@@ -0,0 +1,28 @@
+"""
+Fakes of py3status and of its modules shared by the tests of the event
+sources (file, network and wm events).
+"""
+
+
+class Wrapper:
+    def __init__(self, **config):
+        self.config = {"debug": False}
+        self.config.update(config)
+        self.errors = []
+        self.logs = []
+        self.running = True
+
+    def log(self, msg, level="info"):
+        self.logs.append(msg)
+
+    def report_exception(self, msg, notify_user=True):
+        self.errors.append(msg)
+
+
+class Module:
+    def __init__(self, name):
+        self.module_full_name = name
+        self.updates = 0
+
+    def force_update(self):
+        self.updates += 1
@@ -0,0 +1,108 @@
+import json
+import socket
+
+from collections import deque
+
+from py3status import command
+from py3status.command import CommandServer
+from py3status.metrics import Metrics
+
+
+class Module:
+    def __init__(self, name, text):
+        self.metrics = Metrics()
+        self.module_full_name = name
+        self.module_nice_name = name
+        self.text = text
+        self.updates = 0
+
+    def force_update(self):
+        self.updates += 1
+
+    def get_latest(self):
+        return [{"full_text": self.text}]
+
+
+class Wrapper:
+    def __init__(self):
+        self.config = {"debug": False}
+        self.metrics = Metrics()
+        clock = Module("clock", "12:00")
+        clock.metrics.record("run", 0.002)
+        self.modules = {"clock": clock, "uname": Module("uname", "Linux")}
+        self.output_modules = dict(
+            (name, {"type": "py3status", "module": module})
+            for name, module in self.modules.items()
+        )
+        self.timeout_due = None
+        self.timeout_missed = {}
+        self.timeout_priority_missed = {"clock": deque([None, None])}
+        self.timeout_queue_lookup = {clock: 1e12}
+        self.timeout_running = set(["clock"])
+
+    def log(self, msg, level="info"):
+        pass
+
+    def report_exception(self, msg, notify_user=True):
+        raise AssertionError(msg)
+
+
+def start_server(tmpdir, monkeypatch):
+    monkeypatch.setattr(command, "SERVER_ADDRESS", str(tmpdir.join("uds")))
+    wrapper = Wrapper()
+    server = CommandServer(wrapper)
+    server.daemon = True
+    server.start()
+    return wrapper, server
+
+
+def connect(server):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(server.server_address)
+    return sock, sock.makefile("rb")
+
+
+def request(client, data):
+    sock, reader = client
+    sock.sendall(json.dumps(data).encode("utf-8") + b"\n")
+    return json.loads(reader.readline().decode("utf-8"))
+
+
+def test_persistent_clients(tmpdir, monkeypatch):
+    wrapper, server = start_server(tmpdir, monkeypatch)
+    first = connect(server)
+    second = connect(server)
+    reply = request(first, {"command": "output", "module": ["clock"], "id": 1})
+    assert reply == {"id": 1, "ok": True, "result": {"clock": [{"full_text": "12:00"}]}}
+    # both clients are served on their own connection
+    reply = request(second, {"command": "refresh", "module": ["uname"]})
+    assert reply == {"ok": True, "result": None}
+    assert wrapper.modules["uname"].updates == 1
+    reply = request(first, {"command": "refresh", "module": ["uname"]})
+    assert wrapper.modules["uname"].updates == 2
+    # batches get a list of replies
+    reply = request(
+        second,
+        [{"command": "scheduler"}, {"command": "timings"}, {"command": "nope"}],
+    )
+    assert reply[0]["result"]["running"] == ["clock"]
+    assert reply[0]["result"]["events_waiting"] == {"clock": 2}
+    assert list(reply[0]["result"]["due"]) == ["clock"]
+    assert reply[1]["result"]["clock"]["run"]["count"] == 1
+    assert reply[1]["result"]["uname"] == {}
+    assert reply[2] == {"ok": False, "error": "unknown command nope"}
+    reply = request(first, "refresh")
+    assert reply["ok"] is False
+    for sock, reader in [first, second]:
+        sock.close()
+
+
+def test_single_request(tmpdir, monkeypatch):
+    # as sent by older py3-cmd, without a newline
+    wrapper, server = start_server(tmpdir, monkeypatch)
+    sock, reader = connect(server)
+    sock.sendall(json.dumps({"command": "refresh", "module": ["clock"]}).encode())
+    sock.shutdown(socket.SHUT_WR)
+    assert json.loads(reader.read().decode("utf-8"))["ok"] is True
+    assert wrapper.modules["clock"].updates == 1
+    sock.close()
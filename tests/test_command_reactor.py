@@ -0,0 +1,56 @@
+from subprocess import Popen, PIPE
+from threading import Event
+
+from py3status.command_reactor import CommandReactor
+
+
+class Wrapper:
+    running = True
+
+    def log(self, *args, **kw):
+        pass
+
+    def report_exception(self, *args, **kw):
+        pass
+
+
+def test_lines_and_exit():
+    reactor = CommandReactor(Wrapper())
+    lines = []
+    exited = Event()
+    returncodes = []
+
+    def on_exit(returncode):
+        returncodes.append(returncode)
+        exited.set()
+
+    command = ["sh", "-c", "echo one; echo two; printf three; exit 2"]
+    process = Popen(command, stdout=PIPE)
+    reactor.add(process, "test", lines.append, on_exit)
+    assert exited.wait(5)
+    assert lines == ["one", "two", "three"]
+    assert returncodes == [2]
+
+
+def test_shared_thread_and_kill():
+    reactor = CommandReactor(Wrapper())
+    started = Event()
+    exited = []
+    streams = [
+        reactor.add(
+            Popen(["sh", "-c", "echo ready; sleep 30"], stdout=PIPE),
+            "test",
+            lambda line: started.set(),
+            exited.append,
+        )
+        for x in range(3)
+    ]
+    assert started.wait(5)
+    thread = reactor.thread
+    assert all(stream.running() for stream in streams)
+    reactor.kill()
+    for stream in streams:
+        stream.process.wait()
+    assert reactor.thread is thread
+    # killed commands do not call on_exit
+    assert exited == []
@@ -0,0 +1,63 @@
+from threading import Event
+from time import time
+
+from py3status.modules import diskdata
+from py3status.modules.diskdata import Py3status, parse_mountinfo
+
+MOUNTINFO = r"""22 1 8:2 / / rw,relatime shared:1 - ext4 /dev/sda2 rw
+25 22 0:21 / /proc rw,nosuid,nodev,noexec,relatime shared:12 - proc proc rw
+30 22 8:3 / /home/me/My\040Disk rw,relatime - vfat /dev/sdb1 rw
+31 22 0:44 /@home /home rw,relatime shared:29 master:1 - btrfs /dev/sda3 rw
+32 22 0:44 /@snapshots /.snapshots rw,relatime shared:30 - btrfs /dev/sda3 rw
+""".splitlines()
+
+
+class Py3:
+    def __init__(self):
+        self.logs = []
+
+    def log(self, msg):
+        self.logs.append(msg)
+
+
+def test_parse_mountinfo():
+    # any number of optional fields, escaped mount points and btrfs
+    # subvolumes counted once
+    assert parse_mountinfo(MOUNTINFO) == [
+        ("/dev/sda2", "/"),
+        ("proc", "/proc"),
+        ("/dev/sdb1", "/home/me/My Disk"),
+        ("/dev/sda3", "/home"),
+    ]
+
+
+def test_statvfs_timeout(monkeypatch):
+    module = Py3status()
+    module.py3 = Py3()
+    module.disk_timeout = 0.1
+    module.stalled = {}
+    release = Event()
+    calls = []
+
+    def statvfs(path):
+        calls.append(path)
+        if path == "/mnt/nfs":
+            release.wait(5)
+        return path
+
+    monkeypatch.setattr(diskdata.os, "statvfs", statvfs)
+    start = time()
+    assert module._statvfs("/mnt/nfs") is None
+    assert time() - start < 1
+    assert module.py3.logs == ["/mnt/nfs is not responding, skipped"]
+    # the stalled mount is skipped without waiting again
+    start = time()
+    assert module._statvfs("/mnt/nfs") is None
+    assert time() - start < 0.05
+    assert module._statvfs("/") == "/"
+    assert calls == ["/mnt/nfs", "/"]
+    # once it answers it is used again
+    release.set()
+    module.stalled["/mnt/nfs"].join(1)
+    assert module._statvfs("/mnt/nfs") == "/mnt/nfs"
+    assert module.stalled == {}
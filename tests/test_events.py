@@ -0,0 +1,88 @@
+from py3status import events
+from py3status.events import Events
+from py3status.metrics import Metrics
+
+
+class Module:
+    allow_config_clicks = True
+
+    def __init__(self, coalesce_events):
+        self.coalesce_events = coalesce_events
+
+
+class Wrapper:
+    def __init__(self, modules, on_click=None, module_groups=None):
+        self.config = {
+            "debug": False,
+            "py3_config": {
+                "on_click": on_click or {},
+                ".module_groups": module_groups or {},
+            },
+        }
+        self.metrics = Metrics()
+        self.modules = {}
+        self.output_modules = dict(
+            (name, {"type": "py3status", "module": Module(coalesce)})
+            for name, coalesce in modules.items()
+        )
+        self.tasks = []
+
+    def priority_queue_add(self, task):
+        self.tasks.append(task)
+
+
+def setup_events(monkeypatch, *args, **kw):
+    monkeypatch.setattr(events, "IOPoller", lambda io: None)
+    wrapper = Wrapper(*args, **kw)
+    return wrapper, Events(wrapper)
+
+
+def scroll(events_thread, name, button=4):
+    events_thread.dispatch_event({"name": name, "button": button})
+
+
+def test_coalesce(monkeypatch):
+    wrapper, events_thread = setup_events(
+        monkeypatch, {"volume_status": True, "clock": False}
+    )
+    for button in [4, 4, 4, 5, 5]:
+        scroll(events_thread, "volume_status", button)
+    # a burst of the same button is a single event
+    assert [(x.event["button"], x.event["count"]) for x in wrapper.tasks] == [
+        (4, 3),
+        (5, 2),
+    ]
+    assert wrapper.metrics.counters["events_coalesced"] == 3
+    # the waiting event is started so the next scroll is a new event
+    events_thread.start_event(wrapper.tasks[1])
+    scroll(events_thread, "volume_status", 5)
+    assert len(wrapper.tasks) == 3
+    # modules that did not ask for it get every event
+    scroll(events_thread, "clock")
+    scroll(events_thread, "clock")
+    assert [x.event["count"] for x in wrapper.tasks[3:]] == [1, 1]
+
+
+def test_coalesce_window(monkeypatch):
+    wrapper, events_thread = setup_events(monkeypatch, {"volume_status": True})
+    monkeypatch.setattr(events, "time", lambda: 0)
+    scroll(events_thread, "volume_status")
+    monkeypatch.setattr(events, "time", lambda: events.COALESCE_WINDOW + 0.1)
+    scroll(events_thread, "volume_status")
+    assert len(wrapper.tasks) == 2
+
+
+def test_no_coalesce(monkeypatch):
+    # every click for a configured on_click, or for a container that did
+    # not ask for it, is kept
+    wrapper, events_thread = setup_events(
+        monkeypatch,
+        {"volume_status": True, "backlight": True, "frame": False},
+        on_click={"volume_status": {"4": "exec true"}},
+        module_groups={"backlight": ["frame"]},
+    )
+    for i in range(2):
+        scroll(events_thread, "volume_status")
+        scroll(events_thread, "backlight")
+    tasks = [x for x in wrapper.tasks if isinstance(x, events.EventTask)]
+    assert [x.event["count"] for x in tasks] == [1, 1, 1, 1]
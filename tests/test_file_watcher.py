@@ -0,0 +1,87 @@
+import os
+import sys
+
+from time import sleep
+
+import pytest
+
+from py3status import file_watcher
+from py3status.file_watcher import FileWatcher
+
+from helpers import Module, Wrapper
+
+pytestmark = pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="needs inotify"
+)
+
+
+@pytest.fixture
+def watcher():
+    wrapper = Wrapper()
+    watcher = FileWatcher(wrapper)
+    yield watcher
+    wrapper.running = False
+
+
+def wait():
+    # longer than the coalescing delay
+    sleep(0.3)
+
+
+def test_file(watcher, tmpdir):
+    module = Module("rate_counter")
+    calls = []
+    path = tmpdir.join("counter.save")
+    assert watcher.subscribe(module, str(path), callback=lambda: calls.append(1))
+    # the file does not need to exist, several writes are one update
+    path.write("1")
+    path.write("2")
+    wait()
+    assert (module.updates, calls) == (1, [1])
+    # other files do not matter
+    tmpdir.join("other").write("1")
+    wait()
+    assert module.updates == 1
+    # atomic replace
+    tmpdir.join("counter.new").write("3")
+    os.rename(str(tmpdir.join("counter.new")), str(path))
+    wait()
+    assert module.updates == 2
+
+
+def test_glob_and_directory(watcher, tmpdir):
+    file_status = Module("file_status")
+    mail = Module("mail")
+    maildir = tmpdir.mkdir("new")
+    assert watcher.subscribe(file_status, str(tmpdir.join("*.mp4")), ["create"])
+    assert watcher.subscribe(mail, str(maildir))
+    tmpdir.join("video.mkv").write("")
+    wait()
+    assert (file_status.updates, mail.updates) == (0, 0)
+    tmpdir.join("video.mp4").write("")
+    maildir.join("1234.mail").write("")
+    wait()
+    assert (file_status.updates, mail.updates) == (1, 1)
+
+
+def test_directory_recreated(watcher, tmpdir, monkeypatch):
+    monkeypatch.setattr(file_watcher, "RETRY", 0.2)
+    module = Module("mail")
+    maildir = tmpdir.mkdir("new")
+    assert watcher.subscribe(module, str(maildir.join("*.mail")))
+    maildir.remove()
+    wait()
+    assert module.updates == 1
+    # the module is updated once the directory is back and it is watched again
+    maildir.mkdir()
+    sleep(0.6)
+    assert module.updates == 2
+    maildir.join("1234.mail").write("")
+    wait()
+    assert module.updates == 3
+
+
+def test_missing_directory(watcher, tmpdir):
+    module = Module("file_status")
+    assert not watcher.subscribe(module, str(tmpdir.join("*", "video.mp4")))
+    assert not watcher.subscribe(module, str(tmpdir), ["open"])
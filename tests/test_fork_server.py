@@ -0,0 +1,45 @@
+import pytest
+
+from subprocess import PIPE, STDOUT
+
+from py3status.fork_server import ForkServer
+
+pytestmark = pytest.mark.skipif(
+    not ForkServer.available(), reason="fork server needs os.posix_spawnp()"
+)
+
+
+@pytest.fixture
+def fork_server():
+    fork_server = ForkServer()
+    fork_server.start()
+    yield fork_server
+    fork_server.stop()
+
+
+def test_output_and_returncode(fork_server):
+    process = fork_server.popen(
+        "echo out; echo err >&2; exit 3",
+        shell=True,
+        stdout=PIPE,
+        stderr=PIPE,
+        universal_newlines=True,
+    )
+    assert process.communicate() == ("out\n", "err\n")
+    assert process.returncode == 3
+
+
+def test_stderr_to_stdout(fork_server):
+    process = fork_server.popen(
+        ["sh", "-c", "echo out; echo err >&2"], stdout=PIPE, stderr=STDOUT
+    )
+    assert process.communicate() == (b"out\nerr\n", None)
+    assert process.returncode == 0
+
+
+def test_missing_command(fork_server):
+    with pytest.raises(OSError):
+        fork_server.popen(["py3status-no-such-command"], stdout=PIPE, stderr=PIPE)
+    # the fork server is still usable
+    process = fork_server.popen(["true"], stdout=PIPE, stderr=PIPE)
+    assert process.wait() == 0
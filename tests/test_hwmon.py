@@ -0,0 +1,98 @@
+from py3status.hwmon import Hwmon
+
+
+def fake_sys(tmpdir):
+    """
+    A coretemp and a k10temp chip and two thermal zones.
+    """
+    sys = tmpdir.mkdir("sys")
+    hwmon = sys.mkdir("class").mkdir("hwmon")
+    thermal = sys.join("class").mkdir("thermal")
+    platform = sys.mkdir("bus").mkdir("platform")
+    pci = sys.join("bus").mkdir("pci")
+    devices = sys.mkdir("devices")
+
+    coretemp = devices.mkdir("coretemp.0")
+    coretemp.join("subsystem").mksymlinkto(platform)
+    hwmon0 = hwmon.mkdir("hwmon0")
+    hwmon0.join("device").mksymlinkto(coretemp)
+    hwmon0.join("name").write("coretemp\n")
+    hwmon0.join("temp2_label").write("Core 0\n")
+    hwmon0.join("temp2_input").write("48000\n")
+    hwmon0.join("temp2_max").write("81000\n")
+    hwmon0.join("temp2_crit_alarm").write("0\n")
+
+    k10temp = devices.mkdir("0000:00:18.3")
+    k10temp.join("subsystem").mksymlinkto(pci)
+    hwmon10 = hwmon.mkdir("hwmon10")
+    hwmon10.join("device").mksymlinkto(k10temp)
+    hwmon10.join("name").write("k10temp\n")
+    hwmon10.join("temp1_input").write("30125\n")
+    hwmon10.join("fan1_input").write("1200\n")
+
+    for number, kind in enumerate(["x86_pkg_temp", "coretemp"]):
+        zone = thermal.mkdir("thermal_zone{}".format(number))
+        zone.join("type").write(kind + "\n")
+        zone.join("temp").write("52000\n")
+        zone.join("trip_point_0_type").write("passive\n")
+        zone.join("trip_point_0_temp").write("90000\n")
+        zone.join("trip_point_1_type").write("critical\n")
+        zone.join("trip_point_1_temp").write("100000\n")
+    return sys
+
+
+def test_read(tmpdir):
+    hwmon = Hwmon(str(fake_sys(tmpdir)))
+    chips = hwmon.read()
+    assert [(x["name"], x["adapter"]) for x in chips] == [
+        ("coretemp-isa-0000", "ISA adapter"),
+        ("k10temp-pci-00c3", "PCI adapter"),
+        # the coretemp zone is already a hwmon chip
+        ("x86_pkg_temp-thermal-0", "Thermal zone"),
+    ]
+    assert chips[0]["sensors"] == {
+        "Core 0": {"input": "48.000", "crit_alarm": "0.000", "max": "81.000"}
+    }
+    # input first, like sensors -u
+    assert list(chips[0]["sensors"]["Core 0"])[0] == "input"
+    # fans are not scaled
+    assert chips[1]["sensors"]["fan1"] == {"input": "1200.000"}
+    assert chips[1]["sensors"]["temp1"] == {"input": "30.125"}
+    assert chips[2]["sensors"] == {"temp1": {"input": "52.000", "crit": "100.000"}}
+
+
+def test_read_filtered(tmpdir):
+    sys = fake_sys(tmpdir)
+    hwmon = Hwmon(str(sys))
+    chips = hwmon.read(["coretemp*"], ["input"])
+    assert chips == [
+        {
+            "name": "coretemp-isa-0000",
+            "adapter": "ISA adapter",
+            "sensors": {"Core 0": {"input": "48.000"}},
+        }
+    ]
+    # chips are discovered once, values are read each time
+    sys.join("class", "hwmon", "hwmon0", "temp2_input").write("50000\n")
+    sys.join("class", "hwmon", "hwmon0", "temp3_input").write("50000\n")
+    chips = hwmon.read(["coretemp*"], ["input"])
+    assert chips[0]["sensors"] == {"Core 0": {"input": "50.000"}}
+    hwmon.reset()
+    chips = hwmon.read(["coretemp*"], ["input"])
+    assert list(chips[0]["sensors"]) == ["Core 0", "temp3"]
+
+
+def test_renumbered(tmpdir):
+    sys = fake_sys(tmpdir)
+    hwmon = Hwmon(str(sys))
+    chips = hwmon.read(["k10temp*"], ["input"])
+    assert chips[0]["sensors"]["temp1"] == {"input": "30.125"}
+    # the chip comes back as another hwmon after a resume
+    hwmon_path = sys.join("class", "hwmon")
+    hwmon_path.join("hwmon10").move(hwmon_path.join("hwmon3"))
+    hwmon_path.join("hwmon3", "temp1_input").write("31000\n")
+    chips = hwmon.read(["k10temp*"], ["input"])
+    assert chips[0]["sensors"]["temp1"] == {"input": "31.000"}
+    # a chip that is gone is no longer shown
+    hwmon_path.join("hwmon3").remove()
+    assert hwmon.read(["k10temp*"], ["input"]) == []
@@ -0,0 +1,197 @@
+from collections import deque
+from datetime import datetime
+from threading import Event
+from time import time
+
+from py3status import i3status as i3status_module
+from py3status.constants import TZTIME_FORMAT
+from py3status.i3status import I3status
+
+MODULES = ["cpu_usage", "disk /", "load"]
+
+
+class Wrapper:
+    def __init__(self, modules=MODULES, config=None):
+        py3_config = dict([(name, {}) for name in modules], general={})
+        py3_config.update(config or {}, i3s_modules=modules)
+        self.config = {
+            "i3status_path": "i3status",
+            "py3_config": py3_config,
+            "standalone": False,
+        }
+        self.lock = Event()
+        self.logs = []
+        self.notified = []
+        self.queue = []
+        self.running = True
+        self.updates = []
+
+    def get_config_attribute(self, name, attribute):
+        return 5
+
+    def log(self, msg, level="info"):
+        self.logs.append(msg)
+
+    def notify_user(self, msg):
+        self.notified.append(msg)
+
+    def report_exception(self, msg, notify_user=True):
+        raise AssertionError(msg)
+
+    def notify_update(self, update):
+        self.updates.append(update)
+
+    def timeout_queue_add(self, item, cache_time=0):
+        self.queue.append((item, cache_time))
+
+
+def output(*texts):
+    return [
+        {"name": "cpu_usage", "instance": "", "full_text": texts[0]},
+        {"name": "disk", "instance": "/", "full_text": texts[1]},
+        {"name": "load", "instance": "", "full_text": texts[2]},
+    ]
+
+
+def test_set_responses():
+    wrapper = Wrapper()
+    i3status = I3status(wrapper)
+    i3status.set_responses(output("07%", "124 GiB", "0.31"))
+    assert wrapper.updates == [MODULES]
+    # only the changed item is copied and updated
+    disk_item = i3status.i3modules["disk /"].item
+    i3status.set_responses(output("12%", "124 GiB", "0.31"))
+    assert wrapper.updates[-1] == ["cpu_usage"]
+    assert i3status.i3modules["disk /"].item is disk_item
+    assert i3status.i3modules["cpu_usage"].get_latest()[0]["full_text"] == "12%"
+    assert [x["full_text"] for x in i3status.json_list] == ["12%", "124 GiB", "0.31"]
+    # modules altering their item do not hide changes, their changes are
+    # discarded with the next output
+    i3status.json_list[2]["full_text"] = "altered"
+    assert i3status.json_list[2]["full_text"] == "altered"
+    assert i3status.i3modules["load"].item["full_text"] == "0.31"
+    i3status.set_responses(output("12%", "124 GiB", "0.31"))
+    assert len(wrapper.updates) == 2
+    assert i3status.json_list[2]["full_text"] == "0.31"
+    i3status.set_responses(output("12%", "124 GiB", "0.52"))
+    assert wrapper.updates[-1] == ["load"]
+
+
+def test_json_list_native_modules():
+    modules = ["cpu_usage", "load", "disk /"]
+    config = {"load": {"format": "native"}, "i3s_native_modules": ["load"]}
+    wrapper = Wrapper(modules, config)
+    i3status = I3status(wrapper)
+    assert list(i3status.native_modules) == ["load"]
+    assert i3status.i3s_modules == ["cpu_usage", "disk /"]
+    i3status.update_native_modules()
+    i3status.set_responses(output("12%", "124 GiB", "0.31")[:2])
+    # legacy modules get the native items at their config position
+    texts = [x["full_text"] for x in i3status.json_list]
+    assert texts == ["12%", "native", "124 GiB"]
+    i3status.native_modules["load"].config["format"] = "changed"
+    i3status.update_native_modules()
+    assert i3status.json_list[1]["full_text"] == "changed"
+
+
+def test_time_ticker():
+    clocks = ["tztime local", "tztime here", "time"]
+    config = {
+        "tztime local": {"format": "%H:%M"},
+        "tztime here": {"format": "%H:%M"},
+        "time": {"format": "%H:%M:%S"},
+    }
+    wrapper = Wrapper(clocks, config)
+    i3status = I3status(wrapper)
+    now = datetime.now().strftime(TZTIME_FORMAT)
+    i3status.set_responses([{"name": x.split()[0], "full_text": now} for x in clocks])
+    # a single task for all the clocks
+    ticker = i3status.time_ticker
+    assert [x[0] for x in wrapper.queue] == [ticker] * 3
+    del wrapper.queue[:]
+    del wrapper.updates[:]
+    ticker.run()
+    assert wrapper.updates == [clocks]
+    assert [x.time_delta for x in ticker.modules] == [60, 60, 1]
+    # scheduled for the next second, the minute clocks are not due then
+    assert wrapper.queue == [(ticker, ticker.modules[2].time_due)]
+    assert ticker.modules[2].time_due <= time() + 1
+    assert ticker.modules[0].time_due % 60 == 0
+    text = i3status.i3modules["tztime local"].get_latest()[0]["full_text"]
+    assert text == datetime.now().strftime("%H:%M")
+
+
+def test_native_modules_stopped_bar():
+    wrapper = Wrapper()
+    wrapper.i3bar_running = False
+    i3status = I3status(wrapper)
+    updates = []
+    timeouts = []
+    i3status.update_native_modules = lambda: updates.append(time())
+
+    def wait(timeout):
+        timeouts.append(timeout)
+        # the bar is continued after a few checks, then we are stopped
+        if len(timeouts) == 3:
+            wrapper.i3bar_running = True
+        elif len(timeouts) == 4:
+            wrapper.running = False
+
+    i3status.native_refresh.wait = wait
+    i3status.run_native_modules()
+    # nothing is updated while the bar is stopped and we do not spin
+    assert timeouts[:3] == [0.5] * 3
+    assert len(updates) == 1
+    assert 0 < timeouts[3] <= 0.5
+
+
+FAKE_I3STATUS = """#!/bin/sh
+echo "$3" >> {}
+{}
+exit 1
+"""
+
+FAKE_OUTPUT = """echo '{"version": 1}'
+echo '['
+echo '[{"name": "load", "full_text": "0.31"}]'
+"""
+
+
+def fake_i3status(tmpdir, output=""):
+    path = tmpdir.join("i3status")
+    path.write(FAKE_I3STATUS.format(tmpdir.join("configs"), output))
+    path.chmod(0o755)
+    wrapper = Wrapper(["load"])
+    wrapper.config["i3status_path"] = str(path)
+    return wrapper
+
+
+def test_supervisor_fast_failures(tmpdir, monkeypatch):
+    monkeypatch.setattr(i3status_module, "RESTART_DELAY", 0.01)
+    wrapper = fake_i3status(tmpdir, FAKE_OUTPUT)
+    i3status = I3status(wrapper)
+    i3status.start()
+    assert i3status.ready_event.wait(5)
+    i3status.join(30)
+    assert not i3status.is_alive()
+    assert i3status.ready
+    # restarted with a longer delay each time then given up
+    summary = i3status.metrics.summary()
+    assert summary["counters"] == {"restarts": 4, "fast_failures": 5}
+    assert i3status.metrics.timings["restart_delay"] == deque([0.01, 0.02, 0.04, 0.08])
+    assert summary["timings"]["run_duration"]["count"] == 5
+    assert len(wrapper.notified) == 1
+    assert wrapper.notified[0].startswith("i3status keeps dying")
+    # the same config file each time
+    assert len(set(tmpdir.join("configs").readlines())) == 1
+
+
+def test_supervisor_never_ready(tmpdir):
+    wrapper = fake_i3status(tmpdir)
+    i3status = I3status(wrapper)
+    i3status.start()
+    assert i3status.ready_event.wait(5)
+    assert not i3status.ready
+    i3status.join(5)
+    assert "restarts" not in i3status.metrics.counters
+    assert wrapper.notified == []
@@ -0,0 +1,70 @@
+from py3status.i3status_native import (
+    expand,
+    format_bytes,
+    get_native_module,
+    parse_bytes,
+)
+
+GENERAL = {
+    "colors": True,
+    "color_bad": "#FF0000",
+    "color_degraded": "#FFFF00",
+    "color_good": "#00FF00",
+}
+
+UEVENT = """POWER_SUPPLY_NAME=BAT{}
+POWER_SUPPLY_STATUS={}
+POWER_SUPPLY_ENERGY_FULL_DESIGN=50000000
+POWER_SUPPLY_ENERGY_FULL=40000000
+POWER_SUPPLY_ENERGY_NOW={}
+POWER_SUPPLY_POWER_NOW=10000000
+"""
+
+
+def test_format_bytes():
+    assert format_bytes(512) == "512.0 B"
+    assert format_bytes(3 * 1024 ** 3) == "3.0 GiB"
+    assert format_bytes(1500000, "decimal") == "1.5 MB"
+    assert format_bytes(2048, "custom") == "2.0K"
+
+
+def test_parse_bytes():
+    assert parse_bytes("10%", 2000) == 200
+    assert parse_bytes("1G") == 1024 ** 3
+    assert parse_bytes(512) == 512
+
+
+def test_expand():
+    placeholders = {"percentage": "50%", "percentage_used": "20%", "used": "1 GiB"}
+    assert expand("%used (%percentage_used) %percentage", placeholders) == (
+        "1 GiB (20%) 50%"
+    )
+
+
+def test_battery(tmpdir):
+    tmpdir.join("BAT0").write(UEVENT.format(0, "Discharging", 20000000))
+    config = {"path": str(tmpdir.join("BAT%d")), "low_threshold": 180}
+    battery = get_native_module("battery 0", config, GENERAL)
+    assert battery.output() == {"full_text": "BAT 40.00% 02:00:00", "color": "#FF0000"}
+    # all the batteries together, with the capacity they have now
+    tmpdir.join("BAT1").write(UEVENT.format(1, "Charging", 30000000))
+    config = {
+        "path": str(tmpdir.join("BAT%d")),
+        "format": "%status %percentage %remaining %consumption",
+        "last_full_capacity": True,
+        "integer_battery_capacity": True,
+        "hide_seconds": True,
+    }
+    battery = get_native_module("battery all", config, GENERAL)
+    assert battery.output() == {
+        "full_text": "CHR 62% 01:30 20.00W",
+        "color": "#00FF00",
+    }
+    battery = get_native_module("battery 2", config, GENERAL)
+    assert battery.output() == {"full_text": "No battery", "color": "#FF0000"}
+
+
+def test_available():
+    assert get_native_module("wireless _first_", {}, GENERAL) is None
+    assert get_native_module("tztime nowhere", {"timezone": "Nowhere/Town"}, {}) is None
+    assert get_native_module("tztime local", {}, GENERAL).output()["full_text"]
@@ -0,0 +1,102 @@
+import mailbox
+import os
+
+from py3status.modules import mail
+from py3status.modules.mail import DirectoryIndex, MboxIndex
+
+MESSAGE = """From: {0}@example.com
+To: me@example.com
+Subject: message {0}
+
+From the body, not a separator.
+"""
+
+
+def add(box, *names):
+    keys = [box.add(MESSAGE.format(name)) for name in names]
+    box.flush()
+    return keys
+
+
+def mbox_index(path):
+    return MboxIndex(path, b"From ")
+
+
+def test_mbox_append(tmpdir):
+    path = str(tmpdir.join("mbox"))
+    box = mailbox.mbox(path)
+    add(box, "a", "b")
+    index = mbox_index(path)
+    assert index.count() == len(mailbox.mbox(path)) == 2
+    size = os.path.getsize(path)
+    add(box, "c", "d", "e")
+    assert index.count() == len(mailbox.mbox(path)) == 5
+    # only the new messages were read
+    assert index.offset == os.path.getsize(path) > size
+    assert index.count() == 5
+
+
+def test_mbox_rewrite(tmpdir):
+    path = str(tmpdir.join("mbox"))
+    box = mailbox.mbox(path)
+    keys = add(box, "a", "b", "c")
+    index = mbox_index(path)
+    assert index.count() == 3
+    # a message removed, the mbox is written again
+    box.remove(keys[0])
+    box.flush()
+    assert index.count() == len(mailbox.mbox(path)) == 2
+    # truncated in place
+    data = open(path, "rb").read()
+    with open(path, "r+b") as f:
+        f.truncate(data.index(b"\nFrom ", 1) + 1)
+    assert index.count() == len(mailbox.mbox(path)) == 1
+    # rewritten in place with other messages and more data
+    short = b"From x@example.com Sat Jan  1 00:00:00 2000\n\nhi\n\n"
+    with open(path, "r+b") as f:
+        f.write(short * 10)
+    assert index.count() == len(mailbox.mbox(path)) == 10
+
+
+def test_mbox_partial_lines(tmpdir, monkeypatch):
+    # separators split across reads
+    monkeypatch.setattr(mail, "READ_SIZE", 3)
+    path = str(tmpdir.join("mbox"))
+    box = mailbox.mbox(path)
+    add(box, "a", "b")
+    index = mbox_index(path)
+    assert index.count() == len(mailbox.mbox(path)) == 2
+    # a message being written, its separator line is not complete yet
+    data = open(path, "rb").read()
+    with open(path, "ab") as f:
+        f.write(b"Fr")
+    assert index.count() == 2
+    with open(path, "ab") as f:
+        f.write(data[2:])
+    assert index.count() == len(mailbox.mbox(path)) == 4
+
+
+def test_maildir(tmpdir, monkeypatch):
+    path = str(tmpdir.join("Maildir"))
+    box = mailbox.Maildir(path)
+    index = mail.Py3status()._get_index("Maildir", path)
+    assert isinstance(index, DirectoryIndex)
+    assert index.count() == 0
+    keys = add(box, "a", "b", "c")
+    assert index.count() == len(mailbox.Maildir(path)) == 3
+    # read messages are moved from new to cur and flagged
+    message = box[keys[0]]
+    message.set_subdir("cur")
+    message.add_flag("S")
+    box[keys[0]] = message
+    assert sorted(os.listdir(os.path.join(path, "cur")))[0].endswith(":2,S")
+    assert index.count() == len(mailbox.Maildir(path)) == 3
+    box.remove(keys[1])
+    assert index.count() == len(mailbox.Maildir(path)) == 2
+    # unchanged directories are not listed again
+    listed = []
+    monkeypatch.setattr(mail, "MTIME_SKEW", -1)
+    index.count()
+    monkeypatch.setattr(mail, "_list_files", lambda path: listed.append(path))
+    assert index.count() == 2
+    assert listed == []
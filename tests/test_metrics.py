@@ -0,0 +1,31 @@
+from collections import deque
+
+from py3status.metrics import Metrics
+
+
+def test_counters():
+    metrics = Metrics()
+    metrics.increment("restarts")
+    metrics.increment("restarts", 2)
+    assert metrics.summary()["counters"] == {"restarts": 3}
+
+
+def test_percentiles():
+    metrics = Metrics()
+    assert metrics.percentile("run", 50) is None
+    for duration in [0.5, 0.1, 0.4, 0.2, 0.3]:
+        metrics.record("run", duration)
+    assert metrics.percentile("run", 0) == 0.1
+    assert metrics.percentile("run", 50) == 0.3
+    assert metrics.percentile("run", 100) == 0.5
+    assert metrics.summary()["timings"] == {
+        "run": {"count": 5, "max": 0.5, "p50": 0.3, "p99": 0.5}
+    }
+
+
+def test_bounded():
+    metrics = Metrics()
+    for i in range(Metrics.MAX_SAMPLES + 10):
+        metrics.record("run", i)
+    assert metrics.timings["run"] == deque(range(10, Metrics.MAX_SAMPLES + 10))
+    assert metrics.summary()["timings"]["run"]["count"] == Metrics.MAX_SAMPLES
@@ -0,0 +1,58 @@
+import socket
+import struct
+
+import pytest
+
+from py3status import netlink
+
+
+def attribute(attr_type, value):
+    length = netlink.RTATTR.size + len(value)
+    padding = b"\0" * (-length % 4)
+    return netlink.RTATTR.pack(length, attr_type) + value + padding
+
+
+def message(msg_type, payload, seq=1):
+    header = netlink.NLMSGHDR.pack(
+        netlink.NLMSGHDR.size + len(payload), msg_type, netlink.NLM_F_MULTI, seq, 0
+    )
+    return header + payload + b"\0" * (-len(payload) % 4)
+
+
+def test_parse_link():
+    payload = netlink.IFINFOMSG.pack(socket.AF_UNSPEC, 1, 3, netlink.IFF_UP, 0)
+    payload += attribute(netlink.IFLA_IFNAME, b"wlan0\0")
+    payload += attribute(netlink.IFLA_OPERSTATE, struct.pack("=B", 6))
+    messages = list(netlink.parse_messages(message(netlink.RTM_NEWLINK, payload)))
+    assert [x[0] for x in messages] == [netlink.RTM_NEWLINK]
+    assert netlink.parse_link(messages[0][3]) == {
+        "index": 3,
+        "name": "wlan0",
+        "flags": netlink.IFF_UP,
+        "operstate": "up",
+    }
+
+
+def test_parse_address():
+    ip4 = netlink.IFADDRMSG.pack(socket.AF_INET, 24, 0, 0, 3)
+    ip4 += attribute(netlink.IFA_ADDRESS, socket.inet_pton(socket.AF_INET, "10.0.0.9"))
+    ip4 += attribute(netlink.IFA_LOCAL, socket.inet_pton(socket.AF_INET, "10.0.0.2"))
+    ip4 += attribute(netlink.IFA_LABEL, b"wlan0\0")
+    ip6 = netlink.IFADDRMSG.pack(socket.AF_INET6, 64, 0, 253, 3)
+    ip6 += attribute(netlink.IFA_ADDRESS, socket.inet_pton(socket.AF_INET6, "fe80::1"))
+    data = message(netlink.RTM_NEWADDR, ip4) + message(netlink.RTM_NEWADDR, ip6)
+    addresses = [netlink.parse_address(x[3]) for x in netlink.parse_messages(data)]
+    # the local address, not the peer
+    assert addresses[0]["address"] == "10.0.0.2"
+    assert addresses[0]["prefixlen"] == 24
+    assert addresses[0]["label"] == "wlan0"
+    assert addresses[1]["address"] == "fe80::1"
+    assert addresses[1]["index"] == 3
+    assert addresses[1]["label"] is None
+
+
+@pytest.mark.skipif(not netlink.available(), reason="needs linux")
+def test_get_interfaces():
+    interfaces = netlink.get_interfaces()
+    assert "127.0.0.1" in interfaces["lo"]["ip4"]
+    assert list(interfaces)[0] == "lo"
@@ -0,0 +1,107 @@
+import errno
+import socket
+
+from threading import Thread
+from time import sleep
+
+from py3status import netlink, network_monitor
+from py3status.network_monitor import NetworkMonitor
+
+from helpers import Module, Wrapper
+
+
+class FakeNetlink:
+    """
+    Each byte written to the socket is a message of that type.
+    """
+
+    def __init__(self):
+        self.sock, self.writer = socket.socketpair()
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def close(self):
+        self.sock.close()
+        self.writer.close()
+
+    def receive(self):
+        return [(x, 0, 0, b"") for x in bytearray(self.sock.recv(1024))]
+
+
+class BrokenNetlink(FakeNetlink):
+    def receive(self):
+        raise OSError(errno.EBADF, "Bad file descriptor")
+
+
+def test_subscribe_invalid():
+    monitor = NetworkMonitor(Wrapper())
+    assert not monitor.subscribe(Module("wifi"), ["wireless"])
+    assert monitor.consumers == []
+
+
+def test_trigger_actions():
+    monitor = NetworkMonitor(Wrapper())
+    wifi = Module("wifi")
+    whatismyip = Module("whatismyip")
+    calls = []
+    monitor.consumers = [
+        (wifi, {"link", "address"}, None),
+        (whatismyip, {"route"}, lambda: calls.append(1)),
+    ]
+    monitor.trigger_actions({"address"})
+    assert (wifi.updates, whatismyip.updates, calls) == (1, 0, [])
+    monitor.trigger_actions({"link", "route"})
+    assert (wifi.updates, whatismyip.updates, calls) == (2, 1, [1])
+
+
+def test_debounce():
+    wrapper = Wrapper()
+    monitor = NetworkMonitor(wrapper)
+    monitor.netlink = FakeNetlink()
+    module = Module("net_iplist")
+    monitor.consumers = [(module, {"address"}, None)]
+    thread = Thread(target=monitor._loop)
+    thread.daemon = True
+    thread.start()
+    # a burst of changes is a single update
+    for msg_type in [netlink.RTM_NEWLINK, netlink.RTM_NEWADDR, netlink.RTM_DELADDR]:
+        monitor.netlink.writer.send(bytearray([msg_type]))
+        sleep(0.05)
+    assert module.updates == 0
+    sleep(0.6)
+    assert module.updates == 1
+    # links are not wanted
+    monitor.netlink.writer.send(bytearray([netlink.RTM_NEWLINK]))
+    sleep(0.6)
+    assert module.updates == 1
+    wrapper.running = False
+    monitor.netlink.writer.send(bytearray([netlink.NLMSG_NOOP]))
+    thread.join(1)
+
+
+def test_reopen(monkeypatch):
+    wrapper = Wrapper()
+    monitor = NetworkMonitor(wrapper)
+    monitor.netlink = BrokenNetlink()
+    reopened = FakeNetlink()
+    monkeypatch.setattr(network_monitor, "REOPEN_DELAY", 0.1)
+    monkeypatch.setattr(netlink, "NetlinkSocket", lambda groups: reopened)
+    module = Module("net_iplist")
+    monitor.consumers = [(module, {"address"}, None)]
+    thread = Thread(target=monitor._loop)
+    thread.daemon = True
+    thread.start()
+    monitor.netlink.writer.send(bytearray([netlink.RTM_NEWADDR]))
+    sleep(0.3)
+    # the error is reported and the module updated as events were missed
+    assert wrapper.errors == ["network monitoring failed"]
+    assert monitor.netlink is reopened
+    assert module.updates == 1
+    reopened.writer.send(bytearray([netlink.RTM_NEWADDR]))
+    sleep(0.6)
+    assert module.updates == 2
+    wrapper.running = False
+    reopened.writer.send(bytearray([netlink.NLMSG_NOOP]))
+    thread.join(1)
+    assert not thread.is_alive()
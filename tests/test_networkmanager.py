@@ -0,0 +1,125 @@
+import re
+
+from copy import deepcopy
+from fnmatch import fnmatch
+
+from py3status.exceptions import CommandError
+from py3status.modules.networkmanager import Py3status
+
+DEVICES = {
+    "wlp3s0": [
+        "GENERAL.DEVICE:wlp3s0",
+        "GENERAL.TYPE:wifi",
+        "GENERAL.CONNECTION:Py3net",
+        "IP4.ADDRESS[1]:192.168.1.106/24",
+    ],
+    "enp2s0": [
+        "GENERAL.DEVICE:enp2s0",
+        "GENERAL.TYPE:ethernet",
+        "GENERAL.CONNECTION:",
+    ],
+    "lo": ["GENERAL.DEVICE:lo", "GENERAL.TYPE:loopback", "GENERAL.CONNECTION:"],
+}
+
+
+class Py3:
+    CACHE_FOREVER = -1
+    CommandError = CommandError
+
+    def __init__(self):
+        self.commands = []
+        self.devices = deepcopy(DEVICES)
+        self.streams = []
+        self.updates = 0
+
+    def check_commands(self, commands):
+        return commands
+
+    def get_placeholders_list(self, format_string, match=None):
+        placeholders = re.findall(r"\{(\w+)", format_string)
+        return [x for x in placeholders if not match or fnmatch(x, match)]
+
+    def get_color_names_list(self, format_string):
+        return []
+
+    def command_output(self, command, localized=False):
+        names = command[6:]
+        self.commands.append(names)
+        if any(name not in self.devices for name in names):
+            raise CommandError("Device not found")
+        names = names or sorted(self.devices)
+        return "\n\n".join("\n".join(self.devices[x]) for x in names) + "\n"
+
+    def command_stream(self, command, on_line, on_exit=None):
+        self.streams.append((command, on_line, on_exit))
+        return object()
+
+    def register_network_events(self, events=None, callback=None):
+        return True
+
+    def safe_format(self, format_string, data=None):
+        return data
+
+    def composite_join(self, separator, items):
+        return items
+
+    def time_in(self, seconds):
+        return seconds
+
+    def update(self):
+        self.updates += 1
+
+
+def setup_module(**config):
+    module = Py3status()
+    module.py3 = Py3()
+    module.format_device = "{general_device} {ip4_address1}"
+    for key, value in config.items():
+        setattr(module, key, value)
+    module.post_config_hook()
+    return module, module.py3
+
+
+def names(output):
+    return [x["general_device"] for x in output["full_text"]["format_device"]]
+
+
+def test_monitor_events():
+    module, py3 = setup_module()
+    assert py3.streams[0][0] == ["nmcli", "monitor"]
+    on_line = py3.streams[0][1]
+    output = module.networkmanager()
+    assert names(output) == ["enp2s0", "wlp3s0"]
+    assert output["cached_until"] == py3.CACHE_FOREVER
+    assert module.table["wlp3s0"]["ip4_address1"] == "192.168.1.106"
+    # only the changed device is queried again
+    py3.devices["enp2s0"].append("IP4.ADDRESS[1]:10.0.0.2/8")
+    on_line("enp2s0: connected")
+    on_line("lo: connected")
+    on_line("Networkmanager is now in the 'connected' state")
+    assert py3.updates == 2
+    del py3.commands[:]
+    module.networkmanager()
+    assert py3.commands == [["enp2s0"]]
+    assert module.table["enp2s0"]["ip4_address1"] == "10.0.0.2"
+    # a removed device is dropped
+    del py3.devices["wlp3s0"]
+    on_line("wlp3s0: device removed")
+    assert names(module.networkmanager()) == ["enp2s0"]
+
+
+def test_monitor_exit():
+    module, py3 = setup_module()
+    module.networkmanager()
+    py3.streams[0][2](1)
+    del py3.commands[:]
+    output = module.networkmanager()
+    assert output["cached_until"] == module.cache_timeout
+    assert py3.commands == [[]]
+
+
+def test_devices():
+    module, py3 = setup_module(devices=[])
+    assert names(module.networkmanager()) == ["enp2s0", "lo", "wlp3s0"]
+    module, py3 = setup_module(devices=["w*"])
+    assert names(module.networkmanager()) == ["wlp3s0"]
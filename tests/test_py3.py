@@ -1,5 +1,11 @@
 from pprint import pformat
+from time import time
 
+import pytest
+
+from py3status import py3 as py3_module
+from py3status.exceptions import CommandError
+from py3status.metrics import Metrics
 from py3status.py3 import Py3
 
 
@@ -218,3 +224,77 @@ def test_flatten_dict_parent_key():
     print("returned data")
     print(pformat(returned))
     assert returned == expected
+
+
+class Wrapper:
+    def __init__(self):
+        self.config = {"py3_config": {"general": {}}}
+        self.logs = []
+        self.output_modules = {}
+
+    def get_config_attribute(self, name, attribute):
+        return None
+
+    def log(self, msg, level="info"):
+        self.logs.append(msg)
+
+
+class Module:
+    def __init__(self):
+        self._py3_wrapper = Wrapper()
+        self.metrics = Metrics()
+        self.module_class = None
+        self.module_full_name = "test_module"
+
+
+def test_command_output_timeout():
+    module = Module()
+    module_py3 = Py3(module)
+    start = time()
+    # the background sleep keeps the output open so the whole process group
+    # has to be killed for the command to return
+    with pytest.raises(CommandError) as e:
+        module_py3.command_output(
+            ["sh", "-c", "echo partial; sleep 30 & wait"], timeout=0.3
+        )
+    assert time() - start < 5
+    assert "timed out after 0.3 seconds" in str(e.value)
+    assert e.value.output == "partial\n"
+    assert module.metrics.counters["command_timeouts"] == 1
+    assert len(module._py3_wrapper.logs) == 1
+
+
+def test_command_run_timeout():
+    with pytest.raises(CommandError):
+        py3.command_run(["sleep", "30"], timeout=0.2)
+    assert py3.command_run(["true"], timeout=5) == 0
+
+
+def test_command_watchdog_finished(monkeypatch):
+    # the timer firing once the command has finished kills nothing
+    timers = []
+
+    class Timer:
+        def __init__(self, timeout, function):
+            timers.append(function)
+
+        def start(self):
+            pass
+
+        def cancel(self):
+            pass
+
+    killed = []
+    monkeypatch.setattr(py3_module, "Timer", Timer)
+    monkeypatch.setattr(py3_module.os, "killpg", lambda *args: killed.append(args))
+    process = py3._command_popen(["true"], 1)
+    process.communicate()
+    stop_watchdog = py3._command_watchdog(process, 1)
+    assert stop_watchdog() is False
+    timers[0]()
+    assert killed == []
+    # while running it is killed
+    stop_watchdog = py3._command_watchdog(process, 1)
+    timers[1]()
+    assert stop_watchdog() is True
+    assert killed == [(process.pid, py3_module.SIGKILL)]
@@ -0,0 +1,129 @@
+import gzip
+import json
+import zlib
+
+from io import BytesIO
+from threading import Thread
+
+import pytest
+
+from py3status.exceptions import RequestInvalidJSON
+from py3status.request import CircuitBreaker, HttpResponse
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+except ImportError:
+    # Python 2
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+
+def test_circuit_breaker():
+    breaker = CircuitBreaker()
+    url = "http://example.com/api"
+    for x in range(breaker.failure_threshold - 1):
+        breaker.failure(url)
+        assert breaker.allow(url)
+    breaker.failure(url)
+    # the circuit is now open for the whole endpoint
+    assert not breaker.allow(url)
+    assert not breaker.allow("http://example.com/other")
+    assert breaker.allow("http://example.org/api")
+    assert breaker.retry_in(url) > 0
+
+    # once the cool down has passed a single trial request is allowed
+    breaker.open_until[breaker.endpoint(url)] = 0
+    assert breaker.allow(url)
+    assert not breaker.allow(url)
+
+    # success closes the circuit
+    breaker.success(url)
+    assert breaker.allow(url)
+    assert breaker.retry_in(url) == 0
+
+
+def serve(body, content_encoding=None):
+    """
+    Serve a single response from a local http server and return its url.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.server.accept_encoding = self.headers.get("Accept-Encoding")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            if content_encoding:
+                self.send_header("Content-Encoding", content_encoding)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = Thread(target=server.handle_request)
+    thread.daemon = True
+    thread.start()
+    return server, "http://127.0.0.1:{}/".format(server.server_port)
+
+
+def get(url, headers=None):
+    return HttpResponse(url, None, None, headers or {}, 5, None, None)
+
+
+def gzip_compress(data):
+    buffer = BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode="wb") as f:
+        f.write(data)
+    return buffer.getvalue()
+
+
+def test_compressed_responses():
+    data = {"weather": [u"sunny \u2600"] * 1000}
+    raw = json.dumps(data).encode("utf-8")
+    deflate = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS)
+    bodies = [
+        (raw, None),
+        (gzip_compress(raw), "gzip"),
+        (zlib.compress(raw), "deflate"),
+        (deflate.compress(raw) + deflate.flush(), "deflate"),
+    ]
+    for body, content_encoding in bodies:
+        server, url = serve(body, content_encoding)
+        response = get(url)
+        assert server.accept_encoding == "gzip, deflate"
+        assert response.status_code == 200
+        assert response.json() == data
+        assert response.text == raw.decode("utf-8")
+        server.server_close()
+
+
+def test_accept_encoding():
+    server, url = serve(b"{}")
+    get(url, {"accept-encoding": "identity"})
+    assert server.accept_encoding == "identity"
+    server.server_close()
+
+
+def test_streamed_json():
+    data = {"list": [{"dt": x, "main": {"temp": 280.5}} for x in range(5000)]}
+    raw = json.dumps(data).encode("utf-8")
+    server, url = serve(gzip_compress(raw), "gzip")
+    response = get(url)
+    assert list(response.iter_json(1024)) == [data]
+    server.server_close()
+    server, url = serve(raw)
+    response = get(url)
+    assert response.json(stream=True) == data
+    assert response.text == ""
+    server.server_close()
+    # json lines, split anywhere
+    lines = b"".join(json.dumps(x).encode("utf-8") + b"\n" for x in [1, 23, u"\u2600"])
+    server, url = serve(lines)
+    response = get(url)
+    assert list(response.iter_json(3)) == [1, 23, u"\u2600"]
+    server.server_close()
+    server, url = serve(b'{"temp": 28')
+    with pytest.raises(RequestInvalidJSON):
+        get(url).json(stream=True)
+    server.server_close()
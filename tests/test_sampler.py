@@ -0,0 +1,53 @@
+from py3status.sampler import ProcSampler
+
+NET_DEV = """\
+Inter-|   Receive                            |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes
+    lo:  1000      10    0    0    0     0          0         0  2000      20    0    0    0     0       0          0
+  eth0:12345     100    0    0    0     0          0         0  6789      50    0    0    0     0       0          0
+"""
+
+STAT = """\
+cpu  10 0 10 80 0 0 0 0 0 0
+cpu0 5 0 5 40 0 0 0 0 0 0
+cpu1 5 0 5 40 0 0 0 0 0 0
+intr 1234 0 0
+ctxt 5678
+"""
+
+
+def make_proc(tmpdir):
+    tmpdir.mkdir("net").join("dev").write(NET_DEV)
+    tmpdir.join("stat").write(STAT)
+    tmpdir.join("meminfo").write("MemTotal:  1000 kB\nMemFree:  400 kB\n")
+    tmpdir.join("uptime").write("123.45 678.90\n")
+    tmpdir.join("loadavg").write("0.1 0.2 0.3 1/100 1234\n")
+    return ProcSampler(str(tmpdir))
+
+
+def test_parsers(tmpdir):
+    sampler = make_proc(tmpdir)
+    net_dev = sampler.get("net/dev", 1).data
+    assert list(net_dev) == ["lo", "eth0"]
+    assert net_dev["eth0"][0] == 12345
+    assert net_dev["eth0"][8] == 6789
+    stat = sampler.get("stat", 1).data
+    assert list(stat) == ["cpu", "cpu0", "cpu1"]
+    assert stat["cpu"][3] == 80
+    assert sampler.get("meminfo", 1).data == {"MemTotal": 1000, "MemFree": 400}
+    assert sampler.get("uptime", 1).data == (123.45, 678.90)
+    # files without a parser are given as lines
+    assert sampler.get("loadavg", 1).data == ["0.1 0.2 0.3 1/100 1234"]
+
+
+def test_shared_samples(tmpdir):
+    sampler = make_proc(tmpdir)
+    sample = sampler.get("uptime", 60)
+    tmpdir.join("uptime").write("200.00 700.00\n")
+    # still within the sampling interval
+    assert sampler.get("uptime", 60) is sample
+    # a sample newer than the one we already have is needed
+    newer = sampler.get("uptime", 60, newer_than=sample.time)
+    assert newer.data == (200.0, 700.0)
+    assert newer.time > sample.time
+    assert sampler.get("uptime", 0).time > newer.time
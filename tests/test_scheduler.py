@@ -0,0 +1,81 @@
+from argparse import Namespace
+from threading import Event
+
+from py3status.command import format_stats
+from py3status.core import Py3statusWrapper
+
+
+class Task:
+    def __init__(self, name, runs):
+        self.module_full_name = name
+        self.runs = runs
+        self.done = Event()
+
+    def run(self):
+        self.runs.append(self)
+        self.done.set()
+
+
+class SlowTask(Task):
+    def __init__(self, name, runs):
+        Task.__init__(self, name, runs)
+        self.release = Event()
+
+    def run(self):
+        self.release.wait(5)
+        Task.run(self)
+
+
+def process(wrapper, task):
+    # the scheduler is woken to start the tasks waiting for the module
+    while not task.done.is_set():
+        wrapper.update_request.wait(0.1)
+        wrapper.update_request.clear()
+        wrapper.timeout_queue_process()
+
+
+def test_priority_lane():
+    wrapper = Py3statusWrapper(Namespace())
+    runs = []
+    running = SlowTask("volume_status", runs)
+    wrapper.timeout_queue_add(running)
+    wrapper.timeout_queue_process()
+    # the module is busy so its update and clicks have to wait
+    update = Task("volume_status", runs)
+    clicks = [Task("volume_status", runs) for i in range(2)]
+    wrapper.timeout_queue_add(update)
+    for click in clicks:
+        wrapper.priority_queue_add(click)
+    other = Task("clock", runs)
+    wrapper.priority_queue_add(other)
+    wrapper.timeout_queue_process()
+    other.done.wait(5)
+    assert runs == [other]
+    assert wrapper.metrics.counters["events_deferred"] == 2
+    # once finished the clicks are run in order, none of them is lost, then
+    # the missed update
+    wrapper.update_request.clear()
+    running.release.set()
+    process(wrapper, update)
+    assert runs == [other, running] + clicks + [update]
+    assert wrapper.timeout_priority_missed == {}
+
+
+def test_format_stats():
+    stats = {
+        "py3status": {
+            "counters": {"events_deferred": 3},
+            "timings": {
+                "click_latency": {"count": 7, "max": 0.02, "p50": 0.004, "p99": 0.02}
+            },
+        },
+        "i3status": {"counters": {}, "timings": {}},
+        "clock": {"counters": {"command_timeouts": 1}, "timings": {}},
+    }
+    assert format_stats(stats) == [
+        "py3status",
+        "    events_deferred      3",
+        "    click_latency        count 7  p50 4.0ms  p99 20.0ms  max 20.0ms",
+        "clock",
+        "    command_timeouts     1",
+    ]
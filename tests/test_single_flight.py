@@ -0,0 +1,74 @@
+from threading import Thread
+from time import sleep
+
+from py3status.single_flight import SingleFlight
+
+
+def run_concurrently(single_flight, key, fn, count=5, ttl=0):
+    results = []
+
+    def target():
+        try:
+            results.append(single_flight.do(key, fn, ttl=ttl))
+        except Exception as e:
+            results.append(e)
+
+    threads = [Thread(target=target) for x in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_calls_share_result():
+    single_flight = SingleFlight()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        sleep(0.2)
+        return "output"
+
+    results = run_concurrently(single_flight, "key", fn)
+    assert results == ["output"] * 5
+    assert len(calls) == 1
+    # nothing is cached without a ttl
+    assert single_flight.do("key", lambda: "new") == "new"
+
+
+def test_concurrent_calls_share_exception():
+    single_flight = SingleFlight()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        sleep(0.2)
+        raise ValueError("failed")
+
+    results = run_concurrently(single_flight, "key", fn)
+    assert len(calls) == 1
+    assert all(isinstance(x, ValueError) for x in results)
+    # errors are not cached
+    assert single_flight.do("key", lambda: "ok", ttl=10) == "ok"
+
+
+def test_ttl():
+    single_flight = SingleFlight()
+    assert single_flight.do("key", lambda: 1, ttl=0.2) == 1
+    assert single_flight.do("key", lambda: 2, ttl=0.2) == 1
+    assert single_flight.do("other", lambda: 3, ttl=0.2) == 3
+    sleep(0.3)
+    assert single_flight.do("key", lambda: 4, ttl=0.2) == 4
+    single_flight.clear()
+    assert single_flight.do("key", lambda: 5) == 5
+
+
+def test_expired_evicted():
+    single_flight = SingleFlight()
+    for i in range(5):
+        single_flight.do(("command", i), lambda: i, ttl=0.1)
+    sleep(0.2)
+    # keys never asked for again go when another result is stored
+    single_flight.do("key", lambda: 1, ttl=10)
+    assert list(single_flight.flights) == ["key"]
@@ -0,0 +1,72 @@
+from py3status.modules.sysdata import CpuStats, Py3status
+from py3status.sampler import parse_stat
+
+# user nice system idle iowait irq softirq steal guest guest_nice
+FIRST = """cpu  1000 0 1000 8000 0 0 0 0 0 0
+cpu0 500 0 500 4000 0 0 0 0 0 0
+cpu1 500 0 500 4000 0 0 0 0 0 0
+intr 12345
+"""
+
+SECOND = """cpu  1600 0 1200 8200 0 0 0 0 0 0
+cpu0 1000 0 600 4000 0 0 0 0 0 0
+cpu1 600 0 600 4200 0 0 0 0 0 0
+intr 12346
+"""
+
+SENSORS = u"""coretemp-isa-0000
+Adapter: ISA adapter
+Package id 0:  +45.0\u00b0C  (high = +80.0\u00b0C, crit = +100.0\u00b0C)
+Core 0:        +43.0\u00b0C  (high = +80.0\u00b0C, crit = +100.0\u00b0C)
+"""
+
+
+class Py3:
+    def __init__(self):
+        self.calls = []
+
+    def command_output(self, command):
+        self.calls.append(command)
+        return SENSORS
+
+    def read_sensors(self, chips=None, keys=None):
+        self.calls.append("sysfs")
+        return [{"name": "coretemp-isa-0000", "sensors": {"Core 0": {"input": "42"}}}]
+
+
+def used_percent(cpu_stats, name):
+    return round(cpu_stats.used_percent(name), 6)
+
+
+def test_cpu_stats():
+    stat = parse_stat(FIRST)
+    names = [x for x in stat if x.startswith("cpu")]
+    cpu_stats = CpuStats(names)
+    cpu_stats.update(stat)
+    # since boot
+    assert used_percent(cpu_stats, "cpu0") == 20
+    cpu_stats.update(parse_stat(SECOND))
+    assert used_percent(cpu_stats, "cpu") == 80
+    assert used_percent(cpu_stats, "cpu0") == 100
+    assert used_percent(cpu_stats, "cpu1") == 50
+    assert cpu_stats.top(1) == ["cpu0"]
+    # the same sample again changes nothing
+    cpu_stats.update(parse_stat(SECOND))
+    assert used_percent(cpu_stats, "cpu1") == 50
+    # offline cpus are not used
+    stat = parse_stat(SECOND)
+    del stat["cpu1"]
+    cpu_stats.update(stat)
+    assert used_percent(cpu_stats, "cpu1") == 0
+
+
+def test_cpu_temp_sensors():
+    # sensors.conf is used by default
+    module = Py3status()
+    module.py3 = Py3()
+    assert module._get_cputemp_with_lmsensors() == 43.0
+    assert module.py3.calls == [["sensors"]]
+    module.sysfs = True
+    module.py3.calls = []
+    assert module._get_cputemp_with_lmsensors() == 42.0
+    assert module.py3.calls == ["sysfs"]
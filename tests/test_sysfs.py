@@ -0,0 +1,79 @@
+import errno
+import os
+
+import pytest
+
+from py3status import sysfs
+from py3status.sysfs import SysfsReader
+
+
+def test_read_again(tmpdir):
+    reader = SysfsReader(str(tmpdir))
+    path = tmpdir.join("brightness")
+    path.write("10\n")
+    assert reader.read(str(path)) == "10\n"
+    fd = reader.fds[str(path)]
+    # the file is kept open and read from its start
+    path.write("200\n")
+    assert reader.read(str(path)) == "200\n"
+    assert reader.fds[str(path)] == fd
+
+
+def inodes(fds):
+    return set(os.fstat(fd).st_ino for fd in fds)
+
+
+def test_device_gone(tmpdir, monkeypatch):
+    reader = SysfsReader(str(tmpdir))
+    stale = set()
+    pread = sysfs.pread
+
+    def sysfs_pread(fd, size, offset):
+        # on sysfs the open files of a removed device give ENODEV
+        if os.fstat(fd).st_ino in stale:
+            raise OSError(errno.ENODEV, os.strerror(errno.ENODEV))
+        return pread(fd, size, offset)
+
+    monkeypatch.setattr(sysfs, "pread", sysfs_pread)
+    device = tmpdir.mkdir("BAT0")
+    path = device.join("uevent")
+    path.write("POWER_SUPPLY_STATUS=Full\n")
+    assert reader.glob(str(tmpdir.join("BAT*"))) == [str(device)]
+    assert reader.read(str(path)) == "POWER_SUPPLY_STATUS=Full\n"
+    # a replaced device is opened again
+    stale.update(inodes(reader.fds.values()))
+    device.remove()
+    device = tmpdir.mkdir("BAT0")
+    path.write("POWER_SUPPLY_STATUS=Charging\n")
+    assert reader.read(str(path)) == "POWER_SUPPLY_STATUS=Charging\n"
+    assert not stale & inodes(reader.fds.values())
+    # a removed device is not
+    stale.update(inodes(reader.fds.values()))
+    reader.glob(str(tmpdir.join("BAT*")))
+    device.remove()
+    with pytest.raises(OSError):
+        reader.read(str(path))
+    assert reader.fds == {}
+    assert reader.glob(str(tmpdir.join("BAT*"))) == []
+
+
+def test_replaced_file(tmpdir):
+    # only sysfs files are kept open
+    reader = SysfsReader()
+    path = tmpdir.join("counter.save")
+    path.write("1")
+    assert reader.read(str(path)) == "1"
+    tmpdir.join("counter.new").write("2")
+    os.rename(str(tmpdir.join("counter.new")), str(path))
+    assert reader.read(str(path)) == "2"
+    assert reader.fds == {}
+
+
+def test_glob_cached(tmpdir):
+    reader = SysfsReader()
+    tmpdir.mkdir("BAT0")
+    pattern = str(tmpdir.join("BAT*"))
+    assert len(reader.glob(pattern)) == 1
+    tmpdir.mkdir("BAT1")
+    assert len(reader.glob(pattern)) == 1
+    assert len(reader.glob(pattern, cache_timeout=0)) == 2
@@ -0,0 +1,111 @@
+from py3status.modules.volume_status import Py3status
+
+PACTL = {
+    ("pactl", "info"): "Server Name: pulseaudio\nDefault Sink: alsa_output.pci\n",
+    ("pactl", "list", "short", "sinks"): (
+        "0\talsa_output.hdmi\tmodule-alsa-card.c\ts16le 2ch 44100Hz\tSUSPENDED\n"
+        "1\talsa_output.pci\tmodule-alsa-card.c\ts16le 2ch 44100Hz\tRUNNING\n"
+    ),
+    ("pactl", "get-sink-mute", "1"): "Mute: no\n",
+    ("pactl", "get-sink-volume", "1"): (
+        "Volume: front-left: 32768 /  50% / -18.06 dB,   "
+        "front-right: 32768 /  50% / -18.06 dB\n"
+    ),
+}
+
+
+class Py3:
+    CACHE_FOREVER = -1
+    COLOR_BAD = "#FF0000"
+    COLOR_MUTED = None
+
+    def __init__(self):
+        self.commands = []
+        self.streams = []
+        self.updates = 0
+
+    def check_commands(self, commands):
+        return commands
+
+    def command_output(self, command):
+        self.commands.append(command)
+        return PACTL[tuple(command)]
+
+    def command_stream(self, command, on_line, on_exit=None):
+        self.streams.append((command, on_line, on_exit))
+        return object()
+
+    def safe_format(self, format_string, data):
+        return data["percentage"]
+
+    def threshold_get_color(self, value):
+        return None
+
+    def time_in(self, seconds):
+        return seconds
+
+    def update(self):
+        self.updates += 1
+
+
+def setup_module_pactl():
+    module = Py3status()
+    module.py3 = Py3()
+    module.command = "pactl"
+    module.post_config_hook()
+    return module, module.py3
+
+
+def test_pactl_events():
+    module, py3 = setup_module_pactl()
+    assert py3.streams[0][0] == ["pactl", "subscribe"]
+    on_event = py3.streams[0][1]
+    output = module.volume_status()
+    assert output["full_text"] == "50"
+    # the volume is kept while streaming
+    assert output["cached_until"] == py3.CACHE_FOREVER
+    del py3.commands[:]
+    module.volume_status()
+    assert py3.commands == []
+    # changes of other devices or other kinds do not matter
+    for line in [
+        "Event 'change' on sink #0",
+        "Event 'change' on source #1",
+        "Event 'new' on client #25",
+        "Event 'change' on sink-input #4",
+    ]:
+        on_event(line)
+    module.volume_status()
+    assert (py3.commands, py3.updates) == ([], 0)
+    # our sink changed
+    on_event("Event 'change' on sink #1")
+    assert py3.updates == 1
+    module.volume_status()
+    assert py3.commands == [
+        ["pactl", "get-sink-mute", "1"],
+        ["pactl", "get-sink-volume", "1"],
+    ]
+    # the default sink may have changed
+    del py3.commands[:]
+    on_event("Event 'change' on server")
+    module.volume_status()
+    assert py3.commands[0] == ["pactl", "info"]
+
+
+def test_pactl_stream_died():
+    module, py3 = setup_module_pactl()
+    module.volume_status()
+    # pulseaudio went away, we poll until we subscribe again
+    py3.streams[0][2](1)
+    assert py3.updates == 1
+    del py3.commands[:]
+    output = module.volume_status()
+    assert output["cached_until"] == module.cache_timeout
+    assert len(py3.commands) == 2
+    assert len(py3.streams) == 1
+    module.volume_status()
+    assert len(py3.commands) == 4
+    module.backend.subscribe_at = 0
+    output = module.volume_status()
+    assert len(py3.streams) == 2
+    assert output["cached_until"] == py3.CACHE_FOREVER
@@ -0,0 +1,202 @@
+import json
+import socket
+
+from threading import Thread
+from time import sleep
+
+from py3status import wm_ipc
+from py3status.wm_ipc import WmIpc
+
+from helpers import Module, Wrapper
+
+TREE = {
+    "id": 1,
+    "name": "root",
+    "focused": False,
+    "nodes": [
+        {
+            "id": 2,
+            "name": "workspace",
+            "focused": False,
+            "nodes": [
+                {"id": 3, "name": "vim", "focused": True, "nodes": []},
+                {"id": 4, "name": "mpv", "focused": False, "nodes": []},
+            ],
+        }
+    ],
+}
+
+
+class FakeWm:
+    """
+    An i3 IPC server answering get_tree, run_command and subscribe.
+    """
+
+    def __init__(self, path):
+        self.commands = []
+        self.subscribers = []
+        self.subscriptions = []
+        self.trees = 0
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(path)
+        self.server.listen(5)
+        thread = Thread(target=self.accept)
+        thread.daemon = True
+        thread.start()
+
+    def accept(self):
+        while True:
+            client = self.server.accept()[0]
+            thread = Thread(target=self.serve, args=(client,))
+            thread.daemon = True
+            thread.start()
+
+    def send(self, client, msg_type, payload):
+        data = json.dumps(payload).encode("utf-8")
+        client.sendall(wm_ipc.HEADER.pack(wm_ipc.MAGIC, len(data), msg_type) + data)
+
+    def serve(self, client):
+        connection = wm_ipc.WmIpcConnection.__new__(wm_ipc.WmIpcConnection)
+        connection.sock = client
+        while True:
+            try:
+                header = connection._receive(wm_ipc.HEADER.size)
+            except wm_ipc.WmIpcError:
+                return
+            magic, size, msg_type = wm_ipc.HEADER.unpack(header)
+            payload = connection._receive(size).decode("utf-8")
+            if msg_type == wm_ipc.GET_TREE:
+                self.trees += 1
+                self.send(client, msg_type, TREE)
+            elif msg_type == wm_ipc.RUN_COMMAND:
+                self.commands.append(payload)
+                self.send(client, msg_type, [{"success": True}])
+            elif msg_type == wm_ipc.SUBSCRIBE:
+                self.subscriptions.append(sorted(json.loads(payload)))
+                if client not in self.subscribers:
+                    self.subscribers.append(client)
+                self.send(client, msg_type, {"success": True})
+
+    def event(self, event, payload):
+        event_type = [k for k, v in wm_ipc.EVENTS.items() if v == event][0]
+        for client in self.subscribers:
+            self.send(client, wm_ipc.EVENT_MASK | event_type, payload)
+
+
+def wait():
+    sleep(0.2)
+
+
+def setup_ipc(tmpdir):
+    path = str(tmpdir.join("ipc.sock"))
+    fake_wm = FakeWm(path)
+    ipc = WmIpc(Wrapper(wm={"msg": "i3-msg"}))
+    ipc.socket_path = path
+    return fake_wm, ipc
+
+
+def test_run_command(tmpdir):
+    fake_wm, ipc = setup_ipc(tmpdir)
+    assert ipc.run_command("scratchpad show") == [{"success": True}]
+    assert ipc.run_command("workspace 2") == [{"success": True}]
+    assert fake_wm.commands == ["scratchpad show", "workspace 2"]
+    # the tree is not cached without events
+    ipc.get_tree()
+    ipc.get_tree()
+    assert fake_wm.trees == 2
+
+
+def test_no_socket():
+    ipc = WmIpc(Wrapper(wm={"msg": "i3-msg"}))
+    ipc.socket_path = ""
+    assert not ipc.subscribe(Module("window"), ["window"])
+    assert not ipc.subscribe(Module("window"), ["windows"])
+
+
+def test_shared_subscription(tmpdir):
+    fake_wm, ipc = setup_ipc(tmpdir)
+    window = Module("window")
+    scratchpad = Module("scratchpad")
+    events = []
+    assert ipc.subscribe(window, ["window"])
+    wait()
+    assert ipc.subscribe(scratchpad, ["binding"], lambda *x: events.append(x))
+    wait()
+    # a single connection, subscribed again for the new events only
+    assert fake_wm.subscriptions == [["output", "window", "workspace"], ["binding"]]
+    assert len(fake_wm.subscribers) == 1
+    window.updates = 0
+    del events[:]
+    fake_wm.event("binding", {"change": "run"})
+    wait()
+    assert (window.updates, events) == (0, [("binding", {"change": "run"})])
+    fake_wm.event("window", {"change": "new", "container": {"id": 5}})
+    wait()
+    assert window.updates == 1
+    assert len(events) == 1
+
+
+def test_tree_cache(tmpdir):
+    fake_wm, ipc = setup_ipc(tmpdir)
+    assert ipc.subscribe(Module("window"), ["window"])
+    wait()
+    ipc.get_tree()
+    ipc.get_tree()
+    assert fake_wm.trees == 1
+    # window changes are applied to the cached tree
+    fake_wm.event(
+        "window",
+        {"change": "title", "container": {"id": 4, "name": "movie", "focused": False}},
+    )
+    fake_wm.event(
+        "window",
+        {"change": "focus", "container": {"id": 4, "name": "movie", "focused": True}},
+    )
+    wait()
+    windows = ipc.get_tree()["nodes"][0]["nodes"]
+    assert [(x["name"], x["focused"]) for x in windows] == [
+        ("vim", False),
+        ("movie", True),
+    ]
+    assert fake_wm.trees == 1
+    # layout changes need a new tree
+    fake_wm.event("workspace", {"change": "focus"})
+    wait()
+    assert ipc.get_tree() == TREE
+    assert fake_wm.trees == 2
+
+
+def test_tree_snapshot(tmpdir):
+    fake_wm, ipc = setup_ipc(tmpdir)
+    assert ipc.subscribe(Module("window"), ["window"])
+    wait()
+    tree = ipc.get_tree()
+    before = json.dumps(tree, sort_keys=True)
+    errors = []
+
+    def read():
+        # a single window is focused in any tree we get
+        while not errors and ipc.py3_wrapper.running:
+            windows = ipc.get_tree()["nodes"][0]["nodes"]
+            if [x["focused"] for x in windows].count(True) != 1:
+                errors.append(windows)
+
+    reader = Thread(target=read)
+    reader.daemon = True
+    reader.start()
+    for i in range(50):
+        window_id = 3 + i % 2
+        container = {"id": window_id, "name": "w%s" % i, "focused": True}
+        fake_wm.event("window", {"change": "focus", "container": container})
+    wait()
+    ipc.py3_wrapper.running = False
+    reader.join(1)
+    assert errors == []
+    # the tree we got before is left untouched
+    assert json.dumps(tree, sort_keys=True) == before
+    windows = ipc.get_tree()["nodes"][0]["nodes"]
+    assert [(x["name"], x["focused"]) for x in windows] == [
+        ("w48", False),
+        ("w49", True),
+    ]
+    assert fake_wm.trees == 1